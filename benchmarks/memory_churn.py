@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+""" benchmark: memory footprint of per-entity events over churn
+
+    runs a simulation where short-lived entities are spawned
+    continuously, each one in its own `simpy` process creating its own
+    `Event` (`root.event('entity', id=i)`), emitting `--emits` timeouts
+    wrapped by it, then terminating.
+
+    The memory currently allocated (`tracemalloc`, after a garbage
+    collection) is sampled `--samples` times along the simulation, for a
+    `RootNameSpace` keeping strong references to the created events
+    (default) and one created with `weak=True`: the footprint should
+    stay flat with weak references while it grows with the number of
+    entities otherwise.
+
+    usage ::
+
+        python benchmarks/memory_churn.py [-n ENTITIES] [--emits EMITS]
+            [--samples SAMPLES]
+"""
+import argparse
+import gc
+import tracemalloc
+
+import simpy
+
+from simpy_events.manager import RootNameSpace
+
+
+def entity(env, root, i, emits):
+    """ process of a short-lived entity """
+    evt = root.event('entity', id=i)
+    for _ in range(emits):
+        yield evt(env.timeout(1))
+
+
+def spawner(env, root, entities, emits):
+    """ process spawning an entity every time step """
+    for i in range(entities):
+        env.process(entity(env, root, i, emits))
+        yield env.timeout(1)
+
+
+def run(entities, emits, samples, weak):
+    """ return the list of (entities spawned, KiB allocated) samples """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        env = simpy.Environment()
+        root = RootNameSpace(enabled=True, weak=weak)
+        root.topic('tracking').append('entity')
+        root.handlers('tracking', 'after').append(
+            lambda context, event: None)
+        env.process(spawner(env, root, entities, emits))
+        results = []
+        step = max(entities // samples, 1)
+        for until in range(step, entities + 1, step):
+            env.run(until=until)
+            gc.collect()
+            current, _ = tracemalloc.get_traced_memory()
+            results.append((until, current / 1024))
+        return results
+    finally:
+        tracemalloc.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('-n', '--entities', type=int, default=100000,
+                        help='number of entities spawned')
+    parser.add_argument('--emits', type=int, default=5,
+                        help='number of timeouts emitted per entity')
+    parser.add_argument('--samples', type=int, default=10,
+                        help='number of memory samples')
+    args = parser.parse_args(argv)
+
+    strong = run(args.entities, args.emits, args.samples, weak=False)
+    weak = run(args.entities, args.emits, args.samples, weak=True)
+    print(f'{"entities":>10}{"strong KiB":>14}{"weak KiB":>14}')
+    for (spawned, strong_kib), (_, weak_kib) in zip(strong, weak):
+        print(f'{spawned:>10}{strong_kib:>14.0f}{weak_kib:>14.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+""" benchmark: scalability of namespace construction and topic linking
+
+    builds a synthetic `NameSpace` tree of `--depth` levels with
+    `--width` children per node, where each `NameSpace` holds an
+    `EventType` creating `EVENTS` `Event` instances, then measures for
+    each value of `--events`:
+
+    + `create`: time to create the tree and the events
+    + `link`: time to link `--fan-in` topics to every event type
+      (`Topic.extend`)
+    + `enable`: time to toggle `enabled` on the root (True then False)
+    + `unlink`: time to unlink the topics (`Topic.clear`)
+    + `peak MiB`: peak memory allocated during those steps
+      (`tracemalloc`, measured in a separate run so it doesn't slow
+      down the timings)
+
+    With `--lazy` the `RootNameSpace` is created in lazy mode, so
+    `enable` doesn't depend on the number of events.
+
+    The results can be saved as JSON to plot the scaling curves.
+
+    usage ::
+
+        python benchmarks/namespace_scaling.py [--depth DEPTH]
+            [--width WIDTH] [--events EVENTS [EVENTS ...]]
+            [--fan-in FAN_IN] [--lazy] [-o OUTPUT]
+"""
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+from simpy_events.manager import RootNameSpace
+
+
+def paths(depth, width):
+    """ return the paths of the `NameSpace` objects of the tree """
+    level = ['']
+    result = []
+    for _ in range(depth):
+        level = [f'{parent}::n{i}' for parent in level for i in range(width)]
+        result.extend(level)
+    return result
+
+
+def run(depth, width, events, fan_in, trace=False, lazy=False):
+    """ return a `dict` of measures for a tree with `events` per type
+
+        the peak memory is only measured if `trace` is `True`.
+    """
+    gc.collect()
+    if trace:
+        tracemalloc.start()
+    times = {}
+
+    start = time.perf_counter()
+    root = RootNameSpace(lazy=lazy)
+    types = []
+    for path in paths(depth, width):
+        event_type = root.event_type(f'{path}::event')
+        for i in range(events):
+            event_type.create(id=i)
+        types.append(event_type.path)
+    times['create'] = time.perf_counter() - start
+
+    topics = [root.topic(f'topic{i}') for i in range(fan_in)]
+    start = time.perf_counter()
+    for topic in topics:
+        topic.extend(types)
+    times['link'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    root.enabled = True
+    root.enabled = False
+    times['enable'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for topic in topics:
+        topic.clear()
+    times['unlink'] = time.perf_counter() - start
+
+    if trace:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        times['peak MiB'] = peak / (1 << 20)
+    times['types'] = len(types)
+    times['instances'] = len(types) * events
+    return times
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--depth', type=int, default=2,
+                        help='number of levels of the tree')
+    parser.add_argument('--width', type=int, default=10,
+                        help='number of children per NameSpace')
+    parser.add_argument('--events', type=int, nargs='+',
+                        default=[10, 100, 1000],
+                        help='numbers of events per event type')
+    parser.add_argument('--fan-in', type=int, default=10,
+                        help='number of topics linked to each event type')
+    parser.add_argument('--lazy', action='store_true',
+                        help='create the RootNameSpace in lazy mode')
+    parser.add_argument('-o', '--output',
+                        help='JSON file to save the results')
+    args = parser.parse_args(argv)
+
+    columns = ('create', 'link', 'enable', 'unlink', 'peak MiB')
+    print(f'{"instances":>10}' + ''.join(f'{c:>12}' for c in columns))
+    results = []
+    for events in args.events:
+        result = run(args.depth, args.width, events, args.fan_in,
+                     lazy=args.lazy)
+        result['peak MiB'] = run(args.depth, args.width, events,
+                                 args.fan_in, trace=True,
+                                 lazy=args.lazy)['peak MiB']
+        result['events'] = events
+        results.append(result)
+        print(f'{result["instances"]:>10}' +
+              ''.join(f'{result[c]:>12.3f}' for c in columns))
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({
+                'depth': args.depth,
+                'width': args.width,
+                'fan_in': args.fan_in,
+                'lazy': args.lazy,
+                'results': results,
+            }, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+""" benchmark: wall time per 1M wrapped timeouts, native vs `Callbacks`
+
+    compares the time taken by `simpy` to process timeouts wrapped by an
+    enabled `simpy_events.event.Event` (with a `Topic` holding a handler
+    for each hook) using:
+
+    + `simpy.Environment` (hooks attached with `Callbacks`)
+    + `simpy_events.environment.Environment` (native hooks)
+
+    The time for plain `simpy` timeouts is given as a reference.
+
+    usage ::
+
+        python benchmarks/native_hooks.py [-n NUMBER] [-r REPEAT]
+"""
+import argparse
+import time
+
+import simpy
+
+from simpy_events.environment import Environment
+from simpy_events.manager import RootNameSpace
+
+
+def handler(context, data):
+    pass
+
+
+def create_event():
+    root = RootNameSpace(enabled=True)
+    topic = root.topic('topic')
+    for hook in ('before', 'callbacks', 'after'):
+        topic.handlers(hook).append(handler)
+    topic.append('benchmark')
+    return root.event('benchmark')
+
+
+def run(env_type, number, wrap):
+    """ return the time taken to process `number` timeouts """
+    env = env_type()
+    evt = create_event()
+
+    def process(env):
+        timeout = env.timeout
+        if wrap:
+            for _ in range(number):
+                yield evt(timeout(1))
+        else:
+            for _ in range(number):
+                yield timeout(1)
+
+    env.process(process(env))
+    start = time.perf_counter()
+    env.run()
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('-n', '--number', type=int, default=1000000,
+                        help='number of timeouts')
+    parser.add_argument('-r', '--repeat', type=int, default=3,
+                        help='number of runs, the best time is kept')
+    args = parser.parse_args(argv)
+
+    scale = 1000000 / args.number
+    print(f'{"configuration":<24}{"s / 1M timeouts":>18}')
+    for name, env_type, wrap in (
+            ('plain simpy', simpy.Environment, False),
+            ('Callbacks', simpy.Environment, True),
+            ('native', Environment, True)):
+        best = min(run(env_type, args.number, wrap)
+                   for _ in range(args.repeat))
+        print(f'{name:<24}{best * scale:>18.3f}')
+
+
+if __name__ == '__main__':
+    main()
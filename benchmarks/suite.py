@@ -0,0 +1,238 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+""" benchmark suite for the dispatch hot path, with JSON baselines
+
+    runs the benchmarks and saves the results (best time per operation,
+    in nanoseconds) to a JSON file, then compares two result files, for
+    instance from two checkouts ::
+
+        git checkout master
+        python benchmarks/suite.py run -o baseline.json
+        git checkout my-branch
+        python benchmarks/suite.py run -o current.json
+        python benchmarks/suite.py compare baseline.json current.json
+
+    `compare` exits with status 1 if a benchmark is slower than the
+    baseline by more than the threshold (10% by default).
+
+    benchmarks:
+
+    + `event.dispatch[topics=T,handlers=H]`: `Event.dispatch` for an
+      `Event` with T topics of H handlers each
+    + `dispatcher.dispatch[topics=T,handlers=H]`: the same calling
+      `EventDispatcher.dispatch` directly
+    + `event.call+timeout`: `Event.__call__` wrapping a timeout, plus
+      its processing by `simpy`
+    + `callbacks.iter`: iteration of a `Callbacks` object
+    + `nested.wrap[events=N]`: wrapping a timeout by N `Event` objects,
+      plus its processing by `simpy`
+
+    The `Event` objects have plain `dict` topics, whose routing table
+    is built for each dispatch. The benchmarks prefixed by `ns.` use
+    events created from a `RootNameSpace` instead, with handlers added
+    to linked `Topic` objects: they measure the cached routing tables
+    and the dispatch counters of the `EventType`.
+
+    usage ::
+
+        python benchmarks/suite.py run [-o OUTPUT] [-n NUMBER]
+                                       [-r REPEAT] [-k FILTER]
+        python benchmarks/suite.py compare BASELINE CURRENT
+                                           [-t THRESHOLD]
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+
+import simpy
+
+from simpy_events.event import Event, EventDispatcher, Callbacks
+from simpy_events.manager import RootNameSpace
+
+
+def handler(context, data):
+    pass
+
+
+def create_event(topics, handlers, hooks=('test',), root=None,
+                 name='benchmark'):
+    """ return an enabled `Event` with `topics` x `handlers`
+
+        if `root` (`RootNameSpace`) is not `None` the `Event` is created
+        from the `EventType` `name` and the handlers are added to linked
+        `Topic` objects.
+    """
+    if root is None:
+        evt = Event(name=name)
+        evt.dispatcher = EventDispatcher()
+        evt.enabled = True
+        for _ in range(topics):
+            evt.topics.append({hook: [handler] * handlers
+                               for hook in hooks})
+        return evt
+    for i in range(topics):
+        for hook in hooks:
+            # the topics are shared by the events created from `root`
+            hdlrs = root.handlers(f'topic{i}', hook)
+            del hdlrs[:]
+            hdlrs.extend([handler] * handlers)
+        root.topic(f'topic{i}').append(name)
+    return root.event(name)
+
+
+def create_root(ns):
+    """ return an enabled `RootNameSpace` if `ns` is `True` """
+    return RootNameSpace(enabled=True) if ns else None
+
+
+def bench_event_dispatch(number, topics, handlers, ns=False):
+    evt = create_event(topics, handlers, root=create_root(ns))
+    dispatch = evt.dispatch
+    start = time.perf_counter()
+    for _ in range(number):
+        dispatch('test')
+    return time.perf_counter() - start
+
+
+def bench_dispatcher_dispatch(number, topics, handlers, ns=False):
+    evt = create_event(topics, handlers, root=create_root(ns))
+    dispatch = evt.dispatcher.dispatch
+    start = time.perf_counter()
+    for _ in range(number):
+        dispatch(evt, 'test', None)
+    return time.perf_counter() - start
+
+
+def bench_wrap_timeouts(number, events, ns=False):
+    env = simpy.Environment()
+    root = create_root(ns)
+    evts = [create_event(1, 1, ('before', 'callbacks', 'after'), root,
+                         f'benchmark{i}')
+            for i in range(events)]
+
+    def process(env):
+        timeout = env.timeout
+        for _ in range(number):
+            event = timeout(1)
+            for evt in evts:
+                evt(event)
+            yield event
+
+    env.process(process(env))
+    start = time.perf_counter()
+    env.run()
+    return time.perf_counter() - start
+
+
+def bench_callbacks_iter(number):
+    env = simpy.Environment()
+    evt = create_event(1, 1, ('before', 'callbacks', 'after'))
+    event = evt(env.timeout(1))
+    event.callbacks.append(handler)
+    callbacks = event.callbacks
+    assert isinstance(callbacks, Callbacks)
+    start = time.perf_counter()
+    for _ in range(number):
+        for _ in callbacks:
+            pass
+    return time.perf_counter() - start
+
+
+def benchmarks():
+    """ return a `dict` of benchmark name: function(number) """
+    benchs = {}
+    for ns, prefix in ((False, ''), (True, 'ns.')):
+        for topics, handlers in ((1, 1), (1, 10), (10, 1), (10, 10)):
+            config = f'[topics={topics},handlers={handlers}]'
+            benchs[f'{prefix}event.dispatch{config}'] = (
+                lambda n, t=topics, h=handlers, ns=ns:
+                bench_event_dispatch(n, t, h, ns))
+            benchs[f'{prefix}dispatcher.dispatch{config}'] = (
+                lambda n, t=topics, h=handlers, ns=ns:
+                bench_dispatcher_dispatch(n, t, h, ns))
+        benchs[f'{prefix}event.call+timeout'] = (
+            lambda n, ns=ns: bench_wrap_timeouts(n, 1, ns))
+        for events in (2, 4):
+            benchs[f'{prefix}nested.wrap[events={events}]'] = (
+                lambda n, e=events, ns=ns: bench_wrap_timeouts(n, e, ns))
+    benchs['callbacks.iter'] = bench_callbacks_iter
+    return benchs
+
+
+def run(args):
+    results = {}
+    for name, bench in benchmarks().items():
+        if args.filter and args.filter not in name:
+            continue
+        best = min(bench(args.number) for _ in range(args.repeat))
+        results[name] = best / args.number * 1e9
+        print(f'{name:<45}{results[name]:>12.1f} ns/op')
+    data = {
+        'python': platform.python_version(),
+        'simpy': simpy.__version__,
+        'number': args.number,
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(data, file, indent=2, sort_keys=True)
+    return 0
+
+
+def compare(args):
+    with open(args.baseline) as file:
+        baseline = json.load(file)['results']
+    with open(args.current) as file:
+        current = json.load(file)['results']
+    regressions = 0
+    print(f'{"benchmark":<45}{"baseline":>12}{"current":>12}{"change":>9}')
+    for name in sorted(set(baseline) & set(current)):
+        change = current[name] / baseline[name] - 1
+        flag = ''
+        if change > args.threshold:
+            flag = '  REGRESSION'
+            regressions += 1
+        print(f'{name:<45}{baseline[name]:>12.1f}{current[name]:>12.1f}'
+              f'{change:>+9.1%}{flag}')
+    for name in sorted(set(baseline) ^ set(current)):
+        print(f'{name:<45} only in '
+              f'{"baseline" if name in baseline else "current"}')
+    if regressions:
+        print(f'{regressions} regression(s) above {args.threshold:.0%}')
+        return 1
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+
+    parser_run = commands.add_parser('run', help='run the benchmarks')
+    parser_run.add_argument('-o', '--output',
+                            help='JSON file to save the results')
+    parser_run.add_argument('-n', '--number', type=int, default=100000,
+                            help='number of operations per run')
+    parser_run.add_argument('-r', '--repeat', type=int, default=3,
+                            help='number of runs, the best time is kept')
+    parser_run.add_argument('-k', '--filter',
+                            help='only run benchmarks containing FILTER')
+    parser_run.set_defaults(func=run)
+
+    parser_compare = commands.add_parser(
+        'compare', help='compare two JSON result files')
+    parser_compare.add_argument('baseline')
+    parser_compare.add_argument('current')
+    parser_compare.add_argument('-t', '--threshold', type=float,
+                                default=0.1,
+                                help='max slowdown ratio (default: 0.1)')
+    parser_compare.set_defaults(func=compare)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+""" synthetic workload: processes emitting `Event`-wrapped timeouts
+
+    generates a model similar to the satellite / receiver example
+    (`tests/test_cases.py`) at a larger scale:
+
+    + `--fan-out` namespaces ('::satellite::sat{i}'), each with a
+      process emitting timeouts at a rate following `--rate` (mean
+      interval of 1), carrying a `--payload` bytes value
+
+    + each timeout is wrapped by `--depth` nested `Event` objects
+      created in the namespace of the process ('signal{level}'), the
+      event types of a level in all the namespaces are linked to a
+      topic with a handler on 'after' costing `--cost` loop iterations
+
+    The same model is run with the handlers added as plain `simpy`
+    callbacks to get the overhead ratio of `simpy_events`.
+
+    usage ::
+
+        python benchmarks/workload.py [-n EVENTS] [--fan-out FAN_OUT]
+            [--rate {constant,uniform,exponential}] [--payload PAYLOAD]
+            [--cost COST] [--depth DEPTH] [--native] [--seed SEED]
+"""
+import argparse
+import random
+import time
+
+import simpy
+
+from simpy_events.environment import Environment
+from simpy_events.manager import RootNameSpace
+
+RATES = {
+    'constant': lambda rng: 1.,
+    'uniform': lambda rng: rng.uniform(0., 2.),
+    'exponential': lambda rng: rng.expovariate(1.),
+}
+
+
+def make_handler(cost):
+    """ return a handler looping `cost` times """
+    def handler(context, event):
+        for _ in range(cost):
+            pass
+    return handler
+
+
+def emit(env, number, interval, payload, wrappers):
+    """ process emitting `number` timeouts wrapped by `wrappers` """
+    timeout = env.timeout
+    for _ in range(number):
+        event = timeout(interval(), bytes(payload))
+        for wrap in wrappers:
+            wrap(event)
+        yield event
+
+
+def model(env, args, wrappers_factory):
+    """ create the emitting processes, `wrappers_factory(i)` returns the
+        wrappers of the process `i`.
+    """
+    rng = random.Random(args.seed)
+    rate = RATES[args.rate]
+    number, extra = divmod(args.events, args.fan_out)
+    for i in range(args.fan_out):
+        env.process(emit(env, number + (i < extra),
+                         lambda: rate(rng), args.payload,
+                         wrappers_factory(i)))
+
+
+def run_events(args):
+    """ return the time to run the model with `simpy_events` """
+    env = Environment() if args.native else simpy.Environment()
+    root = RootNameSpace(enabled=True)
+    handler = make_handler(args.cost)
+    for level in range(args.depth):
+        topic = root.topic(f'analyse{level}')
+        topic.after.append(handler)
+        topic.extend(f'::satellite::sat{i}::signal{level}'
+                     for i in range(args.fan_out))
+
+    def wrappers(i):
+        sat = root.ns(f'satellite::sat{i}')
+        return [sat.event(f'signal{level}', sat=i)
+                for level in range(args.depth)]
+
+    model(env, args, wrappers)
+    start = time.perf_counter()
+    env.run()
+    return time.perf_counter() - start
+
+
+def run_plain(args):
+    """ return the time to run the model with plain `simpy` callbacks """
+    env = simpy.Environment()
+    handler = make_handler(args.cost)
+
+    def callback(event):
+        handler(None, event)
+
+    def wrap(event):
+        event.callbacks.append(callback)
+
+    model(env, args, lambda i: [wrap] * args.depth)
+    start = time.perf_counter()
+    env.run()
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('-n', '--events', type=int, default=1000000,
+                        help='total number of emitted timeouts')
+    parser.add_argument('--fan-out', type=int, default=100,
+                        help='number of emitting namespaces / processes')
+    parser.add_argument('--rate', choices=sorted(RATES),
+                        default='exponential',
+                        help='distribution of the intervals')
+    parser.add_argument('--payload', type=int, default=64,
+                        help='size of the payload in bytes')
+    parser.add_argument('--cost', type=int, default=0,
+                        help='handler cost (loop iterations)')
+    parser.add_argument('--depth', type=int, default=1,
+                        help='number of nested Event wrappers')
+    parser.add_argument('--native', action='store_true',
+                        help='use simpy_events.environment.Environment')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='seed of the random intervals')
+    args = parser.parse_args(argv)
+
+    plain = run_plain(args)
+    events = run_events(args)
+    print(f'{"model":<16}{"seconds":>10}{"events / s":>14}')
+    for name, seconds in (('plain simpy', plain), ('simpy_events', events)):
+        print(f'{name:<16}{seconds:>10.3f}{args.events / seconds:>14.0f}')
+    print(f'overhead ratio: {events / plain:.2f}')
+
+
+if __name__ == '__main__':
+    main()
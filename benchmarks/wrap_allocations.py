@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+""" microbenchmark: memory allocations per `Event.__call__` (wrap)
+
+    compares the current `simpy_events.event.Event.__call__` with the
+    legacy implementation, which created three closures and a
+    dict-based `Callbacks` object for each wrapped `simpy` event.
+
+    usage ::
+
+        python benchmarks/wrap_allocations.py [-n NUMBER]
+"""
+import argparse
+import collections
+import gc
+import sys
+import tracemalloc
+from itertools import chain
+
+import simpy
+
+from simpy_events.event import Event, EventDispatcher
+
+
+class LegacyCallbacks(collections.abc.MutableSequence):
+    # `simpy_events.event.Callbacks` before `__slots__` were added
+    def __init__(self, event, before, callbacks, after):
+        if isinstance(event.callbacks, LegacyCallbacks):
+            cbks = event.callbacks
+            self.callbacks = cbks.callbacks
+            self.before = cbks.before
+            self.after = cbks.after
+        else:
+            self.callbacks = event.callbacks
+            self.before = []
+            self.after = []
+
+        self.before.append(before)
+        self.after.append(after)
+        self.callbacks.append(callbacks)
+
+    def __getitem__(self, index):
+        return self.callbacks[index]
+
+    def __setitem__(self, index, value):
+        self.callbacks[index] = value
+
+    def __delitem__(self, index):
+        del self.callbacks[index]
+
+    def __len__(self):
+        return len(self.callbacks)
+
+    def insert(self, index, value):
+        self.callbacks.insert(index, value)
+
+    def __iter__(self):
+        return iter(chain(self.before, self.callbacks, self.after))
+
+
+def legacy_wrap(evt, event):
+    # `simpy_events.event.Event.__call__` creating closures
+    _dispatch = evt.dispatch
+    hooks = []
+    for hook in ('before', 'callbacks', 'after'):
+
+        def dispatch(event, hook=hook):
+            _dispatch(hook, event)
+
+        hooks.append(dispatch)
+    event.callbacks = LegacyCallbacks(event, *hooks)
+    return event
+
+
+def current_wrap(evt, event):
+    return evt(event)
+
+
+def measure(wrap, number):
+    """ return (blocks, bytes) allocated per wrap
+
+        the wrapped events are kept alive so the allocations made by
+        `wrap` are still accounted for when measuring.
+    """
+    env = simpy.Environment()
+    evt = Event(name='benchmark')
+    evt.dispatcher = EventDispatcher()
+    evt.enabled = True
+    evt.topics.append({'after': [lambda context, data: None]})
+    # warm up (i.e lazily created objects)
+    wrap(evt, env.timeout(1))
+
+    def run(events):
+        # the garbage is collected by the caller before the baseline is
+        # taken, so it doesn't offset the measure
+        gc.disable()
+        try:
+            for event in events:
+                wrap(evt, event)
+        finally:
+            gc.enable()
+
+    events = [env.timeout(1) for _ in range(number)]
+    gc.collect()
+    blocks = sys.getallocatedblocks()
+    run(events)
+    blocks = sys.getallocatedblocks() - blocks
+
+    events = [env.timeout(1) for _ in range(number)]
+    gc.collect()
+    tracemalloc.start()
+    size = tracemalloc.get_traced_memory()[0]
+    run(events)
+    size = tracemalloc.get_traced_memory()[0] - size
+    tracemalloc.stop()
+    return blocks / number, size / number
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('-n', '--number', type=int, default=100000,
+                        help='number of wrapped simpy events')
+    args = parser.parse_args(argv)
+
+    print(f'{"implementation":<16}{"blocks/wrap":>14}{"bytes/wrap":>14}')
+    for name, wrap in (('legacy', legacy_wrap), ('current', current_wrap)):
+        blocks, size = measure(wrap, args.number)
+        print(f'{name:<16}{blocks:>14.2f}{size:>14.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -20,6 +20,9 @@ setuptools.setup(
     packages=setuptools.find_packages(),
 
     install_requires=[],
+    extras_require={
+        'numpy': ['numpy'],
+    },
 
     license='MIT License',
     include_package_data=True,
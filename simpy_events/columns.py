@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# numpy is an optional dependency, it's only imported when a `Columns`
+# object is created since importing it is slow, see `_numpy`
+numpy = None
+
+
+def _numpy():
+    # return the numpy module, imported the first time
+    global numpy
+    if numpy is None:
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError('numpy is required to use Columns') from None
+    return numpy
+
+
+class Columns:
+    """ Holds a batch of data as named columns (`numpy` arrays).
+
+        `Columns` is used to dispatch a batch of data items at once with
+        `simpy_events.event.Event.dispatch_columns`, for instance for
+        telemetry-like events ::
+
+            evt.dispatch_columns(
+                'sample',
+                timestamps=[0.1, 0.2, 0.3],
+                values=[12, 15, 11],
+                ids=[1, 2, 1],
+            )
+
+        Each keyword arg is a column, converted to a `numpy` array. All
+        the columns must have the same length, which is the number of
+        data items (or rows) in the batch.
+
+        Columns can be accessed as attributes (ex: `columns.values`) or
+        using `Columns.arrays`.
+
+        Iterating over a `Columns` object yields a `dict` for each row,
+        containing a value (python scalar) for each column.
+
+        .. seealso:: `VectorHandler`
+
+        .. note:: `numpy` is required to create a `Columns` object,
+            `ImportError` is raised otherwise.
+    """
+    __slots__ = ('arrays', '_size')
+
+    def __init__(self, **columns):
+        """ create a `Columns` object from `columns` keyword args
+
+            `ValueError` is raised if the columns don't have the same
+            length.
+        """
+        asarray = _numpy().asarray
+        arrays = {name: asarray(column) for name, column in columns.items()}
+        sizes = {len(array) for array in arrays.values()}
+        if len(sizes) > 1:
+            raise ValueError('columns must have the same length')
+        self.arrays = arrays
+        self._size = sizes.pop() if sizes else 0
+
+    @property
+    def names(self):
+        """ (read only) the `tuple` of column names """
+        return tuple(self.arrays)
+
+    def __getattr__(self, name):
+        # only called if `name` is not a regular attribute
+        if name == 'arrays':
+            raise AttributeError(name)
+        try:
+            return self.arrays[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __len__(self):
+        """ return the number of rows """
+        return self._size
+
+    def __iter__(self):
+        """ iter on rows, each row is a `dict` (column name: value) """
+        names = tuple(self.arrays)
+        columns = [array.tolist() for array in self.arrays.values()]
+        for values in zip(*columns):
+            yield dict(zip(names, values))
+
+    def rows(self):
+        """ return a `list` of rows (see `Columns.__iter__`) """
+        return list(self)
+
+
+class VectorHandler:
+    """ Turn a function handling `Columns` into a handler.
+
+        `VectorHandler` wraps a function `vectorized(context, columns)`
+        where `columns` is a `Columns` object, it can be used as a
+        decorator, ex ::
+
+            @topic.handlers('sample')
+            @VectorHandler
+            def accumulate(context, columns):
+                totals[columns.ids] += columns.values
+
+        When the handlers are dispatched with
+        `simpy_events.event.EventDispatcher.dispatch_columns` the
+        function is called once with the `Columns` object. Otherwise,
+        when the `VectorHandler` is called as a regular handler with a
+        single row (a mapping of column name: value), the function is
+        called with a `Columns` object containing this row.
+    """
+    __slots__ = ('vectorized',)
+
+    def __init__(self, vectorized):
+        """ `vectorized` is called as `vectorized(context, columns)` """
+        self.vectorized = vectorized
+
+    def __call__(self, context, data):
+        if not isinstance(data, Columns):
+            data = Columns(**{name: (value,) for name, value in data.items()})
+        self.vectorized(context, data)
@@ -0,0 +1,1094 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from .event import EventDispatcher
+from .manager import NameSpace
+import abc
+import asyncio
+import collections
+import simpy
+import threading
+import weakref
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from time import perf_counter, perf_counter_ns
+from types import CoroutineType
+
+
+def _offloaded(event, hook):
+    # return a list of (topic, handlers, offload) for the `hook` of
+    # `event`, `offload` is the list of the handlers to offload
+    routes = []
+    for topic in event.topics:
+        hdlrs = topic.get(hook)
+        if hdlrs:
+            hdlrs = tuple(hdlrs)
+            if getattr(topic, 'offload', False):
+                routes.append((topic, hdlrs, hdlrs))
+            else:
+                routes.append((topic, hdlrs, [
+                    hdlr for hdlr in hdlrs if getattr(hdlr, 'offload', False)
+                ]))
+    return routes
+
+
+class BackgroundEventDispatcher(EventDispatcher, metaclass=abc.ABCMeta):
+    """ Base class for dispatchers running handlers in the background.
+
+        Subclasses implement `BackgroundEventDispatcher.drain`, which
+        waits until the handlers run in the background are done, and
+        optionally `BackgroundEventDispatcher.close` to release the
+        resources.
+
+        `BackgroundEventDispatcher` can be used as a context manager,
+        `BackgroundEventDispatcher.close` is called on exit.
+    """
+    handlers_only = True
+
+    @abc.abstractmethod
+    def drain(self, timeout=None):
+        """ wait until the handlers run in the background are done """
+
+    def close(self):
+        """ drain the dispatcher, see `BackgroundEventDispatcher.drain`
+        """
+        self.drain()
+
+    def run(self, env, until=None):
+        """ run `env` (`simpy.Environment.run`) and drain the dispatcher
+
+            return the value returned by `env.run(until)`.
+
+            .. seealso:: `BackgroundEventDispatcher.drain`
+        """
+        try:
+            return env.run(until)
+        finally:
+            self.drain()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class AsyncEventDispatcher(BackgroundEventDispatcher):
+    """ `EventDispatcher` running coroutine handlers with `asyncio`.
+
+        `AsyncEventDispatcher` can be used as the dispatcher of a
+        `simpy_events.manager.RootNameSpace` (or any
+        `simpy_events.event.Event`), ex ::
+
+            dispatcher = AsyncEventDispatcher()
+            root = RootNameSpace(dispatcher=dispatcher)
+
+            @root.after('results')
+            async def write(context, event):
+                await send(event.value)
+
+            dispatcher.run(env)
+
+        Handlers are called as with `simpy_events.event.EventDispatcher`,
+        and if a handler returns a coroutine (i.e it's a coroutine
+        function) then the coroutine is scheduled on an `asyncio` loop
+        running in a separate thread, so the simulation is not blocked.
+
+        The coroutines returned by the same handler for the same
+        `simpy_events.event.Event` are run sequentially, in the order of
+        the dispatch.
+
+        `AsyncEventDispatcher.drain` waits until all the scheduled
+        coroutines are done, `AsyncEventDispatcher.run` can be used to
+        run a `simpy` environment and drain the dispatcher once the
+        simulation is over.
+
+        `AsyncEventDispatcher` can also be used as a context manager,
+        the coroutines are drained and the loop is stopped on exit.
+
+        .. note:: the context object given to the coroutines is shared
+            (see `simpy_events.event.HookContext`) unless a
+            `context_type` is provided.
+    """
+    handlers_only = True
+
+    def __init__(self, context_type=None, loop=None):
+        """ initializes a new `AsyncEventDispatcher`
+
+            `context_type`: see `simpy_events.event.EventDispatcher`
+
+            `loop` is an optional `asyncio` loop already running in
+            another thread. By default a new loop is created and run in
+            a daemon thread the first time a coroutine is scheduled.
+        """
+        super().__init__(context_type=context_type)
+        self._loop = loop
+        self._thread = None
+        self._futures = set()
+        # last future scheduled per (event, handler), the items are
+        # removed once done (see `AsyncEventDispatcher._done`)
+        self._last = {}
+        self._last_lock = threading.Lock()
+
+    @property
+    def loop(self):
+        """ (read only) the `asyncio` loop running the coroutines
+
+            the loop is started if it doesn't exist yet.
+        """
+        if self._loop is None:
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever,
+                                      name='AsyncEventDispatcher',
+                                      daemon=True)
+            thread.start()
+            self._loop = loop
+            self._thread = thread
+        return self._loop
+
+    def dispatch(self, event, hook, data):
+        """ dispatch the event to the handlers in `Event.topics`.
+
+            see `simpy_events.event.EventDispatcher.dispatch`, the
+            coroutines returned by the handlers are scheduled on
+            `AsyncEventDispatcher.loop`.
+        """
+        handlers = event.topics.handlers(hook)
+        if handlers:
+            context_type = self.context_type
+            if context_type is None:
+                context = event.context(hook)
+            else:
+                context = context_type(event=event, hook=hook)
+            for hdlr in handlers:
+                result = hdlr(context, data)
+                if type(result) is CoroutineType:
+                    self._schedule((event, hdlr), result)
+
+    def _schedule(self, key, coro):
+        # schedule `coro` after the last coroutine scheduled for `key`
+        last = self._last
+        with self._last_lock:
+            previous = last.get(key)
+            future = asyncio.run_coroutine_threadsafe(
+                self._run(previous, coro), self.loop)
+            last[key] = future
+        self._futures.add(future)
+        future.add_done_callback(partial(self._done, key))
+
+    def _done(self, key, future):
+        # forget `future` if it's the last one scheduled for `key` so
+        # the `Event` isn't kept alive, failed futures are kept until
+        # the dispatcher is drained
+        last = self._last
+        with self._last_lock:
+            if last.get(key) is future:
+                del last[key]
+        if future.cancelled() or future.exception() is None:
+            self._futures.discard(future)
+
+    @staticmethod
+    async def _run(previous, coro):
+        # await `previous` (regardless of its result) then `coro`
+        if previous is not None:
+            try:
+                await asyncio.wrap_future(previous)
+            except Exception:
+                pass
+        return await coro
+
+    @property
+    def pending(self):
+        """ (read only) the number of scheduled coroutines not done """
+        return sum(1 for future in list(self._futures) if not future.done())
+
+    def drain(self, timeout=None):
+        """ wait until all the scheduled coroutines are done
+
+            `timeout` is an optional number of seconds to wait for each
+            coroutine (see `concurrent.futures.Future.result`).
+
+            The first exception raised by a coroutine since the last call
+            to `AsyncEventDispatcher.drain`, if any, is raised once all
+            the coroutines are done.
+        """
+        error = None
+        while self._futures:
+            for future in list(self._futures):
+                e = future.exception(timeout)
+                if error is None:
+                    error = e
+                self._futures.discard(future)
+        self._last.clear()
+        if error is not None:
+            raise error
+
+    def close(self):
+        """ drain coroutines and stop the loop if created by the
+            `AsyncEventDispatcher`.
+        """
+        try:
+            self.drain()
+        finally:
+            thread = self._thread
+            if thread is not None:
+                loop = self._loop
+                loop.call_soon_threadsafe(loop.stop)
+                thread.join()
+                loop.close()
+                self._loop = None
+                self._thread = None
+
+
+class Offload:
+    """ Mark a handler to be run outside the simulation thread.
+
+        `Offload` wraps a handler and can be used as a decorator, ex ::
+
+            @topic.after
+            @Offload
+            def write(context, event):
+                [...]
+
+        The handler is run by a `ThreadPoolEventDispatcher` in its
+        thread pool. Other dispatchers simply call it.
+
+        .. seealso:: `simpy_events.manager.Topic.offload` to mark all
+            the handlers of a `simpy_events.manager.Topic`.
+    """
+    __slots__ = ('handler',)
+    offload = True
+
+    def __init__(self, handler):
+        """ `handler` is the handler function to wrap """
+        self.handler = handler
+
+    def __call__(self, context, data):
+        return self.handler(context, data)
+
+
+class _Lane:
+    # queue of offloaded handler calls for a given topic
+    __slots__ = ('topic', 'queue', 'running')
+
+    def __init__(self, topic):
+        self.topic = topic
+        self.queue = collections.deque()
+        self.running = False
+
+
+class ThreadPoolEventDispatcher(BackgroundEventDispatcher):
+    """ `EventDispatcher` offloading handlers to a thread pool.
+
+        Handlers are called as with `simpy_events.event.EventDispatcher`
+        except the handlers marked as offloadable are submitted to a
+        `concurrent.futures.ThreadPoolExecutor`:
+
+        + all the handlers of a topic whose `offload` attribute is
+          `True` (see `simpy_events.manager.Topic.offload`)
+
+        + the handlers having an `offload` attribute which is `True`
+          (see `Offload`)
+
+        The offloaded handlers of a given topic are run sequentially in
+        the order they were submitted, while the handlers of different
+        topics can run concurrently.
+
+        Metrics about the queued handler calls are available with
+        `ThreadPoolEventDispatcher.stats`.
+
+        .. note:: the offloaded handlers get the topics of the
+            `simpy_events.event.Event` instead of the cached routing
+            table, since each topic needs to be identified.
+    """
+    handlers_only = True
+
+    def __init__(self, context_type=None, max_workers=None, executor=None):
+        """ initializes a new `ThreadPoolEventDispatcher`
+
+            `context_type`: see `simpy_events.event.EventDispatcher`
+
+            `max_workers` is forwarded to the `ThreadPoolExecutor`
+            created by the dispatcher, unless an `executor` is provided.
+            In this case the `executor` is not shut down by
+            `ThreadPoolEventDispatcher.close`.
+        """
+        super().__init__(context_type=context_type)
+        self._own_executor = executor is None
+        if executor is None:
+            executor = ThreadPoolExecutor(
+                max_workers=max_workers,
+                thread_name_prefix='ThreadPoolEventDispatcher')
+        self._executor = executor
+        self._lanes = {}
+        self._cond = threading.Condition()
+        self._errors = []
+        self._depth = 0
+        self._max_depth = 0
+        self._submitted = 0
+        self._completed = 0
+        self._total_lag = 0.
+        self._max_lag = 0.
+
+    def dispatch(self, event, hook, data):
+        """ dispatch the event to the handlers in `Event.topics`.
+
+            see `simpy_events.event.EventDispatcher.dispatch`, the
+            handlers marked as offloadable are submitted to the thread
+            pool instead of being called.
+        """
+        routes = _offloaded(event, hook)
+        if not routes:
+            return
+
+        context_type = self.context_type
+        if context_type is None:
+            context = event.context(hook)
+        else:
+            context = context_type(event=event, hook=hook)
+        for topic, hdlrs, offload in routes:
+            for hdlr in hdlrs:
+                if offload and hdlr in offload:
+                    self._submit(topic, hdlr, context, data)
+                else:
+                    hdlr(context, data)
+
+    def _submit(self, topic, hdlr, context, data):
+        # queue the handler call in the lane of `topic` and submit the
+        # lane to the executor if it's not already running
+        lanes = self._lanes
+        with self._cond:
+            lane = lanes.get(id(topic))
+            if lane is None or lane.topic is not topic:
+                lane = lanes[id(topic)] = _Lane(topic)
+            lane.queue.append((hdlr, context, data, perf_counter()))
+            self._submitted += 1
+            self._depth += 1
+            if self._depth > self._max_depth:
+                self._max_depth = self._depth
+            if lane.running:
+                return
+            lane.running = True
+        self._executor.submit(self._run_lane, lane)
+
+    def _run_lane(self, lane):
+        # run the queued handler calls of `lane` until it is empty
+        cond = self._cond
+        queue = lane.queue
+        while True:
+            with cond:
+                if not queue:
+                    lane.running = False
+                    return
+                hdlr, context, data, submitted = queue.popleft()
+                lag = perf_counter() - submitted
+                self._total_lag += lag
+                if lag > self._max_lag:
+                    self._max_lag = lag
+            try:
+                hdlr(context, data)
+            except Exception as e:
+                with cond:
+                    self._errors.append(e)
+            finally:
+                with cond:
+                    self._depth -= 1
+                    self._completed += 1
+                    cond.notify_all()
+
+    def stats(self):
+        """ return a `dict` of metrics about the offloaded handlers:
+
+            + `depth`: number of handler calls queued or running
+            + `max_depth`: maximum `depth` reached
+            + `submitted`: number of handler calls submitted
+            + `completed`: number of handler calls done
+            + `mean_lag`, `max_lag`: time in seconds between the
+              submission of the handler calls and their start
+            + `topics`: a `dict` containing the number of handler calls
+              queued (not started) for each topic, by path (see
+              `simpy_events.manager.Topic.path`) or by `id` if the topic
+              is not linked to a `simpy_events.manager.Topic`.
+        """
+        with self._cond:
+            started = self._completed + self._depth - sum(
+                len(lane.queue) for lane in self._lanes.values())
+            topics = {}
+            for key, lane in self._lanes.items():
+                owner = getattr(lane.topic, 'owner', None)
+                topics[key if owner is None else owner.path] = len(
+                    lane.queue)
+            return {
+                'depth': self._depth,
+                'max_depth': self._max_depth,
+                'submitted': self._submitted,
+                'completed': self._completed,
+                'mean_lag': self._total_lag / started if started else 0.,
+                'max_lag': self._max_lag,
+                'topics': topics,
+            }
+
+    def drain(self, timeout=None):
+        """ wait until all the offloaded handler calls are done
+
+            `timeout` is an optional number of seconds to wait,
+            `TimeoutError` is raised if the handlers are not done.
+
+            The first exception raised by a handler since the last call
+            to `ThreadPoolEventDispatcher.drain`, if any, is raised once
+            all the handlers are done.
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._depth == 0, timeout):
+                raise TimeoutError('offloaded handlers are not done')
+            errors = self._errors
+            self._errors = []
+        if errors:
+            raise errors[0]
+
+    def close(self):
+        """ drain the dispatcher and shut down the executor if it was
+            created by the `ThreadPoolEventDispatcher`.
+        """
+        try:
+            self.drain()
+        finally:
+            if self._own_executor:
+                self._executor.shutdown()
+
+
+class RemoteEvent:
+    """ Lightweight copy of a `simpy_events.event.Event` sent to the
+        processes of a `ProcessPoolEventDispatcher`.
+
+        `RemoteEvent` only holds a copy of `metadata`, in which the
+        `simpy_events.manager.NameSpace` objects (ex: 'ns' for the
+        events created by a `simpy_events.manager.EventType`) are
+        replaced by their path.
+    """
+    __slots__ = ('metadata',)
+
+    def __init__(self, metadata):
+        self.metadata = {
+            key: value.path if isinstance(value, NameSpace) else value
+            for key, value in metadata.items()
+        }
+
+
+class RemoteContext:
+    """ Context object given to the handlers run by a
+        `ProcessPoolEventDispatcher`.
+
+        It has the same attributes as `simpy_events.event.HookContext`,
+        `event` being a `RemoteEvent`.
+    """
+    __slots__ = ('event', 'hook')
+
+    def __init__(self, event, hook):
+        self.event = event
+        self.hook = hook
+
+
+def copy_data(hook, data):
+    """ return a picklable copy of `data` for `ProcessPoolEventDispatcher`
+
+        the value of `simpy.events.Event` objects is returned (or `None`
+        if they are not triggered), other data is returned unchanged.
+    """
+    if isinstance(data, simpy.events.Event):
+        return data.value if data.triggered else None
+    return data
+
+
+def _run_batch(batch):
+    # run in the worker processes: call the handlers and return the
+    # list of results
+    return [hdlr(context, data) for hdlr, context, data in batch]
+
+
+class ProcessPoolEventDispatcher(BackgroundEventDispatcher):
+    """ `EventDispatcher` running handlers in a pool of processes.
+
+        It's intended to run CPU-bound handlers (ex: analysis) without
+        limiting the simulation to a single core. The handlers to run
+        in the processes are marked in the same way as for
+        `ThreadPoolEventDispatcher` (see `Offload` and
+        `simpy_events.manager.Topic.offload`), ex ::
+
+            root.topic('analyse').offload = True
+
+            dispatcher = ProcessPoolEventDispatcher(batch_size=500)
+            root.dispatcher = dispatcher
+            dispatcher.run(env)
+            results = dispatcher.results
+
+        Other handlers are called as with
+        `simpy_events.event.EventDispatcher`.
+
+        Instead of the actual objects, lightweight and picklable copies
+        are sent to the processes:
+
+        + the context is a `RemoteContext`, which only contains a copy
+          of the `metadata` of the `simpy_events.event.Event`
+
+        + the data is copied using `copy_data`, by default the value of
+          the `simpy.events.Event`
+
+        The handlers themselves must be picklable, ex: functions defined
+        at the module level.
+
+        The handler calls are sent in batches of `batch_size` items to
+        the processes, the results returned by the handlers (other than
+        `None`) are merged back in the dispatch order by calling `merge`
+        in the simulation thread, by default `merge` appends the result
+        to `ProcessPoolEventDispatcher.results`.
+
+        The dispatch never blocks the simulation unless the number of
+        batches being processed exceeds `backlog`.
+    """
+    handlers_only = True
+
+    def __init__(self, context_type=None, max_workers=None, executor=None,
+                 batch_size=100, backlog=None, copy_data=copy_data,
+                 merge=None):
+        """ initializes a new `ProcessPoolEventDispatcher`
+
+            `context_type`: see `simpy_events.event.EventDispatcher`,
+            only used for the handlers called in the simulation thread.
+
+            `max_workers` is forwarded to the `ProcessPoolExecutor`
+            created by the dispatcher, unless an `executor` is provided.
+            In this case the `executor` is not shut down by
+            `ProcessPoolEventDispatcher.close`.
+
+            `batch_size` is the number of handler calls sent at once.
+
+            `backlog` is the maximum number of batches being processed,
+            by default the number of batches is not limited.
+
+            `copy_data` is called as `copy_data(hook, data)` to get the
+            data sent to the processes.
+
+            `merge` is called as `merge(result)` for each result.
+        """
+        super().__init__(context_type=context_type)
+        if batch_size < 1:
+            raise ValueError('batch_size must be >= 1')
+        if backlog is not None and backlog < 1:
+            raise ValueError('backlog must be >= 1')
+        self._own_executor = executor is None
+        if executor is None:
+            executor = ProcessPoolExecutor(max_workers=max_workers)
+        self._executor = executor
+        self.batch_size = batch_size
+        self.backlog = backlog
+        self.copy_data = copy_data
+        self.results = []
+        self.merge = self.results.append if merge is None else merge
+        self._batch = []
+        self._futures = collections.deque()
+        self._errors = []
+
+    def dispatch(self, event, hook, data):
+        """ dispatch the event to the handlers in `Event.topics`.
+
+            see `simpy_events.event.EventDispatcher.dispatch`, the
+            handlers marked as offloadable are sent to the processes
+            instead of being called.
+        """
+        routes = _offloaded(event, hook)
+        if not routes:
+            return
+
+        context = remote = None
+        for topic, hdlrs, offload in routes:
+            for hdlr in hdlrs:
+                if offload and hdlr in offload:
+                    if remote is None:
+                        remote = (
+                            RemoteContext(RemoteEvent(event.metadata),
+                                          hook),
+                            self.copy_data(hook, data),
+                        )
+                    self._append(hdlr, remote)
+                else:
+                    if context is None:
+                        context_type = self.context_type
+                        if context_type is None:
+                            context = event.context(hook)
+                        else:
+                            context = context_type(event=event, hook=hook)
+                    hdlr(context, data)
+
+    def _append(self, hdlr, remote):
+        # add a handler call to the current batch and submit it if full
+        batch = self._batch
+        batch.append((hdlr,) + remote)
+        if len(batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """ send the current batch to the processes even if it's not full
+
+            completed batches are merged, and the simulation waits for
+            the oldest batches if `backlog` is exceeded.
+        """
+        if self._batch:
+            batch, self._batch = self._batch, []
+            future = self._executor.submit(_run_batch, batch)
+            self._futures.append((future, len(batch)))
+        futures = self._futures
+        backlog = self.backlog
+        while futures and (futures[0][0].done() or (
+                backlog is not None and len(futures) > backlog)):
+            self._merge(futures.popleft()[0])
+
+    def _merge(self, future):
+        # wait for `future` and merge its results
+        try:
+            results = future.result()
+        except Exception as e:
+            self._errors.append(e)
+        else:
+            merge = self.merge
+            for result in results:
+                if result is not None:
+                    merge(result)
+
+    @property
+    def pending(self):
+        """ (read only) number of handler calls not merged yet """
+        return len(self._batch) + sum(size for _, size in self._futures)
+
+    def drain(self, timeout=None):
+        """ send the current batch and wait until all the batches are
+            merged.
+
+            `timeout` is an optional number of seconds to wait for each
+            batch (see `concurrent.futures.Future.result`).
+
+            The first exception raised by a batch since the last call to
+            `ProcessPoolEventDispatcher.drain`, if any, is raised once
+            all the batches are done.
+        """
+        self.flush()
+        futures = self._futures
+        while futures:
+            futures[0][0].exception(timeout)
+            self._merge(futures.popleft()[0])
+        errors = self._errors
+        self._errors = []
+        if errors:
+            raise errors[0]
+
+    def close(self):
+        """ drain the dispatcher and shut down the executor if it was
+            created by the `ProcessPoolEventDispatcher`.
+        """
+        try:
+            self.drain()
+        finally:
+            if self._own_executor:
+                self._executor.shutdown()
+
+
+class TimeStepEventDispatcher(BackgroundEventDispatcher):
+    """ `EventDispatcher` batching the dispatch by simulation time.
+
+        Instead of calling the handlers immediately, the dispatched
+        records (event, hook, data) are queued while the time of `env`
+        (`env.now`) doesn't change, then dispatched at once when the
+        time is about to advance (i.e once all the events scheduled at
+        the current time are processed), ex ::
+
+            dispatcher = TimeStepEventDispatcher(env)
+            root = RootNameSpace(dispatcher=dispatcher)
+            root.topic('state').coalesce = 'last'
+            dispatcher.run(env)
+
+        The queued records are dispatched for each event and hook, in
+        the order of their first record, as for
+        `simpy_events.event.EventDispatcher.dispatch_many`:
+
+        + a handler having a `batch` attribute is called once with the
+          list of data (see `simpy_events.event.BatchHandler`)
+
+        + other handlers are called for each data
+
+        Depending on the `coalesce` attribute of each topic (see
+        `simpy_events.manager.Topic.coalesce`) the handlers get all the
+        records or only the last record of each event.
+
+        `TimeStepEventDispatcher.flush` dispatches the queued records
+        immediately, it's called by `TimeStepEventDispatcher.drain`
+        (ex: when `TimeStepEventDispatcher.run` returns).
+
+        .. note:: the time step is detected using a `simpy` event
+            scheduled at the current time, which is scheduled again
+            until no other event is scheduled at the current time.
+    """
+    handlers_only = True
+
+    def __init__(self, env, context_type=None):
+        """ initializes a new `TimeStepEventDispatcher`
+
+            `env` is the `simpy.Environment` providing the time.
+
+            `context_type`: see `simpy_events.event.EventDispatcher`
+        """
+        super().__init__(context_type=context_type)
+        self.env = env
+        self._records = {}
+        self._timer = None
+
+    @property
+    def pending(self):
+        """ (read only) the number of queued records """
+        return sum(len(datas) for datas in self._records.values())
+
+    def dispatch(self, event, hook, data):
+        """ queue the record until the simulation time advances
+
+            see `simpy_events.event.EventDispatcher.dispatch`, nothing
+            is queued if there are no handlers for `hook`.
+        """
+        if not event.topics.handlers(hook):
+            return
+        key = (event, hook)
+        datas = self._records.get(key)
+        if datas is None:
+            self._records[key] = [data]
+        else:
+            datas.append(data)
+        if self._timer is None:
+            self._schedule()
+
+    def _schedule(self):
+        # check the time step once the events scheduled at this time are
+        # processed
+        timer = self._timer = self.env.timeout(0)
+        timer.callbacks.append(self._check)
+
+    def _check(self, timer):
+        env = self.env
+        if env.peek() > env.now:
+            self._timer = None
+            self.flush()
+        else:
+            self._schedule()
+
+    def flush(self):
+        """ dispatch the queued records immediately """
+        records = self._records
+        if not records:
+            return
+        self._records = {}
+        context_type = self.context_type
+        for (event, hook), datas in records.items():
+            if context_type is None:
+                context = event.context(hook)
+            else:
+                context = context_type(event=event, hook=hook)
+            for topic in event.topics:
+                hdlrs = topic.get(hook)
+                if not hdlrs:
+                    continue
+                if getattr(topic, 'coalesce', 'all') == 'last':
+                    items = datas[-1:]
+                else:
+                    items = datas
+                for hdlr in tuple(hdlrs):
+                    batch = getattr(hdlr, 'batch', None)
+                    if batch is None:
+                        for data in items:
+                            hdlr(context, data)
+                    else:
+                        batch(context, items)
+
+    def drain(self, timeout=None):
+        """ dispatch the queued records, see
+            `TimeStepEventDispatcher.flush`.
+
+            `timeout` is ignored, the records are dispatched in the
+            calling thread.
+        """
+        self.flush()
+
+
+class HandlerStats:
+    """ Call count and wall time of a handler, see
+        `ProfilingEventDispatcher`.
+
+        + `path`: the path of the `simpy_events.manager.NameSpace`
+          holding the topic (or `None`)
+        + `topic`: the name of the `simpy_events.manager.Topic` (or
+          `None` if the topic is not linked to a `Topic`)
+        + `hook`: the dispatched hook
+        + `handler`: the handler
+        + `calls`: the number of calls
+        + `total_ns`, `max_ns`: cumulative and max wall time of the
+          calls in nanoseconds
+    """
+    __slots__ = ('path', 'topic', 'hook', 'handler', 'calls', 'total_ns',
+                 'max_ns', '_topic')
+
+    def __init__(self, topic, hook, handler):
+        owner = getattr(topic, 'owner', None)
+        if owner is None:
+            self.path = self.topic = None
+        else:
+            self.path = owner.ns.path
+            self.topic = owner.name
+        self.hook = hook
+        self.handler = handler
+        self.calls = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        # keep the topic alive as its id is used as a key (as well as
+        # the handler)
+        self._topic = topic
+
+    @property
+    def key(self):
+        """ (read only) `(path, topic, hook, name)` identifying the
+            handler, see `HandlerStats.name`.
+        """
+        return (self.path, self.topic, self.hook, self.name)
+
+    @property
+    def name(self):
+        """ (read only) the qualified name of the handler """
+        handler = self.handler
+        for attr in ('handler', 'batch', 'vectorized'):
+            # handler wrappers, ex: `Offload`
+            handler = getattr(handler, attr, handler)
+        return getattr(handler, '__qualname__', None) or repr(handler)
+
+    @property
+    def mean_ns(self):
+        """ (read only) the mean wall time of the calls (nanoseconds) """
+        return self.total_ns / self.calls if self.calls else 0.
+
+
+def _forget(routes, key, ref):
+    # forget the routes of a garbage collected `Topics`, see
+    # `ProfilingEventDispatcher._route`
+    routes.pop(key, None)
+
+
+def _profile(stat, fct, context, data):
+    # call `fct(context, data)` and record it in `stat`
+    start = perf_counter_ns()
+    try:
+        fct(context, data)
+    finally:
+        elapsed = perf_counter_ns() - start
+        stat.calls += 1
+        stat.total_ns += elapsed
+        if elapsed > stat.max_ns:
+            stat.max_ns = elapsed
+
+
+def _profile_each(route, context, datas):
+    # call the handlers of `route` for each item in `datas`, item by
+    # item (see `simpy_events.event.EventDispatcher.dispatch_many`)
+    for data in datas:
+        for hdlr, stat in route:
+            _profile(stat, hdlr, context, data)
+
+
+class ProfilingEventDispatcher(EventDispatcher):
+    """ `EventDispatcher` recording the call count and wall time of
+        each handler.
+
+        It can be used instead of `simpy_events.event.EventDispatcher`,
+        for instance as the dispatcher of a
+        `simpy_events.manager.RootNameSpace` ::
+
+            dispatcher = ProfilingEventDispatcher()
+            root = RootNameSpace(dispatcher=dispatcher)
+            [...]
+            env.run()
+            print(dispatcher.format_report(limit=10))
+
+        The handlers are called as with
+        `simpy_events.event.EventDispatcher`, and a `HandlerStats`
+        object is kept for each handler of each topic and hook, the
+        handlers are identified by namespace path, topic name and hook
+        (see `HandlerStats.key`).
+
+        The wall time is measured using `time.perf_counter_ns`.
+
+        `ProfilingEventDispatcher.dispatch_many` and
+        `ProfilingEventDispatcher.dispatch_columns` keep the semantics
+        of `simpy_events.event.EventDispatcher`, a call of a *batch*
+        or *vectorized* handler counts as one call.
+
+        The route of a hook, i.e the handlers with their
+        `HandlerStats`, is cached for each `simpy_events.event.Topics`
+        until its routing table changes (see
+        `simpy_events.event.Topics.handlers`), so a dispatch only
+        updates the counters of the handlers.
+    """
+    handlers_only = True
+
+    def __init__(self, context_type=None):
+        """ initializes a new `ProfilingEventDispatcher`
+
+            `context_type`: see `simpy_events.event.EventDispatcher`
+        """
+        super().__init__(context_type=context_type)
+        self._stats = {}
+        # (weakref to the `Topics`, {hook: (handlers, route)}) by id of
+        # the `Topics`
+        self._routes = {}
+
+    def _route(self, event, hook):
+        # return the route of `hook` for `event`, i.e a tuple of
+        # (handler, `HandlerStats`) in the order of the routing table
+        topics = event.topics
+        handlers = topics.handlers(hook)
+        if not handlers:
+            return ()
+        routes = self._routes
+        entry = routes.get(id(topics))
+        if entry is None:
+            entry = routes[id(topics)] = (
+                weakref.ref(topics, partial(_forget, routes, id(topics))),
+                {})
+        cached = entry[1].get(hook)
+        if cached is not None and cached[0] is handlers:
+            return cached[1]
+        # the topic of each handler is needed to identify it
+        stats = self._stats
+        route = []
+        for topic in topics:
+            hdlrs = topic.get(hook)
+            if hdlrs:
+                for hdlr in hdlrs:
+                    # the handler may not be hashable, `HandlerStats`
+                    # keeps it alive so its id remains valid
+                    key = (id(topic), hook, id(hdlr))
+                    stat = stats.get(key)
+                    if stat is None:
+                        stat = stats[key] = HandlerStats(topic, hook, hdlr)
+                    route.append((hdlr, stat))
+        route = tuple(route)
+        entry[1][hook] = (handlers, route)
+        return route
+
+    def _context(self, event, hook):
+        # return the context given to the handlers
+        context_type = self.context_type
+        if context_type is None:
+            return event.context(hook)
+        return context_type(event=event, hook=hook)
+
+    def dispatch(self, event, hook, data):
+        """ dispatch the event to the handlers in `Event.topics`.
+
+            see `simpy_events.event.EventDispatcher.dispatch`, the call
+            count and wall time of each handler are recorded.
+        """
+        route = self._route(event, hook)
+        if route:
+            context = self._context(event, hook)
+            for hdlr, stat in route:
+                start = perf_counter_ns()
+                try:
+                    hdlr(context, data)
+                finally:
+                    elapsed = perf_counter_ns() - start
+                    stat.calls += 1
+                    stat.total_ns += elapsed
+                    if elapsed > stat.max_ns:
+                        stat.max_ns = elapsed
+
+    def dispatch_many(self, event, hook, datas):
+        """ dispatch the event once for each item in `datas`.
+
+            see `simpy_events.event.EventDispatcher.dispatch_many`, the
+            call count and wall time of each handler are recorded.
+        """
+        route = self._route(event, hook)
+        if route:
+            if not isinstance(datas, (list, tuple)):
+                datas = list(datas)
+            if not datas:
+                return
+            context = self._context(event, hook)
+            start = 0
+            for index, (hdlr, stat) in enumerate(route):
+                batch = getattr(hdlr, 'batch', None)
+                if batch is not None:
+                    if start < index:
+                        _profile_each(route[start:index], context, datas)
+                    start = index + 1
+                    _profile(stat, batch, context, datas)
+            if start < len(route):
+                _profile_each(route[start:], context, datas)
+
+    def dispatch_columns(self, event, hook, columns):
+        """ dispatch the event once for each row in `columns`.
+
+            see `simpy_events.event.EventDispatcher.dispatch_columns`,
+            the call count and wall time of each handler are recorded.
+        """
+        route = self._route(event, hook)
+        if route and len(columns):
+            context = self._context(event, hook)
+            rows = None
+            start = 0
+            for index, (hdlr, stat) in enumerate(route):
+                vectorized = getattr(hdlr, 'vectorized', None)
+                batch = getattr(hdlr, 'batch', None)
+                if vectorized is None and batch is None:
+                    continue
+                if start < index:
+                    if rows is None:
+                        rows = columns.rows()
+                    _profile_each(route[start:index], context, rows)
+                start = index + 1
+                if vectorized is not None:
+                    _profile(stat, vectorized, context, columns)
+                else:
+                    if rows is None:
+                        rows = columns.rows()
+                    _profile(stat, batch, context, rows)
+            if start < len(route):
+                if rows is None:
+                    rows = columns.rows()
+                _profile_each(route[start:], context, rows)
+
+    def report(self, sort='total_ns'):
+        """ return the `list` of `HandlerStats` objects
+
+            the list is sorted by decreasing `sort` attribute of the
+            `HandlerStats` objects ('total_ns' by default, 'calls',
+            'max_ns', 'mean_ns').
+        """
+        return sorted(self._stats.values(),
+                      key=lambda stat: getattr(stat, sort), reverse=True)
+
+    def format_report(self, sort='total_ns', limit=None):
+        """ return a text table of `ProfilingEventDispatcher.report`
+
+            `limit` is an optional maximum number of handlers.
+        """
+        lines = [f'{"calls":>10} {"total ms":>12} {"mean us":>10} '
+                 f'{"max us":>10}  handler']
+        for stat in self.report(sort)[:limit]:
+            path, topic, hook, name = stat.key
+            if topic is not None:
+                name = f'{path or ""}{NameSpace.separator}{topic} ' \
+                    f'[{hook}] {name}'
+            else:
+                name = f'[{hook}] {name}'
+            lines.append(f'{stat.calls:>10} {stat.total_ns / 1e6:>12.3f} '
+                         f'{stat.mean_ns / 1e3:>10.3f} '
+                         f'{stat.max_ns / 1e3:>10.3f}  {name}')
+        return '\n'.join(lines)
+
+    def reset(self):
+        """ discard the recorded `HandlerStats` """
+        self._stats.clear()
+        self._routes.clear()
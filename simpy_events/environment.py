@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from heapq import heappop
+import simpy
+from simpy.core import EmptySchedule, StopSimulation
+
+
+class Environment(simpy.Environment):
+    """ `simpy.Environment` dispatching `Event` hooks natively.
+
+        By default `simpy_events.event.Event.__call__` replaces the
+        `callbacks` list of the `simpy.events.Event` object by a
+        `simpy_events.event.Callbacks` object, so 'before', 'callbacks'
+        and 'after' hooks are called by `simpy` when it iterates over
+        the callbacks.
+
+        When the `simpy.events.Event` belongs to an `Environment`, the
+        `simpy_events.event.Event` instances are instead stored in a
+        `simpy_events` list attribute of the `simpy.events.Event`
+        object (see `Environment.attach_event`), and dispatched directly
+        by `Environment.step`:
+
+        + **before**: for each `simpy_events.event.Event`, just before
+          the callbacks are called
+
+        + **callbacks**: a callable is added to the `callbacks` list, as
+          for `simpy_events.event.Callbacks`
+
+        + **after**: for each `simpy_events.event.Event`, just after the
+          callbacks are called
+
+        This doesn't change the way `simpy_events.event.Event` is used,
+        for ex ::
+
+            env = Environment()
+            something_happens = Event(name='important', context='test')
+
+            def my_process(env):
+                [...]
+                yield something_happens(env.timeout(1))
+    """
+    def attach_event(self, event, evt, position=None):
+        """ attach the `simpy_events.event.Event` `evt` to `event`
+
+            `event` is a `simpy.events.Event` object created from this
+            `Environment`.
+
+            `position` is an optional `(hooks, callbacks)` pair of
+            indexes, see `simpy_events.event.Callbacks.position`. By
+            default `evt` is attached after the `simpy_events.event.Event`
+            instances already attached and its 'callbacks' hook is
+            appended to the callbacks.
+
+            .. seealso:: `simpy_events.event.Event.__call__`
+        """
+        callbacks = evt._get_hooks()[1]
+        events = event.__dict__.get('simpy_events')
+        if events is None:
+            event.simpy_events = [evt]
+            if position is None:
+                event.callbacks.append(callbacks)
+            else:
+                event.callbacks.insert(position[1], callbacks)
+        elif position is None:
+            events.append(evt)
+            event.callbacks.append(callbacks)
+        else:
+            index, cb_index = position
+            events.insert(index, evt)
+            event.callbacks.insert(cb_index, callbacks)
+
+    def step(self):
+        """ Process the next event, see `simpy.Environment.step`.
+
+            dispatches the 'before' and 'after' hooks of the
+            `simpy_events.event.Event` instances attached to the event,
+            respectively before and after its callbacks are called.
+
+            .. note:: as for `simpy_events.event.Callbacks`, the 'after'
+                hooks are not dispatched if the simulation is stopped by
+                one of the callbacks (`simpy.core.StopSimulation`).
+        """
+        try:
+            self._now, _, _, event = heappop(self._queue)
+        except IndexError:
+            raise EmptySchedule from None
+
+        # Process callbacks of the event. Set the events callbacks to None
+        # immediately to prevent concurrent modifications.
+        callbacks, event.callbacks = event.callbacks, None
+        events = event.__dict__.pop('simpy_events', None)
+        if events is not None:
+            for evt in events:
+                evt.dispatch('before', event)
+        try:
+            for callback in callbacks:
+                callback(event)
+        except StopSimulation:
+            # Reassociate any remaining callbacks with the event and
+            # reschedule the event to be processed when the simulation
+            # resumes.
+            event.callbacks = callbacks[callbacks.index(callback) + 1:]
+            self.schedule(event, -1)
+            raise
+        if events is not None:
+            for evt in events:
+                evt.dispatch('after', event)
+
+        if not event._ok and not hasattr(event, '_defused'):
+            # The event has failed and has not been defused. Crash the
+            # environment.
+            # Create a copy of the failure exception with a new traceback.
+            exc = type(event._value)(*event._value.args)
+            exc.__cause__ = event._value
+            raise exc
@@ -1,9 +1,95 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
+from .columns import Columns
 import collections
+import weakref
+from functools import partial
 from itertools import chain
 
 
+# hooks dispatched when a `simpy.events.Event` is processed
+_simpy_hooks = ('before', 'callbacks', 'after')
+
+# version of the handlers routing tables cached by `Topics`
+_version = 0
+
+# `Event` instances holding deferred `simpy.events.Event` objects
+_pending_events = weakref.WeakSet()
+
+
+def invalidate_handlers():
+    """ invalidate the handlers routing tables cached by `Topics`.
+
+        This must be called every time a *versioned* topic or sequence
+        of handlers is modified (see `Topics`), so the next dispatch
+        rebuilds the routing table for the `Event` instances.
+
+        The `Event` instances holding deferred `simpy.events.Event`
+        objects are also given a chance to attach them, since handlers
+        may have been added (see `Event.__call__`).
+    """
+    global _version
+    _version += 1
+    _bind_pending_events()
+
+
+class Epoch:
+    """ epoch of the values resolved from `Event.source`
+
+        Each `Event` with a source keeps the `Epoch` of the source (its
+        `epoch` attribute if it has one, otherwise a global `Epoch`, see
+        `invalidate_properties`) and the value of `Epoch.value` when it
+        resolved `Event.enabled` and `Event.dispatcher`: they're
+        resolved again when `Epoch.value` has changed.
+
+        A hierarchy of sources shares an `Epoch` so invalidating the
+        values resolved from it doesn't affect the other sources.
+
+        .. seealso:: `simpy_events.manager.RootNameSpace`
+    """
+    __slots__ = ('value',)
+
+    def __init__(self):
+        """ initializes a new `Epoch` """
+        self.value = 0
+
+    def invalidate(self):
+        """ invalidate the values resolved from the sources of `Epoch`
+
+            This must be called every time the `Event.enabled` or
+            `Event.dispatcher` value provided by a source may have
+            changed, so the `Event` instances resolve them again the
+            next time they are used. The cost doesn't depend on the
+            number of `Event` instances.
+
+            The `Event` instances holding deferred `simpy.events.Event`
+            objects are also given a chance to attach them (see
+            `Event.__call__`).
+        """
+        self.value += 1
+        _bind_pending_events()
+
+
+# `Epoch` of the sources which don't have their own `epoch`
+_epoch = Epoch()
+
+
+def invalidate_properties():
+    """ invalidate the values resolved from the sources without `epoch`
+
+        i.e the sources which don't provide their own `Epoch` (see
+        `Epoch.invalidate`).
+    """
+    _epoch.invalidate()
+
+
+def _bind_pending_events():
+    # see `Event._bind_pending`
+    if _pending_events:
+        for event in list(_pending_events):
+            event._bind_pending()
+
+
 class Context:
     """ context object forwarded to event handlers by `EventDispatcher`
 
@@ -11,6 +97,12 @@ class Context:
 
         + `event`, the `Event` instance
         + `hook`, the name of the hook
+
+        A new `Context` is created for each dispatch when the
+        `EventDispatcher` is configured with `context_type=Context`,
+        handlers are then free to add their own attributes to it.
+
+        .. seealso:: `HookContext`
     """
     def __init__(self, **attributes):
         """ initializes a new `Context` with keyword arguments
@@ -20,12 +112,70 @@ class Context:
         self.__dict__.update(attributes)
 
 
+class HookContext:
+    """ compact context object forwarded to handlers by `EventDispatcher`
+
+        contains following attributes:
+
+        + `event`, the `Event` instance
+        + `hook`, the name of the hook
+
+        A `HookContext` is created once for a given `Event` and `hook`
+        and then reused for each dispatch (see `Event.context`), so
+        handlers must not modify it. It uses `__slots__`, which means
+        no other attribute can be added to it.
+
+        .. seealso:: `Context`
+    """
+    __slots__ = ('event', 'hook')
+
+    def __init__(self, event, hook):
+        """ initializes a new `HookContext` for `event` and `hook` """
+        self.event = event
+        self.hook = hook
+
+
 class EventDispatcher:
     """ Responsible for dispatching an event to `Event`'s handlers
 
         uses the `Event`'s sequence of `topics` to get all handlers for
         a given `hook` and call them sequentially.
+
+        `EventDispatcher.handlers_only` tells dispatching a `hook` has
+        no effect if the `Event` has no handler for it, this allows
+        `Event.__call__` to skip `simpy.events.Event` objects. It
+        defaults to `False` in subclasses overriding `dispatch`.
     """
+    context_type = None
+    handlers_only = True
+
+    def __init_subclass__(cls, **kwargs):
+        # a subclass overriding `dispatch` may do something even if
+        # there is no handler, unless it states otherwise, and is
+        # expected to dispatch each item in `dispatch_many` and each
+        # row in `dispatch_columns`.
+        super().__init_subclass__(**kwargs)
+        if 'dispatch' in cls.__dict__:
+            if 'handlers_only' not in cls.__dict__:
+                cls.handlers_only = False
+            if 'dispatch_many' not in cls.__dict__:
+                cls.dispatch_many = EventDispatcher.dispatch_each
+            if 'dispatch_columns' not in cls.__dict__:
+                cls.dispatch_columns = EventDispatcher.dispatch_rows
+
+    def __init__(self, context_type=None):
+        """ initializes a new `EventDispatcher`
+
+            `context_type` is an optional type used to create a new
+            context object for each dispatch, it is called with `event`
+            and `hook` keyword args, ex: `Context`. This allows
+            handlers to add their own attributes to the context.
+
+            By default (`None`) the `HookContext` of the `Event` is
+            reused (see `Event.context`).
+        """
+        self.context_type = context_type
+
     def dispatch(self, event, hook, data):
         """ dispatch the event to each topic in `Event.topics`.
 
@@ -41,24 +191,381 @@ class EventDispatcher:
             a sequence of handlers for a given `hook`. The `topic`
             will be ignored if it doesn't contain the `hook` key.
 
-            For each sequence of handlers found for `hook`, a `tuple` is
-            created to ensure consistency while iterating (it's likely
-            handlers are removed / added while dispatching).
+            The handlers are obtained from `Topics.handlers` as a flat
+            `tuple`, which ensures consistency while iterating (it's
+            likely handlers are removed / added while dispatching).
 
             Handlers are then called sequentially with the following
             arguments:
 
-            + `context`, a `Context` object
+            + `context`, a `HookContext` object, or a new object
+              created by `EventDispatcher.context_type` if not `None`
             + `data`
+
+            Nothing is created if there is no handler for `hook`.
         """
-        context = Context(
-            event=event,
-            hook=hook,
-        )
-        for topic in [tuple(topic.get(hook, ())) for topic in event.topics]:
-            for hdlr in topic:
+        handlers = event.topics.handlers(hook)
+        if handlers:
+            context_type = self.context_type
+            if context_type is None:
+                context = event.context(hook)
+            else:
+                context = context_type(event=event, hook=hook)
+            for hdlr in handlers:
                 hdlr(context, data)
 
+    def dispatch_many(self, event, hook, datas):
+        """ dispatch the event once for each item in `datas`.
+
+            args:
+
+            + `event`, the `Event` instance
+            + `hook`, the name of the hook to dispatch
+            + `datas`, an iterable of data associated to the event
+
+            .. seealso:: `Event.dispatch_many`
+
+            This is equivalent to calling `EventDispatcher.dispatch` for
+            each item in `datas`, except the handlers and the context are
+            obtained only once, and a handler having a `batch` attribute
+            (see `BatchHandler`) is called once as
+            `batch(context, datas)`, where `datas` is a `list` or a
+            `tuple`.
+
+            The other handlers are called for each item in the same
+            order as `EventDispatcher.dispatch`, i.e item by item, each
+            item being given to the handlers one after the other. A
+            *batch* handler is called at its position: the handlers
+            before it are called for all the items before it's called.
+
+            .. note:: subclasses overriding `EventDispatcher.dispatch`
+                but not `EventDispatcher.dispatch_many` call `dispatch`
+                for each item (see `EventDispatcher.dispatch_each`).
+        """
+        handlers = event.topics.handlers(hook)
+        if handlers:
+            if not isinstance(datas, (list, tuple)):
+                datas = list(datas)
+            if not datas:
+                return
+            context_type = self.context_type
+            if context_type is None:
+                context = event.context(hook)
+            else:
+                context = context_type(event=event, hook=hook)
+            start = 0
+            for index, hdlr in enumerate(handlers):
+                batch = getattr(hdlr, 'batch', None)
+                if batch is not None:
+                    if start < index:
+                        _call_each(handlers[start:index], context, datas)
+                    start = index + 1
+                    batch(context, datas)
+            if start < len(handlers):
+                _call_each(handlers[start:], context, datas)
+
+    def dispatch_columns(self, event, hook, columns):
+        """ dispatch the event once for each row in `columns`.
+
+            args:
+
+            + `event`, the `Event` instance
+            + `hook`, the name of the hook to dispatch
+            + `columns`, a `simpy_events.columns.Columns` object
+
+            .. seealso:: `Event.dispatch_columns`
+
+            This is similar to `EventDispatcher.dispatch_many` where
+            the items are the rows of `columns`, except handlers having
+            a `vectorized` attribute (see
+            `simpy_events.columns.VectorHandler`) are called once as
+            `vectorized(context, columns)` at their position.
+
+            The rows are only created if there is a handler which is not
+            *vectorized*.
+        """
+        handlers = event.topics.handlers(hook)
+        if handlers and len(columns):
+            context_type = self.context_type
+            if context_type is None:
+                context = event.context(hook)
+            else:
+                context = context_type(event=event, hook=hook)
+            rows = None
+            start = 0
+            for index, hdlr in enumerate(handlers):
+                vectorized = getattr(hdlr, 'vectorized', None)
+                batch = getattr(hdlr, 'batch', None)
+                if vectorized is None and batch is None:
+                    continue
+                if start < index:
+                    if rows is None:
+                        rows = columns.rows()
+                    _call_each(handlers[start:index], context, rows)
+                start = index + 1
+                if vectorized is not None:
+                    vectorized(context, columns)
+                else:
+                    if rows is None:
+                        rows = columns.rows()
+                    batch(context, rows)
+            if start < len(handlers):
+                if rows is None:
+                    rows = columns.rows()
+                _call_each(handlers[start:], context, rows)
+
+    def dispatch_each(self, event, hook, datas):
+        """ call `EventDispatcher.dispatch` for each item in `datas` """
+        dispatch = self.dispatch
+        for data in datas:
+            dispatch(event, hook, data)
+
+    def dispatch_rows(self, event, hook, columns):
+        """ call `EventDispatcher.dispatch` for each row in `columns` """
+        dispatch = self.dispatch
+        for row in columns:
+            dispatch(event, hook, row)
+
+
+def _call_each(handlers, context, datas):
+    # call `handlers` for each item in `datas`, item by item (see
+    # `EventDispatcher.dispatch_many`)
+    if len(handlers) == 1:
+        hdlr, = handlers
+        for data in datas:
+            hdlr(context, data)
+    else:
+        for data in datas:
+            for hdlr in handlers:
+                hdlr(context, data)
+
+
+def dispatch_batch(hook, events):
+    """ call each handler of `hook` once for a sequence of `Event`
+
+        The handlers subscribed to `hook` (ex: 'enable_batch') are
+        collected from the `Event.topics` of the `Event` objects in
+        `events` which are enabled and have a dispatcher. Then each
+        handler is called once as `handler(context, events)` where
+        `context` is a `Context` with a `hook` attribute and `events` is
+        the `list` of the `Event` objects it's subscribed for, in the
+        order of `events`.
+
+        The handlers are called directly (not through `Event.dispatcher`)
+        since the `Event` objects may use different dispatchers.
+
+        This is used by `simpy_events.manager.NameSpace` to notify the
+        **enable_batch** / **disable_batch** hooks, so toggling a large
+        number of `Event` objects costs a single call per handler.
+    """
+    groups = {}
+    for event in events:
+        if not event.enabled or event.dispatcher is None:
+            continue
+        for hdlr in event.topics.handlers(hook):
+            try:
+                evts = groups[id(hdlr)][1]
+            except KeyError:
+                groups[id(hdlr)] = (hdlr, [event])
+            else:
+                # a handler may be subscribed several times
+                if evts[-1] is not event:
+                    evts.append(event)
+    for hdlr, evts in groups.values():
+        hdlr(Context(hook=hook), evts)
+
+
+class BatchHandler:
+    """ Turn a function handling a sequence of data into a handler.
+
+        `BatchHandler` wraps a function `batch(context, datas)`, it can
+        be used as a decorator, ex ::
+
+            @topic.after
+            @BatchHandler
+            def received(context, datas):
+                for data in datas:
+                    [...]
+
+        When the handlers are dispatched with
+        `EventDispatcher.dispatch_many` the function is called once with
+        the whole sequence of data. Otherwise, when the `BatchHandler`
+        is called as a regular handler, the function is called with a
+        `tuple` containing the single data item.
+    """
+    __slots__ = ('batch',)
+
+    def __init__(self, batch):
+        """ `batch` is the function called as `batch(context, datas)` """
+        self.batch = batch
+
+    def __call__(self, context, data):
+        self.batch(context, (data,))
+
+
+class Topics(collections.MutableSequence):
+    """ Holds the sequence of topics of an `Event` (`Event.topics`).
+
+        `Topics` behaves like a `list` of topics, each topic being a
+        mapping of hook names to sequences of handlers.
+
+        It also caches a routing table, that is a flat `tuple` of all
+        the handlers for a given hook in the order of the topics. The
+        routing table of a hook is rebuilt when the `Topics` sequence
+        is modified or when `invalidate_handlers` has been called since
+        it was cached.
+
+        When the `Topics` sequence belongs to an `Event` (`owner`), the
+        `Event` is notified when the sequence is modified, so deferred
+        `simpy.events.Event` objects can be attached if handlers were
+        added (see `Event.__call__`).
+
+        A `Topics` created with a `SharedTopics` list uses it by
+        reference until it's modified (copy on write).
+
+        .. note:: the routing table is cached only if the topics and
+            their sequences of handlers for the hook are *versioned*,
+            i.e they have a `versioned` attribute which is `True` and
+            call `invalidate_handlers` when they are modified, (see
+            `simpy_events.manager.Topic`). Otherwise, for ex. plain
+            `dict` or `list` objects, the routing table is built every
+            time it is requested.
+    """
+    def __init__(self, topics=(), owner=None, shared=None):
+        """ initializes a new `Topics` with an optional `topics` iterable
+
+            `owner` is the optional `Event` the `Topics` belongs to.
+
+            `shared` is an optional `SharedTopics` used by reference
+            instead of `topics`, until the `Topics` is modified.
+        """
+        if shared is None:
+            self._lst = list(topics)
+        else:
+            self._lst = shared
+        self._shared = shared
+        self._owner = owner
+        self._routes = {}
+        self._version = _version
+
+    @property
+    def shared(self):
+        """ (read only) the `SharedTopics` used by reference, if any
+
+            `None` once the `Topics` has been modified.
+        """
+        return self._shared
+
+    def _write(self):
+        # copy the shared list before it's modified, see `SharedTopics`
+        shared = self._shared
+        if shared is not None:
+            self._lst = list(shared)
+            self._shared = None
+            shared.copies.add(self)
+
+    def _changed(self):
+        # clear the routing table and notify owner
+        self._routes.clear()
+        owner = self._owner
+        if owner is not None and owner._pending is not None:
+            owner._bind_pending()
+
+    def __getitem__(self, index):
+        return self._lst[index]
+
+    def __setitem__(self, index, value):
+        if self._shared is not None:
+            self._write()
+        self._lst[index] = value
+        self._changed()
+
+    def __delitem__(self, index):
+        if self._shared is not None:
+            self._write()
+        del self._lst[index]
+        self._changed()
+
+    def __len__(self):
+        return len(self._lst)
+
+    def __iter__(self):
+        return iter(self._lst)
+
+    def insert(self, index, value):
+        if self._shared is not None:
+            self._write()
+        self._lst.insert(index, value)
+        self._changed()
+
+    def handlers(self, hook):
+        """ return a `tuple` of all the handlers for `hook`.
+
+            The handlers are taken from each topic that contains the
+            `hook` key, in the order of the topics.
+
+            .. seealso:: `Topics` for details about the routing table.
+        """
+        routes = self._routes
+        if self._version != _version:
+            routes.clear()
+            self._version = _version
+        else:
+            try:
+                return routes[hook]
+            except KeyError:
+                pass
+
+        handlers = []
+        versioned = True
+        for topic in self._lst:
+            hdlrs = topic.get(hook)
+            if not getattr(topic, 'versioned', False):
+                versioned = False
+            if hdlrs:
+                if not getattr(hdlrs, 'versioned', False):
+                    versioned = False
+                handlers.extend(hdlrs)
+
+        handlers = tuple(handlers)
+        if versioned:
+            routes[hook] = handlers
+        return handlers
+
+    def has_handlers(self, hooks):
+        """ return `True` if there may be handlers for any of `hooks`
+
+            `True` is also returned if the routing table of a hook
+            cannot be cached, since handlers may be added to not
+            *versioned* topics without notice.
+        """
+        for hook in hooks:
+            if self.handlers(hook) or hook not in self._routes:
+                return True
+        return False
+
+
+class SharedTopics(list):
+    """ `list` of topics shared by reference by several `Topics`
+
+        A `Topics` created with a `SharedTopics` (for ex. by setting
+        `Event.topics`) uses it as it is until the `Topics` is modified:
+        the list is then copied (copy on write) and the `Topics` is
+        added to `SharedTopics.copies`, so the holder of the
+        `SharedTopics` can keep the copies up to date (see
+        `simpy_events.manager.EventType.add_topic`).
+
+        The holder must call `invalidate_handlers` when the
+        `SharedTopics` is modified, since the routing tables of the
+        `Topics` objects sharing it are not notified otherwise.
+    """
+    def __init__(self, topics=()):
+        """ initializes a new `SharedTopics` with an optional `topics`
+            iterable
+        """
+        super().__init__(topics)
+        self.copies = weakref.WeakSet()
+
 
 class Callbacks(collections.MutableSequence):
     """ Replace the 'callbacks' list in `simpy.events.Event` objects.
@@ -73,6 +580,9 @@ class Callbacks(collections.MutableSequence):
         `simpy` (that is when the items from its "callbacks" list are
         called).
 
+        `Callbacks` uses `__slots__` since an instance is created for
+        each `simpy.events.Event` object.
+
         `Callbacks` is intended to replace the original `callbacks` list
         of the `simpy.events.Event` object When iterated, it chains the
         functions attached to `before`, `callbacks` and `after`.
@@ -103,7 +613,9 @@ class Callbacks(collections.MutableSequence):
             - cross_red_light's after
             - get_caught's after
     """
-    def __init__(self, event, before, callbacks, after):
+    __slots__ = ('before', 'callbacks', 'after')
+
+    def __init__(self, event, before, callbacks, after, position=None):
         """ Attach the `Callbacks` obj to a `simpy.events.Event` obj.
 
             `event` is the `simpy.events.Event` object whose `callbacks`
@@ -113,6 +625,11 @@ class Callbacks(collections.MutableSequence):
             be called respectively before, when and after the `event` is
             actually processed by `simpy`.
 
+            `position` is an optional `(hooks, callbacks)` pair of
+            indexes as returned by `Callbacks.position`: `before` and
+            `after` are then inserted at index `hooks` and `callbacks`
+            at index `callbacks` instead of being appended.
+
             .. note:: the current `event.callbacks` attribute may
                 already be a `Callbacks` object, see `Callbacks`
                 description for details.
@@ -127,9 +644,33 @@ class Callbacks(collections.MutableSequence):
             self.before = []
             self.after = []
 
-        self.before.append(before)
-        self.after.append(after)
-        self.callbacks.append(callbacks)
+        if position is None:
+            self.before.append(before)
+            self.after.append(after)
+            self.callbacks.append(callbacks)
+        else:
+            index, cb_index = position
+            self.before.insert(index, before)
+            self.after.insert(index, after)
+            self.callbacks.insert(cb_index, callbacks)
+
+    @staticmethod
+    def position(event):
+        """ return the `(hooks, callbacks)` position for `event`
+
+            `event` is a `simpy.events.Event` object, the position gives
+            the indexes at which a `Callbacks` object would append the
+            hooks, see `Callbacks.__init__`.
+
+            .. note:: if `event` is not wrapped by a `Callbacks` object,
+                the `hooks` index is the number of `Event` instances
+                natively attached to `event` (see
+                `simpy_events.environment.Environment`).
+        """
+        cbks = event.callbacks
+        if isinstance(cbks, Callbacks):
+            return len(cbks.before), len(cbks.callbacks)
+        return len(getattr(event, 'simpy_events', ())), len(cbks)
 
     def __getitem__(self, index):
         """ return callable item from 'callbacks' list """
@@ -157,8 +698,50 @@ class Callbacks(collections.MutableSequence):
             - 'before'
             - 'callbacks'
             - 'after'
+
+            when 'before' and 'after' contain a single item (i.e a
+            single `Event` is attached) a `list` iterator is returned
+            instead of chaining the lists.
         """
-        return iter(chain(self.before, self.callbacks, self.after))
+        before = self.before
+        after = self.after
+        if len(before) == 1 and len(after) == 1:
+            return iter([before[0], *self.callbacks, after[0]])
+        return chain(before, self.callbacks, after)
+
+
+class HookCounter:
+    """ Dispatch counters for a given hook, see `DispatchCounters`.
+
+        + `dispatches`: number of times the hook was dispatched
+        + `handler_calls`: number of handler calls caused by those
+          dispatches (i.e the number of handlers at the time of each
+          dispatch)
+    """
+    __slots__ = ('dispatches', 'handler_calls')
+
+    def __init__(self):
+        self.dispatches = 0
+        self.handler_calls = 0
+
+
+class DispatchCounters:
+    """ Hold a `HookCounter` for each hook dispatched by `Event`.
+
+        The `HookCounter` objects are stored in attributes named after
+        the hooks ('before', 'callbacks', 'after', 'enable', 'disable'),
+        and any other hook is counted by `other`.
+
+        A `DispatchCounters` object can be shared by several `Event`
+        instances (see `Event.counters`), ex:
+        `simpy_events.manager.EventType` counts the dispatches of the
+        events it creates.
+    """
+    __slots__ = _simpy_hooks + ('enable', 'disable', 'other')
+
+    def __init__(self):
+        for name in self.__slots__:
+            setattr(self, name, HookCounter())
 
 
 class Event:
@@ -173,6 +756,9 @@ class Event:
 
         + **disable**: triggered when `Event.enabled` is set to to `False`
 
+        + **enable_batch** / **disable_batch**: the same for a set of
+          `Event` objects, see `dispatch_batch`
+
         + **before**: just before the `simpy.events.Event` is processed
           by `simpy`
 
@@ -202,9 +788,9 @@ class Event:
         **handlers**:
 
         Handlers are attached to an `Event` using the `Event.topics`
-        list, which is expected to contain a sequence of mappings, each
-        mapping holding itself a sequence of callable handlers for a
-        given `hook`, for ex ::
+        sequence (`Topics`), which is expected to contain a sequence of
+        mappings, each mapping holding itself a sequence of callable
+        handlers for a given `hook`, for ex ::
 
             evt = Event()
 
@@ -233,6 +819,21 @@ class Event:
         It also allows to notify handlers when the `Event` is enabled or
         disabled, for instance when adding / removing an `Event` in the
         simulation.
+
+        `Event.sample_every` allows to only dispatch the hooks for a
+        sample of the `simpy.events.Event` objects given to
+        `Event.__call__`.
+
+        `Event.counters` is `None` by default, it can be set to a
+        `DispatchCounters` object to count the dispatched hooks (see
+        `Event.dispatch`).
+
+        `Event.source` allows to resolve `Event.enabled` and
+        `Event.dispatcher` lazily from another object instead of setting
+        them on each `Event`.
+
+        `Event.owner` is the object managing the `Event`, if any (for
+        ex. `simpy_events.manager.EventType`), see `Event.dispose`.
     """
     def __init__(self, **metadata):
         """ Initialized a new `Event` object with optional `metadata`
@@ -240,9 +841,71 @@ class Event:
             `metadata` keyword args are kept in `Event.metadata`.
         """
         self.metadata = metadata
-        self.topics = []
-        self.dispatcher = None
+        self._topics = Topics(owner=self)
+        self._contexts = {}
+        self._hooks = None
+        self._pending = None
+        self._pending_limit = 0
+        self._dispatcher = None
         self._enabled = False
+        self._sample_every = 1
+        self._sample_count = 0
+        self._source = None
+        self._clock = _epoch
+        self._epoch = None
+        self._overrides = None
+        self.counters = None
+        self.owner = None
+
+    @property
+    def topics(self):
+        """ the sequence of topics (`Topics`) linked to the `Event`
+
+            setting `Event.topics` replaces its content by the items of
+            the provided iterable, or if it's a `SharedTopics` the
+            `Event` shares it by reference until `Event.topics` is
+            modified (copy on write).
+        """
+        return self._topics
+
+    @topics.setter
+    def topics(self, topics):
+        if isinstance(topics, SharedTopics):
+            self._topics = Topics(owner=self, shared=topics)
+            if self._pending is not None:
+                self._bind_pending()
+        else:
+            self._topics[:] = topics
+
+    @property
+    def dispatcher(self):
+        """ the dispatcher object used by `Event.dispatch`
+
+            .. seealso:: `EventDispatcher`
+        """
+        if self._source is not None and self._epoch != self._clock.value:
+            self._resolve()
+        return self._dispatcher
+
+    @dispatcher.setter
+    def dispatcher(self, dispatcher):
+        if self._source is not None:
+            self._override('dispatcher', dispatcher)
+        self._dispatcher = dispatcher
+        if self._pending is not None:
+            self._bind_pending()
+
+    def context(self, hook):
+        """ return the `HookContext` object for `hook`
+
+            The `HookContext` is created the first time it's requested
+            for a given `hook`, then the same object is returned.
+        """
+        try:
+            return self._contexts[hook]
+        except KeyError:
+            context = self._contexts[hook] = HookContext(self, hook)
+            return context
 
     @property
     def enabled(self):
@@ -257,18 +920,105 @@ class Event:
 
             .. seealso:: `Event.dispatch`
         """
+        if self._source is not None and self._epoch != self._clock.value:
+            self._resolve()
         return self._enabled
 
     @enabled.setter
     def enabled(self, value):
+        if self._source is not None:
+            self._override('enabled', value)
         if value != self._enabled:
             if value:
                 self._enabled = value
                 self.dispatch('enable')
+                if self._pending is not None:
+                    self._bind_pending()
             else:
                 self.dispatch('disable')
                 self._enabled = value
 
+    @property
+    def source(self):
+        """ object `Event.enabled` and `Event.dispatcher` are resolved from
+
+            `None` by default. Otherwise `source.resolve(name)` is
+            called to get the value of `Event.enabled` and
+            `Event.dispatcher` the first time the `Event` is used, then
+            again the first time it's used after the `Epoch` of the
+            source (`source.epoch` if it exists, otherwise
+            `invalidate_properties` applies) has been invalidated. In
+            between the resolved values are cached, so `Event.dispatch`
+            stays O(1).
+
+            Since the values are resolved lazily the **enable** and
+            **disable** hooks are not dispatched when they are changed
+            through the source. A value set on the `Event` overrides
+            the one of the source until `Event.source` is set again.
+
+            The current values are kept when `Event.source` is set to
+            `None`.
+
+            .. seealso:: `simpy_events.manager.RootNameSpace`
+        """
+        return self._source
+
+    @source.setter
+    def source(self, source):
+        if self._source is not None and self._epoch != self._clock.value:
+            self._resolve()
+        self._source = source
+        self._clock = getattr(source, 'epoch', _epoch)
+        self._epoch = None
+        self._overrides = None
+        if source is not None and self._pending is not None:
+            self._bind_pending()
+
+    def _resolve(self):
+        # resolve `Event.enabled` and `Event.dispatcher` from
+        # `Event.source` for the current epoch
+        source = self._source
+        self._enabled = source.resolve('enabled')
+        self._dispatcher = source.resolve('dispatcher')
+        overrides = self._overrides
+        if overrides is not None:
+            self._enabled = overrides.get('enabled', self._enabled)
+            self._dispatcher = overrides.get('dispatcher', self._dispatcher)
+        self._epoch = self._clock.value
+
+    def _override(self, name, value):
+        # keep a value set on the `Event` over the one of `Event.source`
+        if self._epoch != self._clock.value:
+            self._resolve()
+        if self._overrides is None:
+            self._overrides = {}
+        self._overrides[name] = value
+
+    @property
+    def sample_every(self):
+        """ only attach one of every `sample_every` `simpy.events.Event`
+
+            `Event.sample_every` is `1` by default, so the hooks are
+            dispatched for every `simpy.events.Event` given to
+            `Event.__call__`. Otherwise the first `simpy.events.Event`
+            is attached, then the next `sample_every - 1` ones are
+            returned untouched, and so on.
+
+            The counter is reset when `Event.sample_every` is set,
+            `ValueError` is raised if the value is not an `int` >= 1.
+
+            .. note:: the sampling only applies to `Event.__call__`,
+                `Event.dispatch` always dispatches the hook.
+        """
+        return self._sample_every
+
+    @sample_every.setter
+    def sample_every(self, value):
+        if not isinstance(value, int) or value < 1:
+            raise ValueError(f'sample_every must be an int >= 1: {value!r}')
+        self._sample_every = value
+        self._sample_count = 0
+
     def __call__(self, event):
         """ Automatically trigger the `Event` when `event` is processed.
 
@@ -286,10 +1036,30 @@ class Event:
             will be called when the `simpy.events.Event` is processed
             by `simpy`.
 
+            If the `simpy` environment supports it (i.e it has an
+            `attach_event` method, see
+            `simpy_events.environment.Environment`), the hooks are
+            attached natively instead.
+
             When the `simpy.events.Event` is processed, then calls
             `Event.dispatch` respectively for 'before', 'callbacks' and
             'after' hooks.
 
+            If `Event.sample_every` is greater than `1` the
+            `simpy.events.Event` objects which are not sampled are
+            returned untouched.
+
+            If nothing can be dispatched for those hooks at the moment,
+            i.e `Event.enabled` is `False`, `Event.dispatcher` is
+            `None` or there is no handler (see
+            `EventDispatcher.handlers_only`), the `simpy.events.Event`
+            is returned with its callbacks untouched and kept as
+            *pending*. The pending events which are not processed yet
+            are attached (in the order the `Event` instances were
+            called) as soon as `Event.enabled`, `Event.dispatcher`,
+            `Event.topics` or the handlers change so that hooks can be
+            dispatched.
+
             return the `simpy.events.Event` object.
 
             example usage in a typical `simpy` process ::
@@ -300,19 +1070,119 @@ class Event:
                     [...]
                     yield something_happens(env.timeout(1))
         """
-        # the partial function is intended to be called by simpy when
-        # the event is processed (i.e "f(event)") see class Callbacks
-        # for more details.
-        _dispatch = self.dispatch
-        hooks = []
-        for hook in ('before', 'callbacks', 'after'):
+        every = self._sample_every
+        if every != 1:
+            count = self._sample_count
+            self._sample_count = count + 1 if count + 1 < every else 0
+            if count:
+                return event
+        if self._dispatchable():
+            self._attach(event)
+        else:
+            self._defer(event)
+        return event
 
-            def dispatch(event, hook=hook):
-                _dispatch(hook, event)
+    def _attach(self, event, position=None):
+        # attach the hooks to the simpy `event`, natively if supported
+        # by the environment (see `simpy_events.environment`) or using
+        # a `Callbacks` object otherwise
+        attach_event = getattr(event.env, 'attach_event', None)
+        if attach_event is None:
+            event.callbacks = Callbacks(event, *self._get_hooks(),
+                                        position=position)
+        else:
+            attach_event(event, self, position)
 
-            hooks.append(dispatch)
-        event.callbacks = Callbacks(event, *hooks)
-        return event
+    def _get_hooks(self):
+        # the partial functions are intended to be called by simpy when
+        # the event is processed (i.e "f(event)") see class Callbacks
+        # for more details. They're created once and reused.
+        hooks = self._hooks
+        if hooks is None:
+            dispatch = self.dispatch
+            hooks = self._hooks = tuple(
+                partial(dispatch, hook) for hook in _simpy_hooks
+            )
+        return hooks
+
+    def _dispatchable(self):
+        # return whether 'before', 'callbacks' or 'after' may currently
+        # be dispatched
+        if self._source is not None and self._epoch != self._clock.value:
+            self._resolve()
+        if not self._enabled:
+            return False
+        dispatcher = self._dispatcher
+        if dispatcher is None:
+            return False
+        if getattr(dispatcher, 'handlers_only', False):
+            return self._topics.has_handlers(_simpy_hooks)
+        return True
+
+    def _defer(self, event):
+        # keep `event` with its current position in its callbacks so
+        # it can be attached later, see `Event._bind_pending`.
+        # processed events are removed once the number of pending
+        # events reaches `_pending_limit`.
+        position = Callbacks.position(event)
+        # the `Event` instances deferred on `event` are kept in order
+        # (a flag tells whether each one has been attached since), so
+        # the position can be adjusted for the ones attached meanwhile
+        deferred = event.__dict__.setdefault('simpy_events_deferred', [])
+        order = len(deferred)
+        attached = sum(deferred)
+        deferred.append(False)
+        pending = self._pending
+        if pending is None:
+            pending = self._pending = []
+            _pending_events.add(self)
+        elif len(pending) >= self._pending_limit:
+            pending[:] = [item for item in pending
+                          if item[0].callbacks is not None]
+            self._pending_limit = max(2 * len(pending), 8)
+        pending.append((event, position, order, attached))
+
+    def _bind_pending(self):
+        # attach the pending simpy events which are not processed yet
+        # if hooks can be dispatched, see `Event.__call__`.
+        if not self._dispatchable():
+            return
+        pending = self._pending
+        self._pending = None
+        _pending_events.discard(self)
+        for event, (index, cb_index), order, attached in pending:
+            if event.callbacks is not None:
+                # the `Event` instances deferred before this one and
+                # attached since then are inserted before it
+                deferred = event.simpy_events_deferred
+                offset = sum(deferred[:order]) - attached
+                deferred[order] = True
+                self._attach(event, (index + offset, cb_index + offset))
+
+    def dispose(self):
+        """ retire the `Event`
+
+            + `Event.enabled` is set to `False`, so **disable** is
+              dispatched if the `Event` was enabled
+
+            + the pending `simpy.events.Event` objects are dropped (see
+              `Event.__call__`)
+
+            + the `Event` is removed from `Event.owner` if any (i.e
+              `owner.remove(event)` is called, see
+              `simpy_events.manager.EventType.remove`)
+
+            The `simpy.events.Event` objects already attached are still
+            dispatched when they are processed if the `Event` is enabled
+            again.
+        """
+        self.enabled = False
+        if self._pending is not None:
+            self._pending = None
+            _pending_events.discard(self)
+        owner = self.owner
+        if owner is not None:
+            owner.remove(self)
 
     def dispatch(self, hook, data=None):
         """ immediately dispatch `hook` for this `Event`.
@@ -332,8 +1202,107 @@ class Event:
             + `event`: the `Event` instance
             + `hook`
             + `data`
+
+            If `Event.counters` is not `None` the `HookCounter` of `hook`
+            is updated before the dispatch.
         """
+        if self._source is not None and self._epoch != self._clock.value:
+            self._resolve()
         if self._enabled:
-            dispatcher = self.dispatcher
+            dispatcher = self._dispatcher
             if dispatcher is not None:
+                counters = self.counters
+                if counters is not None:
+                    counter = getattr(counters, hook, counters.other)
+                    counter.dispatches += 1
+                    counter.handler_calls += len(self._topics.handlers(hook))
                 dispatcher.dispatch(event=self, hook=hook, data=data)
+
+    def _count(self, hook, n):
+        # update `Event.counters` for `n` dispatches of `hook`
+        counters = self.counters
+        counter = getattr(counters, hook, counters.other)
+        counter.dispatches += n
+        counter.handler_calls += n * len(self._topics.handlers(hook))
+
+    def dispatch_columns(self, hook, columns=None, **arrays):
+        """ immediately dispatch `hook` for each row of a columnar batch.
+
+            + `hook` is the name of the hook to dispatch
+
+            + `columns` is a `simpy_events.columns.Columns` object,
+              if `None` it is created from the `arrays` keyword args,
+              for ex ::
+
+                evt.dispatch_columns('sample', timestamps=t, values=v)
+
+            Does nothing if `Event.enabled` is `False` or
+            `Event.dispatcher` is `None`.
+
+            calls the `dispatcher.dispatch_columns` method with the
+            following arguments (see `EventDispatcher.dispatch_columns`):
+
+            + `event`: the `Event` instance
+            + `hook`
+            + `columns`
+
+            if the dispatcher has no `dispatch_columns` method then
+            `dispatcher.dispatch` is called for each row.
+
+            .. note:: `numpy` is required (optional dependency).
+        """
+        if self._source is not None and self._epoch != self._clock.value:
+            self._resolve()
+        if self._enabled:
+            dispatcher = self._dispatcher
+            if dispatcher is not None:
+                if columns is None:
+                    columns = Columns(**arrays)
+                if self.counters is not None:
+                    self._count(hook, len(columns))
+                dispatch_columns = getattr(dispatcher, 'dispatch_columns',
+                                           None)
+                if dispatch_columns is not None:
+                    dispatch_columns(event=self, hook=hook, columns=columns)
+                else:
+                    dispatch = dispatcher.dispatch
+                    for row in columns:
+                        dispatch(event=self, hook=hook, data=row)
+
+    def dispatch_many(self, hook, datas):
+        """ immediately dispatch `hook` for each item in `datas`.
+
+            + `hook` is the name of the hook to dispatch
+
+            + `datas` is an iterable of objects to forward to the
+              handlers.
+
+            Does nothing if `Event.enabled` is `False` or
+            `Event.dispatcher` is `None`.
+
+            calls the `dispatcher.dispatch_many` method with the
+            following arguments (see `EventDispatcher.dispatch_many`):
+
+            + `event`: the `Event` instance
+            + `hook`
+            + `datas`
+
+            if the dispatcher has no `dispatch_many` method then
+            `dispatcher.dispatch` is called for each item in `datas`.
+        """
+        if self._source is not None and self._epoch != self._clock.value:
+            self._resolve()
+        if self._enabled:
+            dispatcher = self._dispatcher
+            if dispatcher is not None:
+                if self.counters is not None:
+                    if not isinstance(datas, (list, tuple)):
+                        datas = list(datas)
+                    self._count(hook, len(datas))
+                dispatch_many = getattr(dispatcher, 'dispatch_many', None)
+                if dispatch_many is not None:
+                    dispatch_many(event=self, hook=hook, datas=datas)
+                else:
+                    dispatch = dispatcher.dispatch
+                    for data in datas:
+                        dispatch(event=self, hook=hook, data=data)
@@ -1,7 +1,9 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
-from .event import Event, EventDispatcher
+from .event import (Event, EventDispatcher, DispatchCounters, SharedTopics,
+                    Epoch, invalidate_handlers, dispatch_batch)
 import collections
+import weakref
 from functools import partial
 
 
@@ -15,7 +17,13 @@ class Handlers(collections.MutableSequence):
 
         `Handlers` behave like a `list` expect it's also callable so it
         can be used as a decorator to append handlers to it.
+
+        `Handlers` is *versioned*: modifying it invalidates the handlers
+        routing tables cached by the events (see
+        `simpy_events.event.Topics`).
     """
+    versioned = True
+
     def __init__(self, lst=None):
             self._lst = [] if lst is None else lst
 
@@ -24,15 +32,21 @@ class Handlers(collections.MutableSequence):
 
     def __setitem__(self, index, value):
         self._lst[index] = value
+        invalidate_handlers()
 
     def __delitem__(self, index):
         del self._lst[index]
+        invalidate_handlers()
 
     def __len__(self):
         return len(self._lst)
 
+    def __iter__(self):
+        return iter(self._lst)
+
     def insert(self, index, value):
         self._lst.insert(index, value)
+        invalidate_handlers()
 
     def __call__(self, fct):
         """ append `fct` to the sequence.
@@ -44,6 +58,68 @@ class Handlers(collections.MutableSequence):
         return fct
 
 
+class TopicHandlers(dict):
+    """ The `dict` of a `Topic` holding `Handlers` objects by hook name.
+
+        `TopicHandlers` is a *versioned* `dict`: modifying it
+        invalidates the handlers routing tables cached by the events
+        (see `simpy_events.event.Topics`).
+
+        It has the following attributes:
+
+        + `owner`, the `Topic` (or `None`)
+
+        + `offload`, whether the handlers can be run outside the
+          simulation thread (see `Topic.offload`)
+
+        + `coalesce`, the records dispatched to the handlers when they
+          are batched (see `Topic.coalesce`)
+    """
+    versioned = True
+
+    def __init__(self, owner=None):
+        """ initializes an empty `TopicHandlers` for the `Topic` `owner`
+        """
+        super().__init__()
+        self.owner = owner
+        self.offload = False
+        self.coalesce = 'all'
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        invalidate_handlers()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        invalidate_handlers()
+
+    def clear(self):
+        super().clear()
+        invalidate_handlers()
+
+    def pop(self, *args):
+        try:
+            return super().pop(*args)
+        finally:
+            invalidate_handlers()
+
+    def popitem(self):
+        try:
+            return super().popitem()
+        finally:
+            invalidate_handlers()
+
+    def setdefault(self, key, default=None):
+        try:
+            return super().setdefault(key, default)
+        finally:
+            invalidate_handlers()
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        invalidate_handlers()
+
+
 class Topic(collections.MutableSequence):
     """ Holds a mapping of handlers to link to specific events.
 
@@ -57,12 +133,12 @@ class Topic(collections.MutableSequence):
         `simpy_events.event.Event`'s `topcis` sequence and the handlers
         it contains will be called when the event is dispatched.
 
-        a `Topic` carries a `dict` containing sequences of handlers for
-        specific hooks ('before', 'after'...), and this `dict` is added
-        to `simpy_events.event.Event`'s topics. The topic's dict is
-        added to an event's topics sequence either when the
-        `simpy_events.event.Event` is created or when the corresponding
-        event's type (name) is added to the `Topic`.
+        a `Topic` carries a `dict` (`TopicHandlers`) containing
+        sequences of handlers for specific hooks ('before', 'after'...),
+        and this `dict` is added to `simpy_events.event.Event`'s topics.
+        The topic's dict is added to an event's topics sequence either
+        when the `simpy_events.event.Event` is created or when the
+        corresponding event's type (name) is added to the `Topic`.
 
         `Topic`'s `dict` contains key:value pairs where keys are hook
         names ('before', 'after'...) and values are `Handlers` objects.
@@ -91,7 +167,7 @@ class Topic(collections.MutableSequence):
         self._ns = ns
         self._name = name
         self._events = []
-        self._topic = {}
+        self._topic = TopicHandlers(self)
 
     @property
     def topic(self):
@@ -108,6 +184,50 @@ class Topic(collections.MutableSequence):
         """ (read only) The name of the `Topic` """
         return self._name
 
+    @property
+    def path(self):
+        """ (read only) The absolute path of the `Topic`, ex ::
+
+                assert root.topic('one::two').path == '::one::two'
+        """
+        return f'{self._ns.path or ""}{self._ns.separator}{self._name}'
+
+    @property
+    def offload(self):
+        """ whether the handlers can be run outside the simulation thread
+
+            `False` by default, this is used by dispatchers such as
+            `simpy_events.dispatchers.ThreadPoolEventDispatcher`.
+
+            .. seealso:: `simpy_events.dispatchers.Offload` to mark a
+                single handler.
+        """
+        return self._topic.offload
+
+    @offload.setter
+    def offload(self, value):
+        self._topic.offload = value
+
+    @property
+    def coalesce(self):
+        """ the records dispatched when the handlers are batched by time
+
+            + 'all' (default): all the records are dispatched
+            + 'last': only the last record of each event is dispatched
+
+            This is used by
+            `simpy_events.dispatchers.TimeStepEventDispatcher`.
+
+            `ValueError` is raised if the value is not 'all' or 'last'.
+        """
+        return self._topic.coalesce
+
+    @coalesce.setter
+    def coalesce(self, value):
+        if value not in ('all', 'last'):
+            raise ValueError(f"coalesce must be 'all' or 'last': {value!r}")
+        self._topic.coalesce = value
+
     def __getitem__(self, index):
         """ return an event name added to the `Topic` """
         return self._events[index]
@@ -250,20 +370,24 @@ class EventsProperty:
 
         .. seealso:: `EventsPropertiesMixin`
     """
-    def __init__(self, name, value, parent):
+    def __init__(self, name, value, parent, weak=False):
         """ creates a new hierarchical attribute linked to `parent`
 
             for each event added to this node its `name` attribute will
             be set every time the applicable value is updated (this
             `EventsProperty`'s value or a parent value depending on
             whether the value is `None` or not).
+
+            if `weak` is `True` the events are weakly referenced, they
+            are automatically removed once garbage collected.
         """
         self.parent = parent
         if parent is not None:
             parent.children.append(self)
         self.children = []
         self._name = name
-        self._events = []
+        # insertion ordered set of the events
+        self._events = weakref.WeakKeyDictionary() if weak else {}
         self._value = value
 
     @property
@@ -301,13 +425,17 @@ class EventsProperty:
         return self._value
 
     def _propagate(self, value):
-        # set value on the events of this node
-        self._set_value(value, self._events)
-        # forward `value` down to the hierarchy
-        children = self.children
-        for child in children:
+        # set value on the events of this node and down to the
+        # hierarchy
+        self._set_value(value, list(self._collect_events()))
+
+    def _collect_events(self):
+        # yield the events of this node and of the children whose
+        # value is `None` recursively down the hierarchy
+        yield from self._events
+        for child in self.children:
             if child.value is None:
-                child._propagate(value)
+                yield from child._collect_events()
 
     def _set_value(self, value, events):
         # set the attribute value to `value` for each event in `events`
@@ -322,16 +450,101 @@ class EventsProperty:
             starting from this node in the hierarchy for the added
             event.
         """
-        self._events.append(event)
+        self._events[event] = None
         self._set_value(self._get_value(), (event,))
 
     def remove_event(self, event):
-        """ remove an event from the hierarchy.
+        """ remove an event from the hierarchy in O(1).
 
             This doesn't modify the corresponding attribute.
         """
-        self._events.remove(event)
-        # TODO ==> value ?
+        del self._events[event]
+
+
+class EnabledEventsProperty(EventsProperty):
+    """ `EventsProperty` for `simpy_events.event.Event.enabled`
+
+        In addition to the **enable** / **disable** hooks dispatched by
+        each event, the events whose value changes are notified as a
+        whole using `simpy_events.event.dispatch_batch`:
+
+        + **disable_batch** is dispatched just before the events are
+          disabled
+
+        + **enable_batch** is dispatched just after the events are
+          enabled
+
+        so handlers subscribed to those hooks are called once with the
+        `list` of affected events, for instance when a `NameSpace` is
+        enabled.
+    """
+    def _set_value(self, value, events):
+        events = [event for event in events if event.enabled != value]
+        if not value:
+            dispatch_batch('disable_batch', events)
+        super()._set_value(value, events)
+        if value:
+            dispatch_batch('enable_batch', events)
+
+
+class SampleEveryEventsProperty(EventsProperty):
+    """ `EventsProperty` for `simpy_events.event.Event.sample_every`
+
+        The value is checked before it's stored, so an invalid value
+        doesn't leave the hierarchy partially updated: `ValueError` is
+        raised unless the value is an `int` >= 1, or `None` for a node
+        which has a parent.
+    """
+    def __init__(self, name, value, parent, weak=False):
+        self._check(value, parent)
+        super().__init__(name, value, parent, weak=weak)
+
+    @EventsProperty.value.setter
+    def value(self, value):
+        self._check(value, self.parent)
+        EventsProperty.value.fset(self, value)
+
+    @staticmethod
+    def _check(value, parent):
+        # see `simpy_events.event.Event.sample_every`
+        if value is None and parent is not None:
+            return
+        if not isinstance(value, int) or value < 1:
+            raise ValueError(f'sample_every must be an int >= 1: {value!r}')
+
+
+class LazyEventsProperty(EventsProperty):
+    """ `EventsProperty` whose value is lazily resolved by the events
+
+        Instead of setting the attribute of every event in the hierarchy
+        when the value changes, `LazyEventsProperty` only invalidates
+        the `simpy_events.event.Epoch` of the hierarchy so its events
+        resolve the value again from their
+        `simpy_events.event.Event.source` the next time they are used:
+        changing the value is O(1) whatever the number of events.
+
+        The events are not kept by the node, they are expected to have
+        the `EventsPropertiesMixin` holding it as
+        `simpy_events.event.Event.source`.
+
+        .. seealso:: `RootNameSpace`
+    """
+    def __init__(self, name, value, parent, weak=False, epoch=None):
+        """ `epoch` is the `simpy_events.event.Epoch` of the hierarchy
+
+            see `EventsProperty` for the other arguments.
+        """
+        super().__init__(name, value, parent, weak=weak)
+        self.epoch = epoch
+
+    def _propagate(self, value):
+        self.epoch.invalidate()
+
+    def add_event(self, event):
+        """ nothing to do, see `EventsPropertiesMixin.resolve` """
+
+    def remove_event(self, event):
+        """ nothing to do, see `EventsPropertiesMixin.resolve` """
 
 
 class EventsPropertiesMixin:
@@ -342,6 +555,7 @@ class EventsPropertiesMixin:
 
         + "dispatcher"
         + "enabled"
+        + "sample_every"
 
         This is used to ensure a hierarchically set value for the
         corresponding attribute of `simpy_events.event.Event` instances.
@@ -359,15 +573,43 @@ class EventsPropertiesMixin:
         `EventsPropertiesMixin.remove_event_properties` methods can be
         used in subclasses to add / remove an event to / from the
         `EventsProperty` instances.
+
+        "enabled" uses `EnabledEventsProperty`, which also dispatches
+        the **enable_batch** / **disable_batch** hooks, and
+        "sample_every" uses `SampleEveryEventsProperty`, which checks
+        the value.
+
+        In *lazy* mode the attributes in `EventsPropertiesMixin._lazy`
+        use `LazyEventsProperty` instead, the events then resolve them
+        with `EventsPropertiesMixin.resolve` and a hierarchy shares an
+        `EventsPropertiesMixin.epoch`.
     """
     _props = (
         'dispatcher',
         'enabled',
+        'sample_every',
     )
 
-    def __init__(self, parent, **values):
+    # attributes resolved by the events in lazy mode, see
+    # `simpy_events.event.Event.source`
+    _lazy = (
+        'dispatcher',
+        'enabled',
+    )
+
+    # `EventsProperty` type of the attributes (outside lazy mode)
+    _types = {
+        'enabled': EnabledEventsProperty,
+        'sample_every': SampleEveryEventsProperty,
+    }
+
+    def __init__(self, parent, lazy=False, weak=False, **values):
         """ `parent` is either `None` or a `EventsPropertiesMixin`.
 
+            `lazy` enables the lazy mode and `weak` the weak references
+            to the events, they're inherited from `parent` if `parent`
+            is not `None`.
+
             `values` are optional extra keyword args to initialize the
             value of the `EventsProperty` objects (ex: dispatcher=...).
 
@@ -375,13 +617,62 @@ class EventsPropertiesMixin:
             stored in a private attribute using the name '_{attr_name}'
             (ex: "_dispatcher").
         """
-
+        if parent is not None:
+            lazy = parent.lazy
+            weak = parent.weak
+            epoch = parent.epoch
+        else:
+            epoch = Epoch() if lazy else None
+        self._lazy_mode = lazy
+        self._weak = weak
+        self._epoch = epoch
         for name in self._props:
-            setattr(self, f'_{name}', EventsProperty(
+            args = (
                 name,
                 values.get(name),
-                None if parent is None else getattr(parent, f'_{name}')
-            ))
+                None if parent is None else getattr(parent, f'_{name}'),
+            )
+            if lazy and name in self._lazy:
+                prop = LazyEventsProperty(*args, weak=weak, epoch=epoch)
+            else:
+                prop = self._types.get(name, EventsProperty)(*args,
+                                                             weak=weak)
+            setattr(self, f'_{name}', prop)
+
+    @property
+    def lazy(self):
+        """ (read only) whether the lazy mode is enabled
+
+            .. seealso:: `RootNameSpace`
+        """
+        return self._lazy_mode
+
+    @property
+    def weak(self):
+        """ (read only) whether the events are weakly referenced
+
+            .. seealso:: `RootNameSpace`
+        """
+        return self._weak
+
+    @property
+    def epoch(self):
+        """ (read only) the `simpy_events.event.Epoch` of the hierarchy
+
+            `None` outside lazy mode, see `simpy_events.event.Event.source`
+        """
+        return self._epoch
+
+    def resolve(self, name):
+        """ return the value applicable to this node for attribute `name`
+
+            i.e the value of the node if it's not `None`, otherwise the
+            first value that is not `None` up in the hierarchy.
+
+            This is used by the events created in lazy mode (see
+            `simpy_events.event.Event.source`).
+        """
+        return getattr(self, f'_{name}')._get_value()
 
     def _add_event_properties(self, event):
         """ used in subclasses to add a `simpy_events.event.Event`.
@@ -389,7 +680,12 @@ class EventsPropertiesMixin:
             This add the event to each contained `EventsProperty` object,
             so the corresponding attribute is hierarchically set for the
             event.
+
+            In lazy mode the `EventsPropertiesMixin` becomes the
+            `simpy_events.event.Event.source` of the event.
         """
+        if self._lazy_mode:
+            event.source = self
         for name in self._props:
             getattr(self, f'_{name}').add_event(event)
 
@@ -398,7 +694,12 @@ class EventsPropertiesMixin:
 
             This remove the event from each contained `EventsProperty`
             object.
+
+            In lazy mode `simpy_events.event.Event.source` is reset to
+            `None`, the event keeps its current values.
         """
+        if self._lazy_mode:
+            event.source = None
         for name in self._props:
             getattr(self, f'_{name}').remove_event(event)
 
@@ -416,6 +717,29 @@ for _ in EventsPropertiesMixin._props:
     setattr(EventsPropertiesMixin, _, p)
 
 
+def _stats(counters):
+    # return the stats `dict` of a sequence of `DispatchCounters`
+    stats = {}
+    for hook in DispatchCounters.__slots__:
+        dispatches = handler_calls = 0
+        for c in counters:
+            counter = getattr(c, hook)
+            dispatches += counter.dispatches
+            handler_calls += counter.handler_calls
+        stats[hook] = {
+            'dispatches': dispatches,
+            'handler_calls': handler_calls,
+        }
+    return stats
+
+
+def _reset(counters):
+    # reset each `HookCounter` of `counters` (`DispatchCounters`)
+    for hook in DispatchCounters.__slots__:
+        counter = getattr(counters, hook)
+        counter.dispatches = counter.handler_calls = 0
+
+
 class EventType(EventsPropertiesMixin):
     """ Link a set of `simpy_events.event.Event` instances to a name.
 
@@ -439,7 +763,13 @@ class EventType(EventsPropertiesMixin):
           be given as metadata to the created events (see
           `EventType.create`).
 
-        .. todo:: remove event instance ?
+        + the hooks dispatched by the created events are counted by
+          `EventType.counters`, see `EventType.stats`.
+
+        + the created events can be removed from the `EventType` with
+          `EventType.remove` (or `simpy_events.event.Event.dispose`).
+          If the hierarchy uses weak references (see `RootNameSpace`)
+          they're also removed once garbage collected.
     """
     def __init__(self, ns, name):
         """ initializes an `EventType` attached to `ns` by name `name`.
@@ -460,14 +790,53 @@ class EventType(EventsPropertiesMixin):
         }
         self._name = name
         self._ns = ns
-        self._instances = []
-        self._topics = []
+        # insertion ordered set of the instances
+        self._instances = weakref.WeakKeyDictionary() if self.weak else {}
+        # shared by reference with the instances, see `EventType.create`
+        self._topics = SharedTopics()
+        self._counters = DispatchCounters()
 
     @property
     def name(self):
         """ (read only) The name of the `EventType` """
         return self._name
 
+    @property
+    def path(self):
+        """ (read only) The absolute path of the `EventType`, ex ::
+
+                assert root.event_type('one::two').path == '::one::two'
+        """
+        return f'{self._ns.path or ""}{self._ns.separator}{self._name}'
+
+    @property
+    def counters(self):
+        """ (read only) the `simpy_events.event.DispatchCounters` shared
+            by the created events (see
+            `simpy_events.event.Event.counters`).
+        """
+        return self._counters
+
+    def stats(self):
+        """ return the dispatch counters of the `EventType`
+
+            The returned `dict` contains an item for each hook in
+            `simpy_events.event.DispatchCounters` ('other' counts any
+            other hook), ex ::
+
+                {
+                    'before': {'dispatches': 10, 'handler_calls': 20},
+                    [...]
+                }
+
+            .. seealso:: `NameSpace.stats`
+        """
+        return _stats((self._counters,))
+
+    def reset(self):
+        """ reset the dispatch counters of the `EventType` """
+        _reset(self._counters)
+
     @property
     def ns(self):
         """ (read only) The `NameSpace` that holds the `EventType` """
@@ -500,7 +869,10 @@ class EventType(EventsPropertiesMixin):
 
             Once the event has been created the `Topic` objects linked
             to the `EventType` are linked to the
-            `simpy_events.event.Event` instance.
+            `simpy_events.event.Event` instance: the sequence of topics
+            of the `EventType` is shared by reference, until
+            `simpy_events.event.Event.topics` is modified (see
+            `simpy_events.event.SharedTopics`).
 
             Then `simpy_events.event.Event.enabled` and
             `simpy_events.event.Event.dispatcher` values for the created
@@ -511,10 +883,12 @@ class EventType(EventsPropertiesMixin):
         kw = self._metadata.copy()
         kw.update(metadata)
         event = Event(**kw)
-        self._instances.append(event)
+        event.counters = self._counters
+        event.owner = self
+        self._instances[event] = None
 
         # link topics
-        event.topics.extend(self._topics)
+        event.topics = self._topics
 
         # synchronize dispatcher and enabled properties
         self._add_event_properties(event)
@@ -526,11 +900,14 @@ class EventType(EventsPropertiesMixin):
 
             This will immediately link the `Topic` to the existing and
             future created `simpy_events.event.Event` instances for this
-            `EventType`,
+            `EventType`. Only the instances whose
+            `simpy_events.event.Event.topics` has been modified are
+            updated, the others share the topics of the `EventType`.
         """
         self._topics.append(topic)
-        for evt in self._instances:
-            evt.topics.append(topic)
+        for topics in list(self._topics.copies):
+            topics.append(topic)
+        invalidate_handlers()
 
     def remove_topic(self, topic):
         """ remove a `Topic` object from this `EventType`.
@@ -538,19 +915,53 @@ class EventType(EventsPropertiesMixin):
             The `Topic` will immediately be unlinked from the existing
             `simpy_events.event.Event` instances for this `EventType`.
         """
-        # since topics are dict we must check the id to remove the
-        # correct instance ({} == {} is True)
-        for i, tp in enumerate(self._topics):
-            if tp is topic:
-                del self._topics[i]
-                break
+        _unlink(self._topics, topic)
+        for topics in list(self._topics.copies):
+            _unlink(topics, topic)
+        invalidate_handlers()
+
+    def remove(self, event):
+        """ remove a `simpy_events.event.Event` instance
+
+            The event is no longer managed by the `EventType`: the
+            `Topic` objects of the `EventType` are unlinked from it, and
+            its `simpy_events.event.Event.enabled` and
+            `simpy_events.event.Event.dispatcher` values are no longer
+            synchronized with the hierarchy (the current values are
+            kept).
+
+            The cost doesn't depend on the number of instances, which
+            allows to create and remove events all along a simulation.
+            `ValueError` is raised if `event` is not an instance of the
+            `EventType`.
 
-        for evt in self._instances:
-            topics = evt.topics
-            for i, tp in enumerate(topics):
-                if tp is topic:
-                    del topics[i]
-                    break
+            .. seealso:: `simpy_events.event.Event.dispose`
+        """
+        try:
+            del self._instances[event]
+        except KeyError:
+            raise ValueError(
+                f'{event!r} is not an instance of {self.path}') from None
+        event.owner = None
+        self._remove_event_properties(event)
+        topics = event.topics
+        if topics.shared is self._topics:
+            # all its topics are the ones of the `EventType`
+            topics[:] = ()
+        else:
+            for topic in self._topics:
+                _unlink(topics, topic)
+        self._topics.copies.discard(topics)
+
+
+def _unlink(topics, topic):
+    # remove `topic` from the sequence `topics`
+    # since topics are dict we must check the id to remove the
+    # correct instance ({} == {} is True)
+    for i, tp in enumerate(topics):
+        if tp is topic:
+            del topics[i]
+            break
 
 
 class NameSpace(EventsPropertiesMixin):
@@ -810,6 +1221,37 @@ class NameSpace(EventsPropertiesMixin):
         """
         return self.topic(name).handlers(hook)
 
+    def event_types(self):
+        """ iter on the `EventType` objects of the `NameSpace` and its
+            children `NameSpace` recursively.
+        """
+        yield from self._events.values()
+        for child in self._children.values():
+            yield from child.event_types()
+
+    def stats(self):
+        """ return the dispatch counters aggregated for the `NameSpace`
+
+            The counters of all the `EventType` objects in the
+            `NameSpace` and its children are summed, see
+            `EventType.stats`.
+        """
+        return _stats([et.counters for et in self.event_types()])
+
+    def snapshot(self):
+        """ return the dispatch counters of each `EventType` in the
+            `NameSpace` and its children as a `dict`
+            (`EventType.path`: `EventType.stats`).
+        """
+        return {et.path: et.stats() for et in self.event_types()}
+
+    def reset(self):
+        """ reset the dispatch counters of each `EventType` in the
+            `NameSpace` and its children.
+        """
+        for et in self.event_types():
+            et.reset()
+
 
 # add a convenience registering method for each known hook
 # a property is added to NameSpace for each hook, which returns
@@ -848,8 +1290,30 @@ class RootNameSpace(NameSpace):
         + `RootNameSpace.enabled` cannot be `None` (i.e unspecified)
 
           the value can be specifiied at creation (`False` by default)
+
+        + `RootNameSpace.sample_every` cannot be `None` (i.e
+          unspecified)
+
+          the value can be specifiied at creation (`1` by default)
+
+        If `lazy` is `True` the `simpy_events.event.Event.dispatcher`
+        and `simpy_events.event.Event.enabled` values are not set on
+        each created event when they change in the hierarchy, instead
+        the events resolve them from their `EventType` the next time
+        they're used (see `simpy_events.event.Event.source`). Changing
+        a value then costs O(nodes) instead of O(events), but the
+        **enable** and **disable** hooks are not dispatched for the
+        events.
+
+        If `weak` is `True` the `EventType` and `EventsProperty` objects
+        only keep weak references to the created events: an event that
+        is no longer used elsewhere is garbage collected and removed
+        from the hierarchy, instead of being kept until
+        `EventType.remove` is called. The topics and the values of the
+        hierarchy keep being synchronized for the live events.
     """
-    def __init__(self, dispatcher=None, enabled=False):
+    def __init__(self, dispatcher=None, enabled=False, sample_every=1,
+                 lazy=False, weak=False):
         """ init the root `NameSpace` in the hierarchy
 
             + `dispatcher`: used (unless overriden in children) to set
@@ -862,11 +1326,27 @@ class RootNameSpace(NameSpace):
                 `simpy_events.event.Event.enabled`
 
               Default value is `False`
+
+            + `sample_every`: used (unless overriden in children) to set
+                `simpy_events.event.Event.sample_every`
+
+              Default value is `1`
+
+            + `lazy`: enables the lazy mode for the hierarchy (see
+              `RootNameSpace`)
+
+              Default value is `False`
+
+            + `weak`: weakly reference the events created in the
+              hierarchy (see `RootNameSpace`)
+
+              Default value is `False`
         """
         if dispatcher is None:
             dispatcher = EventDispatcher()
         super().__init__(root=self, parent=None, name=None,
-                         dispatcher=dispatcher, enabled=enabled)
+                         dispatcher=dispatcher, enabled=enabled,
+                         sample_every=sample_every, lazy=lazy, weak=weak)
 
     @NameSpace.path.getter
     def path(self):
@@ -0,0 +1,520 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from .event import Event, EventDispatcher
+from bisect import bisect_left
+from collections import namedtuple
+import math
+import mmap
+import struct
+import time
+
+# file layout:
+# + header (`HEADER`): magic, version, record size, start time (ns since
+#   the epoch)
+# + records (`RECORD`), appended as the hooks are dispatched
+# + string table: count (uint32) then for each string its length
+#   (uint16) and its utf-8 bytes
+# + footer (`FOOTER`): offset of the string table from the beginning
+#   of the trace, magic
+# the string table and the footer are rewritten after the records each
+# time they're flushed if the file is seekable (see `TraceRecorder`)
+MAGIC = b'SPYTRACE'
+END_MAGIC = b'SPYTEND\0'
+VERSION = 1
+HEADER = struct.Struct('<8sHHIq')
+RECORD = struct.Struct('<dqIIHHq')
+FOOTER = struct.Struct('<Q8s')
+# `RECORD` flags
+HAS_PAYLOAD = 1
+# simulation time only
+_TIME = struct.Struct(f'<d{RECORD.size - 8}x')
+
+
+def event_type_name(event):
+    """ return the name identifying the type of `event` in a trace
+
+        the path of the `simpy_events.manager.EventType` for events
+        created from a `simpy_events.manager.NameSpace` (ex:
+        '::network::packet'), or the 'name' metadata (or '') otherwise.
+    """
+    metadata = event.metadata
+    name = metadata.get('name')
+    name = '' if name is None else str(name)
+    ns = metadata.get('ns')
+    if ns is None or not hasattr(ns, 'separator'):
+        return name
+    return f'{ns.path or ""}{ns.separator}{name}'
+
+
+class TraceRecorder(EventDispatcher):
+    """ Dispatcher wrapper recording every dispatch in a binary file.
+
+        `TraceRecorder` records the dispatch then forwards it to the
+        wrapped dispatcher (a `simpy_events.event.EventDispatcher` by
+        default), ex ::
+
+            with TraceRecorder('run.trace') as recorder:
+                root = RootNameSpace(dispatcher=recorder)
+                [...]
+                env.run()
+
+        Each dispatch is written as a fixed-size record (`RECORD`):
+
+        + the simulation time (`env.now`, or `nan` if unknown)
+        + the wall time in nanoseconds since the recorder was created
+        + the id of the event type (see `event_type_name`)
+        + the id of the `simpy_events.event.Event` instance, in the
+          order they're first dispatched
+        + the id of the hook
+        + flags (`HAS_PAYLOAD`)
+        + an optional payload (64 bits integer)
+
+        The names of the event types and the hooks are interned in a
+        string table (`TraceRecorder.strings`), written at the end of
+        the file.
+
+        The records are packed into a pre-allocated buffer which is
+        written to the file once full, so recording a dispatch doesn't
+        create any Python object other than the packed values.
+
+        If the file is seekable, the string table and the footer are
+        written after the records each time they're flushed (then
+        overwritten by the next flush), so the file is a complete trace
+        up to the last flush even if the recorder isn't closed, for ex.
+        when the simulation crashes. Otherwise they're only written by
+        `TraceRecorder.close`.
+
+        A payload which can't be packed as a 64 bits integer (out of
+        range or not an integer) is rejected: the record is written
+        without payload and counted by `TraceRecorder.rejected`.
+
+        .. note:: the `simpy_events.event.Event` instances are kept by
+            the recorder to identify them.
+    """
+    # every dispatch is recorded, even without handlers (see
+    # `simpy_events.event.EventDispatcher.handlers_only`)
+    handlers_only = False
+
+    def __init__(self, file, dispatcher=None, env=None, payload=None,
+                 buffer_size=1 << 20):
+        """ initializes a new `TraceRecorder`
+
+            `file` is either a path or a binary file object, in this
+            case the file is not closed by `TraceRecorder.close`.
+
+            `dispatcher` is the wrapped dispatcher, a new
+            `simpy_events.event.EventDispatcher` by default.
+
+            `env` is an optional `simpy.Environment` used to get the
+            simulation time. By default the time is obtained from the
+            dispatched data if it's a `simpy.events.Event`.
+
+            `payload` is an optional function called as
+            `payload(event, hook, data)` for each dispatch, returning
+            an `int` to record, or `None`.
+
+            `buffer_size` is the size of the buffer in bytes.
+        """
+        super().__init__()
+        if dispatcher is None:
+            dispatcher = EventDispatcher()
+        self.dispatcher = dispatcher
+        self.env = env
+        self.payload = payload
+        if hasattr(file, 'write'):
+            self._file = file
+            self._own_file = False
+        else:
+            self._file = open(file, 'wb')
+            self._own_file = True
+        size = RECORD.size
+        self._buffer = bytearray(max(buffer_size // size, 1) * size)
+        self._offset = 0
+        self._count = 0
+        self._strings = []
+        self._string_ids = {}
+        # encoded string table entries
+        self._table = bytearray()
+        self._events = {}
+        self._rejected = 0
+        self._start = time.perf_counter_ns()
+        seekable = getattr(self._file, 'seekable', None)
+        self._seekable = seekable is not None and seekable()
+        self._file.write(HEADER.pack(MAGIC, VERSION, size, 0,
+                                     time.time_ns()))
+        self.flush()
+
+    @property
+    def records(self):
+        """ (read only) the number of records """
+        return self._count
+
+    @property
+    def strings(self):
+        """ (read only) the `tuple` of interned strings, the id of a
+            string is its index.
+        """
+        return tuple(self._strings)
+
+    @property
+    def rejected(self):
+        """ (read only) the number of rejected payloads """
+        return self._rejected
+
+    def intern(self, string):
+        """ return the id of `string` in the string table """
+        string_id = self._string_ids.get(string)
+        if string_id is None:
+            string_id = self._string_ids[string] = len(self._strings)
+            self._strings.append(string)
+            data = string.encode()
+            self._table += struct.pack('<H', len(data))
+            self._table += data
+        return string_id
+
+    def dispatch(self, event, hook, data):
+        """ record the dispatch then forward it to the wrapped
+            dispatcher.
+
+            .. seealso:: `simpy_events.event.EventDispatcher.dispatch`
+        """
+        ids = self._events.get(event)
+        if ids is None:
+            ids = self._events[event] = (
+                self.intern(event_type_name(event)), len(self._events))
+        hook_id = self._string_ids.get(hook)
+        if hook_id is None:
+            hook_id = self.intern(hook)
+        env = self.env
+        if env is None:
+            env = getattr(data, 'env', None)
+        now = math.nan if env is None else env.now
+        payload = self.payload
+        value = None if payload is None else payload(event, hook, data)
+
+        offset = self._offset
+        if offset == len(self._buffer):
+            self.flush()
+            offset = 0
+        wall = time.perf_counter_ns() - self._start
+        try:
+            RECORD.pack_into(self._buffer, offset, now, wall, ids[0],
+                             ids[1], hook_id,
+                             0 if value is None else HAS_PAYLOAD,
+                             0 if value is None else value)
+        except struct.error:
+            if value is None:
+                raise
+            self._rejected += 1
+            RECORD.pack_into(self._buffer, offset, now, wall, ids[0],
+                             ids[1], hook_id, 0, 0)
+        self._offset = offset + RECORD.size
+        self._count += 1
+        self.dispatcher.dispatch(event, hook, data)
+
+    def flush(self):
+        """ write the buffered records to the file
+
+            if the file is seekable, the string table and the footer
+            are written after the records (overwriting the previous
+            ones), see `TraceRecorder`.
+        """
+        file = self._file
+        # offset of the records not written yet, i.e of the string
+        # table written by the previous flush
+        table = HEADER.size + self._count * RECORD.size - self._offset
+        if self._seekable:
+            file.seek(table)
+        if self._offset:
+            file.write(memoryview(self._buffer)[:self._offset])
+            self._offset = 0
+        if self._seekable:
+            self._write_table()
+
+    def _write_table(self):
+        # write the string table and the footer after the records
+        file = self._file
+        file.write(struct.pack('<I', len(self._strings)))
+        file.write(self._table)
+        file.write(FOOTER.pack(HEADER.size + self._count * RECORD.size,
+                               END_MAGIC))
+        file.flush()
+
+    def close(self):
+        """ write the buffered records, the string table and the footer
+
+            The file is closed if it was opened by the recorder.
+        """
+        file = self._file
+        if file is None:
+            return
+        self.flush()
+        if not self._seekable:
+            self._write_table()
+        if self._own_file:
+            file.close()
+        else:
+            file.flush()
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class TraceRecord(namedtuple('TraceRecord', (
+        'time', 'wall_ns', 'event_type', 'instance', 'hook', 'payload'))):
+    """ A record read from a trace (see `TraceReader`)
+
+        + `time`: the simulation time (`nan` if unknown)
+        + `wall_ns`: the wall time in nanoseconds since the recorder
+          was created
+        + `event_type`: the name of the event type
+        + `instance`: the id of the `simpy_events.event.Event` instance
+        + `hook`: the dispatched hook
+        + `payload`: the recorded payload (`None` if there is none)
+
+        `TraceRecord` is the data given to the handlers by `replay`,
+        `TraceRecord.value` is provided for handlers expecting a
+        `simpy.events.Event`.
+    """
+    __slots__ = ()
+
+    @property
+    def value(self):
+        """ (read only) same as `TraceRecord.payload` """
+        return self.payload
+
+
+class TraceReader:
+    """ Read a trace recorded by `TraceRecorder`.
+
+        The trace file is memory-mapped and the records are unpacked
+        when accessed, ex ::
+
+            with TraceReader('run.trace') as reader:
+                print(len(reader), reader[0], reader[-1])
+                for record in reader.between(10, 20):
+                    [...]
+
+        + `TraceReader` is a sequence of `TraceRecord` objects (index
+          or slice)
+
+        + `TraceReader.seek` returns the index of the first record at
+          or after a given simulation time, using an index of the time
+          every `index_step` records (built the first time it's used).
+
+        .. note:: the records are expected to be ordered by simulation
+            time (as recorded from a `simpy` simulation), the records
+            without simulation time (`nan`) are ignored by the index.
+    """
+    def __init__(self, path, index_step=4096):
+        """ open the trace file `path`
+
+            `ValueError` is raised if the file isn't a complete trace.
+        """
+        with open(path, 'rb') as file:
+            self._mmap = mm = mmap.mmap(file.fileno(), 0,
+                                        access=mmap.ACCESS_READ)
+        try:
+            if len(mm) < HEADER.size + 4 + FOOTER.size:
+                raise ValueError(f'not a trace file: {path}')
+            magic, version, size, _, start = HEADER.unpack_from(mm)
+            table, end = FOOTER.unpack_from(mm, len(mm) - FOOTER.size)
+            if magic != MAGIC or end != END_MAGIC:
+                raise ValueError(f'not a complete trace file: {path}')
+            if version != VERSION or size != RECORD.size:
+                raise ValueError(f'unsupported trace version: {version}')
+            self.start_ns = start
+            self._count = (table - HEADER.size) // RECORD.size
+            count, = struct.unpack_from('<I', mm, table)
+            offset = table + 4
+            strings = []
+            for _ in range(count):
+                length, = struct.unpack_from('<H', mm, offset)
+                offset += 2
+                strings.append(mm[offset:offset + length].decode())
+                offset += length
+        except Exception:
+            mm.close()
+            raise
+        self.strings = tuple(strings)
+        self.index_step = index_step
+        self._index = None
+
+    def __len__(self):
+        """ return the number of records """
+        return self._count
+
+    def __getitem__(self, index):
+        """ return the `TraceRecord` at `index`, or a `list` of
+            `TraceRecord` if `index` is a `slice`.
+        """
+        if isinstance(index, slice):
+            record = self._record
+            return [record(HEADER.size + i * RECORD.size)
+                    for i in range(*index.indices(self._count))]
+        count = self._count
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError('trace record index out of range')
+        return self._record(HEADER.size + index * RECORD.size)
+
+    def _record(self, offset):
+        # unpack the record at `offset`
+        strings = self.strings
+        now, wall, type_id, instance, hook, flags, payload = \
+            RECORD.unpack_from(self._mmap, offset)
+        return TraceRecord(now, wall, strings[type_id], instance,
+                           strings[hook],
+                           payload if flags & HAS_PAYLOAD else None)
+
+    def records(self, start=0, stop=None):
+        """ iter on the `TraceRecord` objects from index `start` to
+            index `stop` (excluded, the end by default).
+        """
+        if stop is None or stop > self._count:
+            stop = self._count
+        size = RECORD.size
+        record = self._record
+        for offset in range(HEADER.size + start * size,
+                            HEADER.size + stop * size, size):
+            yield record(offset)
+
+    __iter__ = records
+
+    def _times(self, start, stop):
+        # return the simulation times of the records [start:stop]
+        size = RECORD.size
+        data = memoryview(self._mmap)[HEADER.size + start * size:
+                                      HEADER.size + stop * size]
+        try:
+            return [now for now, in _TIME.iter_unpack(data)]
+        finally:
+            data.release()
+
+    @property
+    def index(self):
+        """ (read only) the `list` of the maximum simulation time of the
+            records before each multiple of `index_step` (excluded),
+            used by `TraceReader.seek`.
+        """
+        if self._index is None:
+            index = []
+            step = self.index_step
+            last = -math.inf
+            for start in range(0, self._count, step):
+                for now in self._times(start, min(start + step,
+                                                  self._count)):
+                    if now > last:
+                        last = now
+                index.append(last)
+            self._index = index
+        return self._index
+
+    def seek(self, time):
+        """ return the index of the first record whose simulation time
+            is greater than or equal to `time` (or `len(reader)`).
+        """
+        block = bisect_left(self.index, time)
+        start = block * self.index_step
+        stop = min(start + self.index_step, self._count)
+        for i, now in enumerate(self._times(start, stop), start):
+            if now >= time:
+                return i
+        return stop
+
+    def between(self, start=None, end=None):
+        """ iter on the records whose simulation time is in the range
+            [`start`, `end`), by default from the first / to the last
+            record.
+        """
+        first = 0 if start is None else self.seek(start)
+        last = None if end is None else self.seek(end)
+        return self.records(first, last)
+
+    def close(self):
+        """ close the memory-mapped file """
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _stand_in(event_type, instance):
+    # return the `Event` replaying the instance `instance` of
+    # `event_type`, see `replay`
+    event = Event(ns=event_type.ns, name=event_type.name,
+                  trace_instance=instance)
+    # enabled before the dispatcher is set: 'enable' isn't dispatched
+    event.enabled = event_type.resolve('enabled')
+    event.dispatcher = event_type.resolve('dispatcher')
+    event.topics = list(event_type.topics)
+    event.counters = event_type.counters
+    return event
+
+
+def replay(reader, ns, start=None, end=None):
+    """ replay the records of `reader` (`TraceReader`) into `ns`
+
+        `ns` is a `simpy_events.manager.NameSpace` (ex: a
+        `simpy_events.manager.RootNameSpace`) holding the handlers.
+
+        For each recorded `simpy_events.event.Event` instance, a
+        stand-in `simpy_events.event.Event` is created for the
+        `simpy_events.manager.EventType` named after the recorded event
+        type (see `event_type_name`): it has the metadata of the
+        instances of the `simpy_events.manager.EventType` plus a
+        'trace_instance' metadata holding the instance id, its topics,
+        its `simpy_events.manager.EventType.counters` and the
+        `simpy_events.event.Event.enabled` /
+        `simpy_events.event.Event.dispatcher` values applicable to it
+        when the stand-in is created. The stand-ins are not added to the
+        `simpy_events.manager.EventType` (see
+        `simpy_events.manager.EventType.create`).
+
+        The records are then dispatched by the stand-in events
+        (`simpy_events.event.Event.dispatch`), the data given to the
+        handlers is the `TraceRecord`.
+
+        `start` and `end` optionally restrict the range of simulation
+        time to replay (see `TraceReader.between`).
+
+        The records whose event type is unknown (no name) or whose
+        stand-in is disabled or has no dispatcher are skipped.
+
+        return a `dict` reporting the replay throughput:
+
+        + `records`: number of records replayed
+        + `skipped`: number of records skipped
+        + `seconds`: wall time of the replay
+        + `rate`: number of records replayed per second
+    """
+    events = {}
+    replayed = skipped = 0
+    started = time.perf_counter()
+    for record in reader.between(start, end):
+        event = events.get(record.instance)
+        if event is None:
+            name = record.event_type
+            if name:
+                event = _stand_in(ns.event_type(name), record.instance)
+            events[record.instance] = event
+        if event is None or not event.enabled or event.dispatcher is None:
+            skipped += 1
+            continue
+        event.dispatch(record.hook, record)
+        replayed += 1
+    seconds = time.perf_counter() - started
+    return {
+        'records': replayed,
+        'skipped': skipped,
+        'seconds': seconds,
+        'rate': replayed / seconds if seconds else math.inf,
+    }
@@ -0,0 +1,247 @@
+#!/usr/bin/env python
+""" allocation and call-count budgets of the dispatch hot path
+
+    Unlike timings, the number of Python-level calls (`sys.setprofile`)
+    and the memory allocated (`tracemalloc`) per operation are
+    deterministic for a given interpreter, so the tests fail as soon as
+    a change adds a function call or an object to the hot path.
+
+    The budgets were recorded with CPython for each version in
+    `BUDGETS` (the tests are skipped for the other versions), update
+    them when the hot path is intentionally changed.
+
+    The events are either bare `Event` objects with plain `dict` topics
+    or events created from a `RootNameSpace` ('[ns]' cases), which use
+    the cached routing tables of the versioned topics and count the
+    dispatches (`EventType.counters`).
+"""
+import pytest
+from simpy_events.event import Event, EventDispatcher
+from simpy_events.environment import Environment
+from simpy_events.manager import RootNameSpace
+import gc
+import platform
+import simpy
+import sys
+import tracemalloc
+
+NUMBER = 1000
+
+# python-level calls per operation
+CALLS = {
+    # Event.dispatch, EventDispatcher.dispatch, Event.topics,
+    # Topics.handlers, Event.context, handler calls
+    'dispatch[1x1]': 6,
+    'dispatch[2x3]': 11,
+    'dispatch[disabled]': 1,
+    # Topics.handlers called by Event.dispatch to count the handler
+    # calls (`EventType.counters`)
+    'dispatch[ns 1x1]': 7,
+    'dispatch[ns 2x3]': 12,
+    'dispatch[ns disabled]': 1,
+    # Event.__call__, Event._dispatchable, Topics.has_handlers,
+    # Topics.handlers, Event._attach, Event._get_hooks,
+    # Callbacks.__init__ (isinstance check of `Callbacks`)
+    'wrap': 8,
+    'wrap[ns]': 8,
+    # Environment.attach_event instead of Callbacks.__init__
+    'wrap[native]': 7,
+    # per processed event, in addition to simpy: 3 dispatches and
+    # Callbacks.__iter__
+    'process': 19,
+    'process[ns]': 22,
+    'process[native]': 18,
+}
+
+# memory allocated per operation, by CPython version
+ALLOCATIONS = {
+    (3, 10): {
+        # peak of the temporary allocations (bytes) for a dispatch,
+        # the routing table of plain topics is built every time
+        'dispatch': 200,
+        'dispatch[ns]': 112,
+        # blocks kept alive by a wrapped simpy event
+        'wrap': 6,
+        'wrap[ns]': 6,
+    },
+    (3, 11): {
+        'dispatch': 384,
+        'dispatch[ns]': 48,
+        'wrap': 6,
+        'wrap[ns]': 6,
+    },
+    (3, 12): {
+        'dispatch': 384,
+        'dispatch[ns]': 48,
+        'wrap': 6,
+        'wrap[ns]': 6,
+    },
+    (3, 13): {
+        'dispatch': 400,
+        'dispatch[ns]': 48,
+        'wrap': 6,
+        'wrap[ns]': 6,
+    },
+}
+
+# budgets by CPython version
+BUDGETS = {
+    version: {'calls': CALLS, 'allocations': allocations}
+    for version, allocations in ALLOCATIONS.items()
+}
+
+budgets = BUDGETS.get(sys.version_info[:2])
+
+pytestmark = pytest.mark.skipif(
+    platform.python_implementation() != 'CPython' or budgets is None,
+    reason='the budgets are recorded for CPython ' + ', '.join(
+        '.'.join(map(str, version)) for version in BUDGETS))
+
+
+def handler(context, data):
+    pass
+
+
+def create_event(topics=1, handlers=1, ns=False):
+    """ return an enabled `Event` with handlers for 'test' and the simpy
+        hooks, after a first dispatch of each hook (i.e lazily created
+        objects)
+
+        if `ns` is `True` the `Event` is created from a `RootNameSpace`
+        and the handlers are added to linked `Topic` objects.
+    """
+    hooks = ('test', 'before', 'callbacks', 'after')
+    if ns:
+        root = RootNameSpace(enabled=True)
+        for i in range(topics):
+            for hook in hooks:
+                root.handlers(f'topic{i}', hook).extend(
+                    [handler] * handlers)
+            root.topic(f'topic{i}').append('budget')
+        evt = root.event('budget')
+    else:
+        evt = Event(name='budget')
+        evt.dispatcher = EventDispatcher()
+        evt.enabled = True
+        for _ in range(topics):
+            evt.topics.append({hook: [handler] * handlers
+                               for hook in hooks})
+    for hook in hooks:
+        evt.dispatch(hook)
+    return evt
+
+
+def calls_per_op(fct, args_list):
+    """ return the number of python-level calls per call of `fct`
+
+        `fct` is called with each tuple of args in `args_list`, the call
+        to `fct` itself is counted.
+    """
+    count = 0
+
+    def profile(frame, event, arg):
+        nonlocal count
+        if event == 'call':
+            count += 1
+
+    # calls from the garbage collection (__del__, weakref callbacks)
+    # aren't counted
+    gc.collect()
+    gc.disable()
+    sys.setprofile(profile)
+    try:
+        for args in args_list:
+            fct(*args)
+    finally:
+        sys.setprofile(None)
+        gc.enable()
+    return count / len(args_list)
+
+
+def check_budget(kind, name, value):
+    budget = budgets[kind][name]
+    assert value <= budget, (
+        f'{name}: {value} exceeds the budget ({budget})')
+
+
+@pytest.mark.parametrize('ns, prefix', [(False, ''), (True, 'ns ')])
+def test_dispatch_calls(ns, prefix):
+    evt = create_event(ns=ns)
+    check_budget('calls', f'dispatch[{prefix}1x1]',
+                 calls_per_op(evt.dispatch, [('test',)] * NUMBER))
+    evt = create_event(topics=2, handlers=3, ns=ns)
+    check_budget('calls', f'dispatch[{prefix}2x3]',
+                 calls_per_op(evt.dispatch, [('test',)] * NUMBER))
+    evt.enabled = False
+    check_budget('calls', f'dispatch[{prefix}disabled]',
+                 calls_per_op(evt.dispatch, [('test',)] * NUMBER))
+
+
+@pytest.mark.parametrize('env_type, ns, name', [
+    (simpy.Environment, False, 'wrap'),
+    (simpy.Environment, True, 'wrap[ns]'),
+    (Environment, False, 'wrap[native]'),
+])
+def test_wrap_calls(env_type, ns, name):
+    env = env_type()
+    evt = create_event(ns=ns)
+    evt(env.timeout(1))
+    events = [(env.timeout(1),) for _ in range(NUMBER)]
+    check_budget('calls', name, calls_per_op(evt, events))
+
+
+@pytest.mark.parametrize('env_type, ns, name', [
+    (simpy.Environment, False, 'process'),
+    (simpy.Environment, True, 'process[ns]'),
+    (Environment, False, 'process[native]'),
+])
+def test_process_calls(env_type, ns, name):
+    def run(wrap):
+        # return the number of calls to process NUMBER timeouts
+        env = env_type()
+        evt = create_event(ns=ns)
+        for _ in range(NUMBER):
+            event = env.timeout(1)
+            if wrap:
+                evt(event)
+        return calls_per_op(env.run, [()]) / NUMBER
+
+    check_budget('calls', name, run(True) - run(False))
+
+
+@pytest.mark.parametrize('ns, name', [(False, 'dispatch'),
+                                      (True, 'dispatch[ns]')])
+def test_dispatch_allocations(ns, name):
+    evt = create_event(ns=ns)
+    peaks = []
+    for _ in range(10):
+        tracemalloc.start()
+        try:
+            current = tracemalloc.get_traced_memory()[0]
+            evt.dispatch('test')
+            peaks.append(tracemalloc.get_traced_memory()[1] - current)
+        finally:
+            tracemalloc.stop()
+    check_budget('allocations', name, min(peaks))
+
+
+@pytest.mark.parametrize('ns, name', [(False, 'wrap'), (True, 'wrap[ns]')])
+def test_wrap_allocations(ns, name):
+    env = simpy.Environment()
+    evt = create_event(ns=ns)
+    evt(env.timeout(1))
+    events = [env.timeout(1) for _ in range(NUMBER)]
+    gc.collect()
+    gc.disable()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        for event in events:
+            evt(event)
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+        gc.enable()
+    blocks = sum(stat.count_diff for stat
+                 in after.compare_to(before, 'filename'))
+    check_budget('allocations', name, round(blocks / NUMBER))
@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+import pytest
+from simpy_events.event import Event, EventDispatcher, BatchHandler
+from simpy_events.dispatchers import ProfilingEventDispatcher
+
+numpy = pytest.importorskip('numpy')
+from simpy_events.columns import Columns, VectorHandler  # noqa: E402
+
+
+def test_create_columns():
+    columns = Columns(timestamps=[0.1, 0.2], values=(3, 4))
+    assert columns.names == ('timestamps', 'values')
+    assert len(columns) == 2
+    assert isinstance(columns.values, numpy.ndarray)
+    assert columns.values.tolist() == [3, 4]
+    assert columns.arrays['timestamps'] is columns.timestamps
+    with pytest.raises(AttributeError):
+        columns.unknown
+
+
+def test_create_columns_empty():
+    assert len(Columns()) == 0
+    assert list(Columns()) == []
+
+
+def test_create_columns_different_lengths():
+    with pytest.raises(ValueError):
+        Columns(timestamps=[0.1, 0.2], values=[1])
+
+
+def test_columns_rows():
+    columns = Columns(timestamps=[0.1, 0.2], ids=numpy.array([3, 4]))
+    assert columns.rows() == [
+        {'timestamps': 0.1, 'ids': 3},
+        {'timestamps': 0.2, 'ids': 4},
+    ]
+    assert type(columns.rows()[0]['ids']) is int
+
+
+def test_vector_handler_single_row(capsys):
+    @VectorHandler
+    def handler(context, columns):
+        print(context, columns.names, columns.values.tolist())
+
+    handler('context', {'values': 12})
+    captured = capsys.readouterr()
+    assert captured.out == """\
+context ('values',) [12]
+"""
+
+
+@pytest.fixture
+def event(capsys):
+    evt = Event(name='telemetry')
+    evt.dispatcher = EventDispatcher()
+    evt.enabled = True
+
+    def scalar(context, data):
+        print('scalar', context.hook, data)
+
+    @VectorHandler
+    def vectorized(context, columns):
+        print('vectorized', context.hook, columns.values.sum())
+
+    @BatchHandler
+    def batch(context, datas):
+        print('batch', context.hook, len(datas))
+
+    evt.topics.append({'sample': [scalar, vectorized]})
+    evt.topics.append({'sample': [batch]})
+    return evt
+
+
+def test_event_dispatch_columns(capsys, event):
+    event.dispatch_columns('sample', ids=[1, 2], values=[10, 20])
+    event.dispatch_columns('sample', Columns(ids=[1], values=[5]))
+    captured = capsys.readouterr()
+    assert captured.out == """\
+scalar sample {'ids': 1, 'values': 10}
+scalar sample {'ids': 2, 'values': 20}
+vectorized sample 30
+batch sample 2
+scalar sample {'ids': 1, 'values': 5}
+vectorized sample 5
+batch sample 1
+"""
+
+
+def test_event_dispatch_columns_vectorized_only(event, monkeypatch):
+    del event.topics[1]
+    del event.topics[0]['sample'][0]
+
+    def rows(self):
+        raise AssertionError('rows should not be created')
+
+    monkeypatch.setattr(Columns, 'rows', rows)
+    event.dispatch_columns('sample', ids=[1, 2], values=[10, 20])
+
+
+def test_event_dispatch_columns_disabled(capsys, event):
+    event.enabled = False
+    event.dispatch_columns('sample', ids=[1, 2], values=[10, 20])
+    captured = capsys.readouterr()
+    assert captured.out == ""
+
+
+def test_event_dispatch_columns_custom_dispatcher(capsys, event):
+    class MyDispatcher:
+        def dispatch(self, event, hook, data):
+            print('dispatch', hook, data)
+
+    event.dispatcher = MyDispatcher()
+    event.dispatch_columns('sample', ids=[1, 2])
+    captured = capsys.readouterr()
+    assert captured.out == """\
+dispatch sample {'ids': 1}
+dispatch sample {'ids': 2}
+"""
+
+
+def test_event_dispatch_columns_dispatcher_subclass(capsys, event):
+    class MyDispatcher(EventDispatcher):
+        def dispatch(self, event, hook, data):
+            print('dispatch', hook, data)
+            super().dispatch(event, hook, data)
+
+    event.dispatcher = MyDispatcher()
+    event.dispatch_columns('sample', ids=[1, 2], values=[10, 20])
+    captured = capsys.readouterr()
+    assert captured.out == """\
+dispatch sample {'ids': 1, 'values': 10}
+scalar sample {'ids': 1, 'values': 10}
+vectorized sample 10
+batch sample 1
+dispatch sample {'ids': 2, 'values': 20}
+scalar sample {'ids': 2, 'values': 20}
+vectorized sample 20
+batch sample 1
+"""
+
+
+def test_event_dispatch_columns_profiling(capsys, event):
+    event.dispatch_columns('sample', ids=[1, 2], values=[10, 20])
+    expected = capsys.readouterr().out
+    dispatcher = event.dispatcher = ProfilingEventDispatcher()
+    event.dispatch_columns('sample', ids=[1, 2], values=[10, 20])
+    assert capsys.readouterr().out == expected
+    assert sorted(stat.calls for stat in dispatcher.report()) == [1, 1, 2]
@@ -0,0 +1,602 @@
+#!/usr/bin/env python
+import pytest
+from simpy_events.dispatchers import AsyncEventDispatcher
+from simpy_events.dispatchers import BackgroundEventDispatcher
+from simpy_events.dispatchers import Offload, ThreadPoolEventDispatcher
+from simpy_events.dispatchers import ProcessPoolEventDispatcher
+from simpy_events.dispatchers import TimeStepEventDispatcher
+from simpy_events.dispatchers import ProfilingEventDispatcher
+from simpy_events.event import BatchHandler, EventDispatcher
+from concurrent.futures import ThreadPoolExecutor
+from simpy_events.manager import RootNameSpace
+import asyncio
+import gc
+import simpy
+import threading
+import os
+import time
+
+
+@pytest.fixture
+def env():
+    yield simpy.Environment()
+
+
+@pytest.fixture
+def async_dispatcher():
+    with AsyncEventDispatcher() as dispatcher:
+        yield dispatcher
+
+
+@pytest.fixture
+def pool_dispatcher():
+    with ThreadPoolEventDispatcher(max_workers=4) as dispatcher:
+        yield dispatcher
+
+
+def test_async_dispatcher_sync_handlers(env, async_dispatcher, capsys):
+    root = RootNameSpace(dispatcher=async_dispatcher, enabled=True)
+
+    @root.after('topic')
+    def handler(context, event):
+        print(context.hook, context.event.metadata['name'], event.value)
+
+    root.topic('topic').append('my event')
+    evt = root.event('my event')
+    evt(env.timeout(1, 'main street'))
+    async_dispatcher.run(env)
+    assert async_dispatcher._thread is None
+    captured = capsys.readouterr()
+    assert captured.out == """\
+after my event main street
+"""
+
+
+def test_async_dispatcher_coroutine_handlers(env, async_dispatcher):
+    root = RootNameSpace(dispatcher=async_dispatcher, enabled=True)
+    results = []
+    main = threading.current_thread()
+
+    @root.after('topic')
+    async def handler(context, event):
+        assert threading.current_thread() is not main
+        # the last dispatched awaits less
+        await asyncio.sleep(0.001 * (5 - event.value))
+        results.append((context.event.metadata['id'], event.value))
+
+    root.topic('topic').append('my event')
+    evt1 = root.event('my event', id=1)
+    evt2 = root.event('my event', id=2)
+
+    def process(env):
+        for i in range(5):
+            yield evt1(env.timeout(1, i))
+            yield evt2(env.timeout(1, i))
+
+    env.process(process(env))
+    async_dispatcher.run(env)
+    assert async_dispatcher.pending == 0
+    assert [v for i, v in results if i == 1] == list(range(5))
+    assert [v for i, v in results if i == 2] == list(range(5))
+
+
+def test_async_dispatcher_drain_raise(env, async_dispatcher):
+    root = RootNameSpace(dispatcher=async_dispatcher, enabled=True)
+    results = []
+
+    @root.handlers('topic', 'test')
+    async def handler(context, data):
+        if data == 1:
+            raise ValueError(data)
+        results.append(data)
+
+    root.topic('topic').append('my event')
+    evt = root.event('my event')
+    for i in range(3):
+        evt.dispatch('test', i)
+    with pytest.raises(ValueError):
+        async_dispatcher.drain()
+    assert results == [0, 2]
+    async_dispatcher.drain()
+
+
+def test_async_dispatcher_forget_done(async_dispatcher):
+    root = RootNameSpace(dispatcher=async_dispatcher, enabled=True)
+
+    @root.handlers('topic', 'test')
+    async def handler(context, data):
+        pass
+
+    root.topic('topic').append('my event')
+    futures = []
+    for i in range(100):
+        root.event('my event').dispatch('test', i)
+        futures.extend(async_dispatcher._futures)
+    for future in futures:
+        future.result(1)
+    # the done callbacks run after the result is available
+    deadline = time.monotonic() + 1
+    while async_dispatcher._last and time.monotonic() < deadline:
+        time.sleep(0.001)
+    assert async_dispatcher._last == {}
+    assert async_dispatcher.pending == 0
+
+
+def test_background_dispatchers_handlers_only():
+    for dispatcher in (AsyncEventDispatcher, ThreadPoolEventDispatcher,
+                       ProcessPoolEventDispatcher, TimeStepEventDispatcher):
+        assert dispatcher.handlers_only is True
+
+
+def test_background_dispatcher_abstract():
+    with pytest.raises(TypeError):
+        BackgroundEventDispatcher()
+
+
+def test_async_dispatcher_close():
+    dispatcher = AsyncEventDispatcher()
+    loop = dispatcher.loop
+    assert loop.is_running()
+    dispatcher.close()
+    assert loop.is_closed()
+    assert dispatcher._loop is None
+
+
+def test_pool_dispatcher_inline_handlers(env, pool_dispatcher, capsys):
+    root = RootNameSpace(dispatcher=pool_dispatcher, enabled=True)
+
+    @root.after('topic')
+    def handler(context, event):
+        print(context.hook, context.event.metadata['name'], event.value)
+
+    root.topic('topic').append('my event')
+    evt = root.event('my event')
+    evt(env.timeout(1, 'main street'))
+    pool_dispatcher.run(env)
+    assert pool_dispatcher.stats()['submitted'] == 0
+    captured = capsys.readouterr()
+    assert captured.out == """\
+after my event main street
+"""
+
+
+def test_pool_dispatcher_offload_topic(env, pool_dispatcher):
+    root = RootNameSpace(dispatcher=pool_dispatcher, enabled=True)
+    main = threading.current_thread()
+    results = {'topic1': [], 'topic2': []}
+    inline = []
+
+    def offloaded(name):
+        def handler(context, event):
+            assert threading.current_thread() is not main
+            # the first dispatched sleeps more
+            time.sleep(0.001 * (5 - event.value))
+            results[name].append(event.value)
+        return handler
+
+    root.topic('topic1').offload = True
+    root.topic('topic1').after.append(offloaded('topic1'))
+    root.topic('topic2').after.append(Offload(offloaded('topic2')))
+    root.topic('topic2').after.append(
+        lambda context, event: inline.append(threading.current_thread()))
+    root.topic('topic1').append('my event')
+    root.topic('topic2').append('my event')
+    evt = root.event('my event')
+
+    def process(env):
+        for i in range(5):
+            yield evt(env.timeout(1, i))
+
+    env.process(process(env))
+    pool_dispatcher.run(env)
+    assert results == {'topic1': list(range(5)), 'topic2': list(range(5))}
+    assert inline == [main] * 5
+    stats = pool_dispatcher.stats()
+    assert stats['depth'] == 0
+    assert stats['submitted'] == stats['completed'] == 10
+    assert 1 <= stats['max_depth'] <= 10
+    assert stats['max_lag'] >= stats['mean_lag'] > 0
+    assert stats['topics'] == {'::topic1': 0, '::topic2': 0}
+
+
+def test_pool_dispatcher_drain_raise(pool_dispatcher):
+    root = RootNameSpace(dispatcher=pool_dispatcher, enabled=True)
+    results = []
+
+    @root.handlers('topic', 'test')
+    @Offload
+    def handler(context, data):
+        if data == 1:
+            raise ValueError(data)
+        results.append(data)
+
+    root.topic('topic').append('my event')
+    evt = root.event('my event')
+    for i in range(3):
+        evt.dispatch('test', i)
+    with pytest.raises(ValueError):
+        pool_dispatcher.drain()
+    assert results == [0, 2]
+    pool_dispatcher.drain()
+
+
+def test_pool_dispatcher_drain_timeout(pool_dispatcher):
+    root = RootNameSpace(dispatcher=pool_dispatcher, enabled=True)
+    release = threading.Event()
+    root.topic('topic').offload = True
+    root.topic('topic').handlers('test').append(
+        lambda context, data: release.wait())
+    root.topic('topic').append('my event')
+    root.event('my event').dispatch('test', None)
+    with pytest.raises(TimeoutError):
+        pool_dispatcher.drain(0.01)
+    release.set()
+    pool_dispatcher.drain()
+
+
+def analyse(context, value):
+    # run in the worker processes
+    return (context.event.metadata['id'], context.hook, value ** 2,
+            os.getpid())
+
+
+def test_pool_dispatcher_stats_polling(pool_dispatcher):
+    # stats() polled from another thread while lanes are created
+    root = RootNameSpace(dispatcher=pool_dispatcher, enabled=True)
+    done = threading.Event()
+    errors = []
+
+    def poll():
+        while not done.is_set():
+            try:
+                pool_dispatcher.stats()
+            except Exception as e:
+                errors.append(e)
+
+    thread = threading.Thread(target=poll)
+    thread.start()
+    try:
+        for i in range(2000):
+            topic = root.topic(f'topic{i}')
+            topic.offload = True
+            topic.handlers('test').append(lambda context, data: None)
+            topic.append('my event')
+        root.event('my event').dispatch('test')
+        pool_dispatcher.drain()
+    finally:
+        done.set()
+        thread.join()
+    assert errors == []
+    assert len(pool_dispatcher.stats()['topics']) == 2000
+
+
+def test_process_pool_dispatcher(env, capsys):
+    root = RootNameSpace(enabled=True)
+    root.topic('analyse').offload = True
+    root.topic('analyse').after.append(analyse)
+    root.topic('analyse').append('my event')
+    root.topic('print').after.append(
+        lambda context, event: print(context.hook, event.value))
+    root.topic('print').append('my event')
+    evt1 = root.event('my event', id=1)
+    evt2 = root.event('my event', id=2)
+
+    def process(env):
+        for i in range(10):
+            yield evt1(env.timeout(1, i))
+            yield evt2(env.timeout(1, i))
+
+    env.process(process(env))
+    with ProcessPoolEventDispatcher(max_workers=2, batch_size=3) as dispatcher:
+        root.dispatcher = dispatcher
+        dispatcher.run(env)
+        assert dispatcher.pending == 0
+    assert [r[:3] for r in dispatcher.results] == [
+        (id, 'after', i ** 2) for i in range(10) for id in (1, 2)
+    ]
+    assert os.getpid() not in {r[3] for r in dispatcher.results}
+    captured = capsys.readouterr()
+    assert captured.out == ''.join(f'after {i}\n' for i in range(10)
+                                   for id in (1, 2))
+
+
+def test_process_pool_dispatcher_batches():
+    release = threading.Event()
+    merged = []
+    executor = ThreadPoolExecutor(max_workers=1)
+    dispatcher = ProcessPoolEventDispatcher(
+        executor=executor, batch_size=2, backlog=2, merge=merged.append)
+    root = RootNameSpace(dispatcher=dispatcher, enabled=True)
+
+    @root.handlers('topic', 'test')
+    @Offload
+    def handler(context, data):
+        release.wait()
+        return data
+
+    root.topic('topic').append('my event')
+    evt = root.event('my event')
+    for i in range(5):
+        evt.dispatch('test', i)
+    # 2 batches submitted, the last item is waiting for the batch
+    assert dispatcher.pending == 5
+    assert merged == []
+    release.set()
+    dispatcher.close()
+    assert merged == list(range(5))
+    assert dispatcher.results == []
+    executor.shutdown()
+
+
+def test_process_pool_dispatcher_backlog():
+    release = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=1)
+    dispatcher = ProcessPoolEventDispatcher(
+        executor=executor, batch_size=1, backlog=1)
+    root = RootNameSpace(dispatcher=dispatcher, enabled=True)
+
+    @root.handlers('topic', 'test')
+    @Offload
+    def handler(context, data):
+        if data == 0:
+            release.wait()
+        return data
+
+    root.topic('topic').append('my event')
+    evt = root.event('my event')
+    evt.dispatch('test', 0)
+    timer = threading.Timer(0.05, release.set)
+    timer.start()
+    # blocks until the first batch is done
+    evt.dispatch('test', 1)
+    assert release.is_set()
+    assert dispatcher.results[0] == 0
+    dispatcher.close()
+    assert dispatcher.results == [0, 1]
+    executor.shutdown()
+
+
+def test_process_pool_dispatcher_drain_raise():
+    executor = ThreadPoolExecutor(max_workers=1)
+    dispatcher = ProcessPoolEventDispatcher(executor=executor, batch_size=1)
+    root = RootNameSpace(dispatcher=dispatcher, enabled=True)
+
+    @root.handlers('topic', 'test')
+    @Offload
+    def handler(context, data):
+        if data == 1:
+            raise ValueError(data)
+        return data
+
+    root.topic('topic').append('my event')
+    evt = root.event('my event')
+    for i in range(3):
+        evt.dispatch('test', i)
+    with pytest.raises(ValueError):
+        dispatcher.drain()
+    assert dispatcher.results == [0, 2]
+    dispatcher.drain()
+    executor.shutdown()
+
+
+def test_time_step_dispatcher(env, capsys):
+    dispatcher = TimeStepEventDispatcher(env)
+    root = RootNameSpace(dispatcher=dispatcher, enabled=True)
+
+    @root.after('all')
+    def handler(context, event):
+        print('all', env.now, context.event.metadata['id'], event.value)
+
+    @root.after('last')
+    @BatchHandler
+    def last(context, events):
+        print('last', env.now, context.event.metadata['id'],
+              [event.value for event in events])
+
+    root.topic('last').coalesce = 'last'
+    root.topic('all').append('my event')
+    root.topic('last').append('my event')
+    evt1 = root.event('my event', id=1)
+    evt2 = root.event('my event', id=2)
+
+    def process(env, evt, delay):
+        for i in range(3):
+            yield evt(env.timeout(delay, i))
+            yield evt(env.timeout(0, i * 10))
+
+    env.process(process(env, evt1, 1))
+    env.process(process(env, evt2, 2))
+    dispatcher.run(env)
+    assert dispatcher.pending == 0
+    captured = capsys.readouterr()
+    assert captured.out == """\
+all 1 1 0
+all 1 1 0
+last 1 1 [0]
+all 2 2 0
+all 2 2 0
+last 2 2 [0]
+all 2 1 1
+all 2 1 10
+last 2 1 [10]
+all 3 1 2
+all 3 1 20
+last 3 1 [20]
+all 4 2 1
+all 4 2 10
+last 4 2 [10]
+all 6 2 2
+all 6 2 20
+last 6 2 [20]
+"""
+
+
+def test_time_step_dispatcher_flush(env, capsys):
+    dispatcher = TimeStepEventDispatcher(env)
+    root = RootNameSpace(dispatcher=dispatcher, enabled=True)
+
+    @root.handlers('topic', 'test')
+    def handler(context, data):
+        print(context.hook, data)
+
+    root.topic('topic').append('my event')
+    evt = root.event('my event')
+    evt.dispatch('test', 1)
+    evt.dispatch('test', 2)
+    evt.dispatch('other', 3)
+    assert dispatcher.pending == 2
+    assert capsys.readouterr().out == ''
+    dispatcher.flush()
+    assert capsys.readouterr().out == """\
+test 1
+test 2
+"""
+
+
+def test_profiling_dispatcher(env):
+    dispatcher = ProfilingEventDispatcher()
+    root = RootNameSpace(dispatcher=dispatcher, enabled=True)
+
+    @root.after('network::analyse')
+    def slow(context, event):
+        time.sleep(0.002)
+
+    @root.before('network::analyse')
+    @root.after('log')
+    def fast(context, event):
+        pass
+
+    root.topic('network::analyse').append('::network::packet')
+    root.topic('log').append('network::packet')
+    evt = root.event('network::packet')
+    evt.topics.append({'after': [fast]})
+
+    def process(env):
+        for i in range(3):
+            yield evt(env.timeout(1, i))
+
+    env.process(process(env))
+    env.run()
+    report = dispatcher.report()
+    prefix = 'test_profiling_dispatcher.<locals>.'
+    assert report[0].key == ('::network', 'analyse', 'after', prefix + 'slow')
+    assert {stat.key for stat in report[1:]} == {
+        ('::network', 'analyse', 'before', prefix + 'fast'),
+        (None, 'log', 'after', prefix + 'fast'),
+        (None, None, 'after', prefix + 'fast'),
+    }
+    assert all(stat.calls == 3 for stat in report)
+    slow_stat = report[0]
+    assert slow_stat.total_ns >= 3 * 2000000
+    assert slow_stat.total_ns >= slow_stat.max_ns >= slow_stat.mean_ns
+    assert [stat.calls for stat in dispatcher.report('calls')] == [3] * 4
+    lines = dispatcher.format_report(limit=2).splitlines()
+    assert len(lines) == 3
+    assert lines[1].endswith(f'::network::analyse [after] {prefix}slow')
+    dispatcher.reset()
+    assert dispatcher.report() == []
+
+
+def test_profiling_dispatcher_handler_error():
+    dispatcher = ProfilingEventDispatcher()
+    root = RootNameSpace(dispatcher=dispatcher, enabled=True)
+
+    @root.handlers('topic', 'test')
+    def handler(context, data):
+        raise ValueError(data)
+
+    root.topic('topic').append('my event')
+    with pytest.raises(ValueError):
+        root.event('my event').dispatch('test', 1)
+    assert dispatcher.report()[0].calls == 1
+
+
+def test_profiling_dispatcher_drop_in():
+    # handlers added during a dispatch are only called by the next one,
+    # as with EventDispatcher
+    results = []
+
+    class Unhashable:
+        __hash__ = None
+
+        def __call__(self, context, data):
+            results.append('unhashable')
+
+    def b(context, data):
+        results.append('b')
+
+    def a(context, data):
+        results.append('a')
+        hdlrs = root.handlers('topic2', 'test')
+        if b not in hdlrs:
+            hdlrs.append(b)
+
+    for dispatcher in (EventDispatcher(), ProfilingEventDispatcher()):
+        results.clear()
+        root = RootNameSpace(dispatcher=dispatcher, enabled=True)
+        root.handlers('topic1', 'test').extend([a, Unhashable()])
+        root.topic('topic1').append('my event')
+        root.topic('topic2').append('my event')
+        evt = root.event('my event')
+        evt.dispatch('test')
+        assert results == ['a', 'unhashable']
+        evt.dispatch('test')
+        assert results == ['a', 'unhashable', 'a', 'unhashable', 'b']
+
+
+def test_profiling_dispatcher_dispatch_many():
+    # batch handlers keep their semantics, in the order of
+    # EventDispatcher.dispatch_many
+    for dispatcher in (EventDispatcher(), ProfilingEventDispatcher()):
+        calls = []
+        root = RootNameSpace(dispatcher=dispatcher, enabled=True)
+
+        @BatchHandler
+        def batch(context, datas):
+            calls.append(('batch', list(datas)))
+
+        def handler(context, data):
+            calls.append(('handler', data))
+
+        root.handlers('topic', 'test').extend([handler, batch, handler])
+        root.topic('topic').append('my event')
+        evt = root.event('my event')
+        evt.dispatch_many('test', iter(range(3)))
+        evt.dispatch_many('test', [])
+        assert calls == [('handler', 0), ('handler', 1), ('handler', 2),
+                         ('batch', [0, 1, 2]),
+                         ('handler', 0), ('handler', 1), ('handler', 2)]
+    stats = {stat.name.rsplit('.', 1)[-1]: stat.calls
+             for stat in dispatcher.report()}
+    assert stats == {'batch': 1, 'handler': 6}
+
+
+def test_profiling_dispatcher_routes():
+    dispatcher = ProfilingEventDispatcher()
+    root = RootNameSpace(dispatcher=dispatcher, enabled=True)
+
+    def a(context, data):
+        pass
+
+    def b(context, data):
+        pass
+
+    root.handlers('topic', 'test').append(a)
+    root.topic('topic').append('my event')
+    evt = root.event('my event')
+    evt.dispatch('test', 1)
+    route = dispatcher._route(evt, 'test')
+    evt.dispatch('test', 2)
+    # the route is cached along the routing table of the topics
+    assert dispatcher._route(evt, 'test') is route
+    assert [hdlr for hdlr, _ in route] == [a]
+    root.handlers('topic', 'test').append(b)
+    evt.dispatch('test', 3)
+    assert [(stat.handler, stat.calls) for stat in dispatcher.report(
+        'calls')] == [(a, 3), (b, 1)]
+    # forgotten with the topics of the event
+    assert len(dispatcher._routes) == 1
+    root.event_type('my event').remove(evt)
+    del evt, route
+    gc.collect()
+    assert dispatcher._routes == {}
@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+import pytest
+from simpy_events.environment import Environment
+from simpy_events.event import Event, EventDispatcher, Callbacks
+
+
+@pytest.fixture
+def env():
+    yield Environment()
+
+
+def handler(context, data):
+    print(context.hook, context.event.metadata, data.value)
+
+
+def create_event(name):
+    evt = Event(name=name)
+    evt.dispatcher = EventDispatcher()
+    evt.enabled = True
+    evt.topics.append({
+        'before': [handler],
+        'callbacks': [handler],
+        'after': [handler],
+    })
+    return evt
+
+
+def test_attach_event(env):
+    evt = create_event('cross red light')
+    event = env.timeout(1)
+    assert evt(event) is event
+    assert not isinstance(event.callbacks, Callbacks)
+    assert event.simpy_events == [evt]
+    assert event.callbacks == [evt._hooks[1]]
+    env.run()
+    assert not hasattr(event, 'simpy_events')
+
+
+def test_call_event(env, capsys):
+    evt = create_event('cross red light')
+
+    def process(env):
+        value = yield evt(env.timeout(1, 'main street'))
+        print('resume', value)
+
+    env.process(process(env))
+    env.run()
+    captured = capsys.readouterr()
+    assert captured.out == """\
+before {'name': 'cross red light'} main street
+callbacks {'name': 'cross red light'} main street
+resume main street
+after {'name': 'cross red light'} main street
+"""
+
+
+def test_call_event_reuse_simpyevent_preserve_order(env, capsys):
+    evt = create_event('cross red light')
+    evt2 = create_event('caught on camera')
+    event = evt(env.timeout(1, 'main street'))
+    evt2(event)
+    env.run()
+    captured = capsys.readouterr()
+    assert captured.out == """\
+before {'name': 'cross red light'} main street
+before {'name': 'caught on camera'} main street
+callbacks {'name': 'cross red light'} main street
+callbacks {'name': 'caught on camera'} main street
+after {'name': 'cross red light'} main street
+after {'name': 'caught on camera'} main street
+"""
+
+
+def test_call_event_pending_preserve_order(env, capsys):
+    evt = create_event('cross red light')
+    evt.enabled = False
+    evt2 = create_event('caught on camera')
+    evt2(evt(env.timeout(1, 'main street')))
+    evt.enabled = True
+    env.run()
+    captured = capsys.readouterr()
+    assert captured.out == """\
+before {'name': 'cross red light'} main street
+before {'name': 'caught on camera'} main street
+callbacks {'name': 'cross red light'} main street
+callbacks {'name': 'caught on camera'} main street
+after {'name': 'cross red light'} main street
+after {'name': 'caught on camera'} main street
+"""
+
+
+def test_call_event_disable_before_processed(env, capsys):
+    evt = create_event('cross red light')
+    evt(env.timeout(2, 'main street'))
+
+    def process():
+        yield env.timeout(1)
+        evt.enabled = False
+
+    env.process(process())
+    env.run()
+    captured = capsys.readouterr()
+    assert captured.out == ""
+
+
+def test_run_until_event(env, capsys):
+    evt = create_event('cross red light')
+    event = evt(env.timeout(1, 'main street'))
+    assert env.run(until=event) == 'main street'
+    captured = capsys.readouterr()
+    assert captured.out == """\
+before {'name': 'cross red light'} main street
+callbacks {'name': 'cross red light'} main street
+"""
+
+
+def test_failed_event(env, capsys):
+    evt = create_event('cross red light')
+    event = evt(env.event())
+    event.fail(ValueError('red light'))
+    with pytest.raises(ValueError):
+        env.run()
+
+
+def test_regular_simpy_events(env, capsys):
+    def process(env):
+        value = yield env.timeout(1, 'main street')
+        print('resume', value, env.now)
+
+    env.process(process(env))
+    env.run()
+    captured = capsys.readouterr()
+    assert captured.out == """\
+resume main street 1
+"""
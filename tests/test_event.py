@@ -1,7 +1,12 @@
 #!/usr/bin/env python
 
 import pytest
-from simpy_events.event import Event, EventDispatcher, Context
+from simpy_events.event import (Event, EventDispatcher, Context, HookContext,
+                                Callbacks, Topics, BatchHandler,
+                                DispatchCounters, invalidate_handlers,
+                                invalidate_properties, dispatch_batch,
+                                SharedTopics)
+from simpy_events.environment import Environment
 import simpy
 
 
@@ -534,3 +539,625 @@ def test_call_event_remove_dispatcher_while_processed(env, capsys):
 before {'name': 'cross red light', 'context': 'test'} main street
 before {'name': 'cross red light', 'context': 'test'} main street
 """
+
+
+class Versioned(dict):
+    versioned = True
+
+
+class VersionedList(list):
+    versioned = True
+
+
+def test_topics_handlers_routing_table():
+    topics = Topics()
+    h1, h2, h3 = object(), object(), object()
+    topics.append(Versioned(hook=VersionedList([h1, h2]), other=[h3]))
+    topics.append(Versioned(hook=VersionedList([h3])))
+    topics.append(Versioned())
+    handlers = topics.handlers('hook')
+    assert handlers == (h1, h2, h3)
+    assert topics.handlers('hook') is handlers
+    assert topics.handlers('unknown') == ()
+
+
+def test_topics_handlers_invalidated():
+    topics = Topics()
+    h1, h2 = object(), object()
+    lst = VersionedList([h1])
+    topics.append(Versioned(hook=lst))
+    handlers = topics.handlers('hook')
+    lst.append(h2)
+    # not invalidated yet
+    assert topics.handlers('hook') is handlers
+    invalidate_handlers()
+    assert topics.handlers('hook') == (h1, h2)
+    # modifying the sequence of topics clears the routing table
+    topics.append(Versioned(hook=VersionedList([h1])))
+    assert topics.handlers('hook') == (h1, h2, h1)
+    del topics[0]
+    assert topics.handlers('hook') == (h1,)
+
+
+def test_topics_handlers_not_versioned():
+    topics = Topics()
+    h1, h2 = object(), object()
+    lst = [h1]
+    topics.append(Versioned(hook=lst))
+    topics.append({'hook': VersionedList([h2])})
+    handlers = topics.handlers('hook')
+    assert handlers == (h1, h2)
+    lst.clear()
+    assert topics.handlers('hook') == (h2,)
+
+
+def test_event_set_topics():
+    evt = Event()
+    topic = {'hook': []}
+    evt.topics = [topic]
+    assert isinstance(evt.topics, Topics)
+    assert list(evt.topics) == [topic]
+
+
+def test_create_hook_context():
+    c = HookContext('my event', 'before')
+    assert c.event == 'my event'
+    assert c.hook == 'before'
+    with pytest.raises(AttributeError):
+        c.attr1 = 'test'
+
+
+def test_event_context():
+    evt = Event()
+    context = evt.context('before')
+    assert isinstance(context, HookContext)
+    assert context.event is evt
+    assert context.hook == 'before'
+    assert evt.context('before') is context
+    assert evt.context('after') is not context
+
+
+def test_dispatcher_reuse_context():
+    disp = EventDispatcher()
+    evt = Event()
+    contexts = []
+
+    def handler(context, data):
+        contexts.append(context)
+
+    evt.topics.append({'hook': [handler, handler]})
+    disp.dispatch(evt, 'hook', 1)
+    disp.dispatch(evt, 'hook', 2)
+    assert len(contexts) == 4
+    assert all(c is evt.context('hook') for c in contexts)
+
+
+def test_dispatcher_no_context_if_no_handlers():
+    created = []
+
+    class MyContext(Context):
+        def __init__(self, **attributes):
+            created.append(attributes)
+            super().__init__(**attributes)
+
+    disp = EventDispatcher(context_type=MyContext)
+    evt = Event()
+    evt.topics.append({'hook': []})
+    disp.dispatch(evt, 'hook', 1)
+    assert created == []
+    assert evt._contexts == {}
+
+
+def test_dispatcher_context_type(capsys):
+    disp = EventDispatcher(context_type=Context)
+    evt = Event(name='emit signal')
+    contexts = []
+
+    def handler(context, data):
+        context.custom = data
+        contexts.append(context)
+
+    def handler2(context, data):
+        print(context.event.metadata, context.hook, context.custom)
+
+    evt.topics.append({'hook': [handler, handler2]})
+    disp.dispatch(evt, 'hook', 1)
+    disp.dispatch(evt, 'hook', 2)
+    assert isinstance(contexts[0], Context)
+    assert contexts[0] is not contexts[1]
+    captured = capsys.readouterr()
+    assert captured.out == """\
+{'name': 'emit signal'} hook 1
+{'name': 'emit signal'} hook 2
+"""
+
+
+def active_event(**metadata):
+    """ return an enabled `Event` with a dispatcher and handlers """
+    evt = Event(**metadata)
+    evt.dispatcher = EventDispatcher()
+    evt.enabled = True
+    evt.topics.append({'before': [print]})
+    return evt
+
+
+def test_callbacks_slots(env):
+    evt = active_event()
+    event = evt(env.timeout(1))
+    assert isinstance(event.callbacks, Callbacks)
+    assert not hasattr(event.callbacks, '__dict__')
+
+
+def test_call_event_reuse_hooks(env):
+    evt = active_event()
+    cbks1 = evt(env.timeout(1)).callbacks
+    cbks2 = evt(env.timeout(1)).callbacks
+    assert cbks1.before[0] is cbks2.before[0]
+    assert cbks1.callbacks[0] is cbks2.callbacks[0]
+    assert cbks1.after[0] is cbks2.after[0]
+
+
+def test_callbacks_iter(env):
+    evt = active_event()
+    evt2 = active_event()
+    event = env.timeout(1)
+    event.callbacks.append('cb')
+    cbks = evt(event).callbacks
+    before, callbacks, after = evt._hooks
+    assert list(cbks) == [before, 'cb', callbacks, after]
+    evt2(event)
+    before2, callbacks2, after2 = evt2._hooks
+    assert list(event.callbacks) == [before, before2, 'cb', callbacks,
+                                     callbacks2, after, after2]
+
+
+@pytest.mark.parametrize('setup', [
+    lambda evt: setattr(evt, 'enabled', False),
+    lambda evt: setattr(evt, 'dispatcher', None),
+    lambda evt: evt.topics.clear(),
+    lambda evt: evt.topics[0]['before'].clear(),
+])
+def test_call_event_not_dispatchable_untouched(env, setup):
+    evt = Event()
+    evt.dispatcher = EventDispatcher()
+    evt.enabled = True
+    topic = Versioned(before=VersionedList([print]))
+    evt.topics.append(topic)
+    setup(evt)
+    event = env.timeout(1)
+    assert evt(event) is event
+    assert event.callbacks == []
+
+
+def test_call_event_custom_dispatcher_always_attached(env):
+    class MyDispatcher(EventDispatcher):
+        def dispatch(self, event, hook, data):
+            pass
+
+    evt = Event()
+    evt.dispatcher = MyDispatcher()
+    evt.enabled = True
+    assert isinstance(evt(env.timeout(1)).callbacks, Callbacks)
+
+
+def print_handler(context, data):
+    print(context.hook, context.event.metadata, data.value)
+
+
+def run_pending(env, evt, change):
+    """ wrap a simpy event with `evt` and call `change` before it is
+        processed.
+    """
+    def process():
+        event = evt(env.timeout(2, 'main street'))
+        assert not isinstance(event.callbacks, Callbacks)
+        print('resume', (yield event))
+
+    def update():
+        yield env.timeout(1)
+        change()
+
+    env.process(process())
+    env.process(update())
+    env.run()
+
+
+pending_output = """\
+before {'name': 'cross red light'} main street
+callbacks {'name': 'cross red light'} main street
+resume main street
+after {'name': 'cross red light'} main street
+"""
+
+
+def test_call_event_pending_enabled(env, capsys):
+    evt = Event(name='cross red light')
+    evt.dispatcher = EventDispatcher()
+    evt.topics.append({
+        'before': [print_handler],
+        'callbacks': [print_handler],
+        'after': [print_handler],
+    })
+
+    def change():
+        evt.enabled = True
+
+    run_pending(env, evt, change)
+    captured = capsys.readouterr()
+    assert captured.out == pending_output
+
+
+def test_call_event_pending_dispatcher(env, capsys):
+    evt = Event(name='cross red light')
+    evt.enabled = True
+    evt.topics.append({
+        'before': [print_handler],
+        'callbacks': [print_handler],
+        'after': [print_handler],
+    })
+
+    def change():
+        evt.dispatcher = EventDispatcher()
+
+    run_pending(env, evt, change)
+    captured = capsys.readouterr()
+    assert captured.out == pending_output
+
+
+def test_call_event_pending_topics(env, capsys):
+    evt = Event(name='cross red light')
+    evt.dispatcher = EventDispatcher()
+    evt.enabled = True
+
+    def change():
+        evt.topics.append(Versioned(
+            before=VersionedList([print_handler]),
+            callbacks=VersionedList([print_handler]),
+            after=VersionedList([print_handler]),
+        ))
+
+    run_pending(env, evt, change)
+    captured = capsys.readouterr()
+    assert captured.out == pending_output
+
+
+def test_call_event_pending_handlers(env, capsys):
+    evt = Event(name='cross red light')
+    evt.dispatcher = EventDispatcher()
+    evt.enabled = True
+    topic = Versioned(
+        before=VersionedList(),
+        callbacks=VersionedList(),
+        after=VersionedList(),
+    )
+    evt.topics.append(topic)
+
+    def change():
+        for hook in ('before', 'callbacks', 'after'):
+            topic[hook].append(print_handler)
+        invalidate_handlers()
+
+    run_pending(env, evt, change)
+    captured = capsys.readouterr()
+    assert captured.out == pending_output
+
+
+def test_call_event_pending_preserve_order(env, capsys):
+    evt = Event(name='cross red light')
+    evt.dispatcher = EventDispatcher()
+    evt2 = Event(name='caught on camera')
+    evt2.dispatcher = EventDispatcher()
+    evt2.enabled = True
+    for e in (evt, evt2):
+        e.topics.append({
+            'before': [print_handler],
+            'callbacks': [print_handler],
+            'after': [print_handler],
+        })
+
+    evt2(evt(env.timeout(1, 'main street')))
+    evt.enabled = True
+    env.run()
+    captured = capsys.readouterr()
+    assert captured.out == """\
+before {'name': 'cross red light'} main street
+before {'name': 'caught on camera'} main street
+callbacks {'name': 'cross red light'} main street
+callbacks {'name': 'caught on camera'} main street
+after {'name': 'cross red light'} main street
+after {'name': 'caught on camera'} main street
+"""
+
+
+@pytest.mark.parametrize('env_type', [simpy.Environment, Environment])
+@pytest.mark.parametrize('enable_order', [(0, 1), (1, 0)])
+def test_call_event_pending_preserve_order_deferred(env_type, enable_order,
+                                                    capsys):
+    env = env_type()
+    evts = [Event(name='cross red light'), Event(name='caught on camera')]
+    for e in evts:
+        e.dispatcher = EventDispatcher()
+        e.topics.append({
+            'before': [print_handler],
+            'callbacks': [print_handler],
+            'after': [print_handler],
+        })
+
+    event = evts[1](evts[0](env.timeout(1, 'main street')))
+    event.callbacks.append(lambda event: print('callback'))
+    for i in enable_order:
+        evts[i].enabled = True
+    env.run()
+    captured = capsys.readouterr()
+    assert captured.out == """\
+before {'name': 'cross red light'} main street
+before {'name': 'caught on camera'} main street
+callbacks {'name': 'cross red light'} main street
+callbacks {'name': 'caught on camera'} main street
+callback
+after {'name': 'cross red light'} main street
+after {'name': 'caught on camera'} main street
+"""
+
+
+def test_call_event_pending_processed_not_attached(env, capsys):
+    evt = Event(name='cross red light')
+    evt.dispatcher = EventDispatcher()
+    evt.topics.append({'after': [print_handler]})
+    evt(env.timeout(1, 'main street'))
+    env.run()
+    evt.enabled = True
+    env.run()
+    assert evt._pending is None
+    captured = capsys.readouterr()
+    assert captured.out == ""
+
+
+def test_call_event_pending_pruned(env):
+    evt = Event()
+
+    def process():
+        for _ in range(1000):
+            yield evt(env.timeout(1))
+
+    env.process(process())
+    env.run()
+    assert len(evt._pending) < 16
+
+
+def test_dispatcher_dispatch_many(capsys):
+    disp = EventDispatcher()
+    evt = Event(name='emit signal')
+
+    def handler(context, data):
+        print('handler', context.hook, data)
+
+    @BatchHandler
+    def batch(context, datas):
+        print('batch', context.hook, datas)
+
+    evt.topics.append({'hook': [handler, batch]})
+    evt.topics.append({'hook': [handler]})
+    disp.dispatch_many(evt, 'hook', iter([1, 2, 3]))
+    disp.dispatch_many(evt, 'hook', [])
+    disp.dispatch(evt, 'hook', 4)
+    captured = capsys.readouterr()
+    assert captured.out == """\
+handler hook 1
+handler hook 2
+handler hook 3
+batch hook [1, 2, 3]
+handler hook 1
+handler hook 2
+handler hook 3
+handler hook 4
+batch hook (4,)
+handler hook 4
+"""
+
+
+class DispatchSubclass(EventDispatcher):
+    # `dispatch_many` falls back to `EventDispatcher.dispatch_each`
+    def dispatch(self, event, hook, data):
+        super().dispatch(event, hook, data)
+
+
+@pytest.mark.parametrize('disp', [EventDispatcher(), DispatchSubclass()])
+def test_dispatcher_dispatch_many_order(disp):
+    calls = []
+    evt = Event()
+
+    def handler(name):
+        return lambda context, data: calls.append((name, data))
+
+    evt.topics.append({'hook': [handler('a'), handler('b')]})
+    evt.topics.append({'hook': [handler('c')]})
+    disp.dispatch_many(evt, 'hook', [1, 2])
+    # the same order as `EventDispatcher.dispatch` for each item
+    assert calls == [('a', 1), ('b', 1), ('c', 1),
+                     ('a', 2), ('b', 2), ('c', 2)]
+
+
+def test_event_dispatch_many(capsys):
+    evt = Event(name='emit signal')
+    evt.dispatcher = EventDispatcher()
+
+    @BatchHandler
+    def batch(context, datas):
+        print(context.hook, context.event.metadata, datas)
+
+    evt.topics.append({'hook': [batch]})
+    evt.dispatch_many('hook', (1, 2))
+    evt.enabled = True
+    evt.dispatch_many('hook', (3, 4))
+    evt.dispatcher = None
+    evt.dispatch_many('hook', (5, 6))
+    captured = capsys.readouterr()
+    assert captured.out == """\
+hook {'name': 'emit signal'} (3, 4)
+"""
+
+
+def test_event_dispatch_many_custom_dispatcher(capsys):
+    class MyDispatcher:
+        def dispatch(self, event, hook, data):
+            print('dispatch', hook, data)
+
+    class MyEventDispatcher(EventDispatcher):
+        def dispatch(self, event, hook, data):
+            print('event dispatcher', hook, data)
+
+    evt = Event()
+    evt.enabled = True
+    evt.dispatcher = MyDispatcher()
+    evt.dispatch_many('hook', (1, 2))
+    evt.dispatcher = MyEventDispatcher()
+    evt.dispatch_many('hook', (3, 4))
+    captured = capsys.readouterr()
+    assert captured.out == """\
+dispatch hook 1
+dispatch hook 2
+event dispatcher hook 3
+event dispatcher hook 4
+"""
+
+
+def test_event_sample_every(env, capsys):
+    evt = Event()
+    evt.dispatcher = EventDispatcher()
+    evt.enabled = True
+    evt.topics.append({'after': [lambda context, event: print(event.value)]})
+    assert evt.sample_every == 1
+    evt.sample_every = 3
+    events = [evt(env.timeout(1, i)) for i in range(7)]
+    assert [isinstance(event.callbacks, Callbacks)
+            for event in events] == [True, False, False] * 2 + [True]
+    evt.sample_every = 2
+    evt(env.timeout(2, 'sampled'))
+    evt(env.timeout(2, 'skipped'))
+    env.run()
+    captured = capsys.readouterr()
+    assert captured.out == """\
+0
+3
+6
+sampled
+"""
+
+
+def test_event_sample_every_invalid():
+    evt = Event()
+    for value in (0, -1, 0.5, None):
+        with pytest.raises(ValueError):
+            evt.sample_every = value
+    assert evt.sample_every == 1
+
+
+def test_event_counters(env):
+    evt = active_event()
+    evt.topics.append({'before': [print], 'test': [print]})
+    evt.dispatch('test')
+    counters = evt.counters = DispatchCounters()
+    evt(env.timeout(1))
+    env.run()
+    evt.dispatch('test')
+    evt.dispatch_many('test', iter([1, 2]))
+    evt.enabled = False
+    evt.dispatch('test')
+    assert (counters.before.dispatches, counters.before.handler_calls) == (
+        1, 2)
+    assert (counters.after.dispatches, counters.after.handler_calls) == (
+        1, 0)
+    assert (counters.other.dispatches, counters.other.handler_calls) == (
+        3, 3)
+    assert (counters.disable.dispatches, counters.enable.dispatches) == (
+        1, 0)
+
+
+def test_event_source(capsys):
+    class Source:
+        def __init__(self):
+            self.values = {'enabled': True, 'dispatcher': EventDispatcher()}
+            self.calls = 0
+
+        def resolve(self, name):
+            self.calls += 1
+            return self.values[name]
+
+    source = Source()
+    evt = Event()
+    evt.topics.append({'test': [lambda context, data: print(data)]})
+    evt.source = source
+    evt.dispatch('test', 1)
+    evt.dispatch('test', 2)
+    assert source.calls == 2
+    source.values['enabled'] = False
+    evt.dispatch('test', 3)
+    invalidate_properties()
+    evt.dispatch('test', 4)
+    assert evt.enabled is False
+    assert source.calls == 4
+    evt.enabled = True
+    evt.dispatch('test', 5)
+    evt.source = None
+    invalidate_properties()
+    evt.dispatch('test', 6)
+    assert source.calls == 4
+    captured = capsys.readouterr()
+    assert captured.out == """\
+1
+2
+3
+5
+6
+"""
+
+
+def test_dispatch_batch(capsys):
+    def batch(context, events):
+        print(context.hook, [evt.metadata['id'] for evt in events])
+
+    def other(context, events):
+        print('other', len(events))
+
+    evts = [Event(id=i) for i in range(4)]
+    for evt in evts:
+        evt.dispatcher = EventDispatcher()
+        evt.topics.append({'test_batch': [batch]})
+        evt.enabled = True
+    evts[1].topics.append({'test_batch': [batch, other]})
+    evts[2].enabled = False
+    evts[3].dispatcher = None
+    dispatch_batch('test_batch', evts)
+    dispatch_batch('test_batch', [])
+    captured = capsys.readouterr()
+    assert captured.out == """\
+test_batch [0, 1]
+other 1
+"""
+
+
+def test_topics_shared():
+    topic1 = {'test': [print]}
+    topic2 = {'test': [len]}
+    shared = SharedTopics([topic1])
+    evt1 = Event()
+    evt2 = Event()
+    evt1.topics = shared
+    evt2.topics = shared
+    assert evt1.topics.shared is shared
+    assert evt1.topics.handlers('test') == (print,)
+    shared.append(topic2)
+    invalidate_handlers()
+    assert evt2.topics.handlers('test') == (print, len)
+    assert list(shared.copies) == []
+    # copy on write
+    evt1.topics.remove(topic1)
+    assert evt1.topics.shared is None
+    assert list(evt1.topics) == [topic2]
+    assert list(shared) == [topic1, topic2]
+    assert list(shared.copies) == [evt1.topics]
+    assert evt2.topics.shared is shared
+    evt2.topics = [topic2]
+    assert list(evt2.topics) == [topic2]
+    assert len(shared.copies) == 2
@@ -3,6 +3,7 @@ import pytest
 from simpy_events.manager import (Handlers, NameSpace, RootNameSpace,
                                   EventType, Topic, _hooks)
 from simpy_events.event import EventDispatcher, Event
+import gc
 import simpy
 import sys
 
@@ -895,6 +896,111 @@ def test_topic_get_handlers(root):
     assert topic.get_handlers('before') is handlers
 
 
+def test_sample_every_property(root):
+    network = root.ns('network')
+    et = root.event_type('network::packet')
+    et2 = root.event_type('disk::write')
+    evt = et.create()
+    evt2 = et2.create()
+    assert root.sample_every == 1
+    assert network.sample_every is None
+    assert (evt.sample_every, evt2.sample_every) == (1, 1)
+
+    network.sample_every = 100
+    assert (evt.sample_every, evt2.sample_every) == (100, 1)
+    assert et.create().sample_every == 100
+
+    et.sample_every = 10
+    root.sample_every = 2
+    assert (evt.sample_every, evt2.sample_every) == (10, 2)
+
+    et.sample_every = None
+    network.sample_every = None
+    assert (evt.sample_every, evt2.sample_every) == (2, 2)
+
+
+def test_sample_every_property_invalid(root):
+    network = root.ns('network')
+    evts = [root.event('network::packet') for _ in range(3)]
+    network.sample_every = 5
+    for value in (0, -1, 0.5, 'x'):
+        with pytest.raises(ValueError):
+            network.sample_every = value
+        assert network.sample_every == 5
+        assert [evt.sample_every for evt in evts] == [5] * 3
+    with pytest.raises(ValueError):
+        root.sample_every = None
+    assert root.sample_every == 1
+    with pytest.raises(ValueError):
+        RootNameSpace(sample_every=0)
+
+
+def test_dispatch_counters(root):
+    root.enabled = True
+    sat = root.ns('satellite')
+    et1 = root.event_type('satellite::orbit')
+    et2 = root.event_type('satellite::radio::emit')
+    et3 = root.event_type('ground::receive')
+    root.topic('satellite::log').extend(['orbit', 'radio::emit'])
+    root.handlers('satellite::log', 'test').extend([print, print])
+    root.topic('other').append('::satellite::orbit')
+    root.handlers('other', 'test').append(print)
+
+    evt1 = et1.create()
+    evt2 = et2.create()
+    evt3 = et3.create()
+    evt1.dispatch('test')
+    evt1.dispatch('test')
+    evt2.dispatch('test')
+    evt2.dispatch('before')
+    evt3.dispatch('test')
+    assert evt1.counters is et1.counters
+
+    zero = {'dispatches': 0, 'handler_calls': 0}
+    assert et1.stats() == {
+        'before': zero, 'callbacks': zero, 'after': zero,
+        'enable': {'dispatches': 1, 'handler_calls': 0}, 'disable': zero,
+        'other': {'dispatches': 2, 'handler_calls': 6},
+    }
+    stats = sat.stats()
+    assert stats['other'] == {'dispatches': 3, 'handler_calls': 8}
+    assert stats['before'] == {'dispatches': 1, 'handler_calls': 0}
+    assert stats['enable'] == {'dispatches': 2, 'handler_calls': 0}
+    assert root.stats()['other'] == {'dispatches': 4, 'handler_calls': 8}
+    assert set(root.snapshot()) == {
+        '::satellite::orbit', '::satellite::radio::emit', '::ground::receive'
+    }
+    assert root.snapshot()['::satellite::orbit'] == et1.stats()
+
+    sat.reset()
+    assert sat.stats()['other'] == zero
+    assert root.stats()['other'] == {'dispatches': 1, 'handler_calls': 0}
+    root.reset()
+    assert root.stats()['enable'] == zero
+
+
+def test_topic_path(root):
+    assert root.topic('my app::my topic').path == '::my app::my topic'
+    assert root.topic('my topic').path == '::my topic'
+
+
+def test_topic_offload(root):
+    topic = root.topic('my app::my topic')
+    assert topic.offload is False
+    assert topic.topic.owner is topic
+    topic.offload = True
+    assert topic.topic.offload is True
+
+
+def test_topic_coalesce(root):
+    topic = root.topic('my app::my topic')
+    assert topic.coalesce == 'all'
+    topic.coalesce = 'last'
+    assert topic.topic.coalesce == 'last'
+    with pytest.raises(ValueError):
+        topic.coalesce = 'first'
+
+
 @pytest.fixture
 def hooks():
     return _hooks
@@ -953,3 +1059,353 @@ def test_ns_hooks_property_other_ns(root, hooks):
     for hook in hooks:
         assert (getattr(ns, hook)('::my other ns::my topic')
                 is topic.handlers(hook))
+
+
+def test_topic_handlers_routing_table_updated(root, capsys):
+    topic = root.topic('my app::topic')
+    topic.append('my event')
+    root.event_type('my app::my event').enabled = True
+    evt = root.event('my app::my event')
+
+    def handler(context, data):
+        print('handler:', context.hook, data)
+
+    def handler2(context, data):
+        print('handler2:', context.hook, data)
+
+    evt.dispatch('hook', 1)
+    topic.handlers('hook').append(handler)
+    evt.dispatch('hook', 2)
+    topic.handlers('hook').insert(0, handler2)
+    evt.dispatch('hook', 3)
+    topic.handlers('hook').remove(handler)
+    evt.dispatch('hook', 4)
+    del topic.topic['hook']
+    evt.dispatch('hook', 5)
+    captured = capsys.readouterr()
+    assert captured.out == """\
+dispatching {'ns': '::my app', 'name': 'my event'} enable None
+dispatching {'ns': '::my app', 'name': 'my event'} hook 1
+dispatching {'ns': '::my app', 'name': 'my event'} hook 2
+handler: hook 2
+dispatching {'ns': '::my app', 'name': 'my event'} hook 3
+handler2: hook 3
+handler: hook 3
+dispatching {'ns': '::my app', 'name': 'my event'} hook 4
+handler2: hook 4
+dispatching {'ns': '::my app', 'name': 'my event'} hook 5
+"""
+
+
+def test_topic_handlers_routing_table_while_dispatch(root, capsys):
+    topic = root.topic('my app::topic')
+    topic.append('my event')
+    root.event_type('my app::my event').enabled = True
+    evt = root.event('my app::my event')
+
+    @topic.handlers('hook')
+    def handler(context, data):
+        print('handler:', context.hook, data)
+        if handler2 in topic.handlers('hook'):
+            topic.handlers('hook').remove(handler2)
+
+    @topic.handlers('hook')
+    def handler2(context, data):
+        print('handler2:', context.hook, data)
+
+    evt.dispatch('hook', 1)
+    evt.dispatch('hook', 2)
+    captured = capsys.readouterr()
+    assert captured.out == """\
+dispatching {'ns': '::my app', 'name': 'my event'} enable None
+dispatching {'ns': '::my app', 'name': 'my event'} hook 1
+handler: hook 1
+handler2: hook 1
+dispatching {'ns': '::my app', 'name': 'my event'} hook 2
+handler: hook 2
+"""
+
+
+def test_lazy_properties(env, capsys):
+    dispatcher = EventDispatcher()
+    root = RootNameSpace(dispatcher=dispatcher, lazy=True)
+    assert root.lazy
+    assert root.ns('one').lazy
+    assert root.event_type('one::event').lazy
+
+    @root.handlers('::topic', 'test')
+    def handler(context, data):
+        print(context.event.metadata['name'], data)
+
+    root.topic('::topic').extend(['one::event', 'two::event'])
+    evt1 = root.event('one::event')
+    evt2 = root.event('two::event')
+    assert evt1.source is root.event_type('one::event')
+    assert evt1.enabled is False
+    assert evt1.dispatcher is dispatcher
+
+    evt1.dispatch('test', 1)
+    root.enabled = True
+    evt1.dispatch('test', 2)
+    evt2.dispatch('test', 2)
+    root.ns('two').enabled = False
+    evt1.dispatch('test', 3)
+    evt2.dispatch('test', 3)
+    root.ns('two').enabled = None
+    evt2.dispatch('test', 4)
+    other = EventDispatcher()
+    root.event_type('two::event').dispatcher = other
+    assert evt2.dispatcher is other
+    assert evt1.dispatcher is dispatcher
+    captured = capsys.readouterr()
+    # 'enable' / 'disable' hooks are not dispatched in lazy mode
+    assert captured.out == """\
+event 2
+event 2
+event 3
+event 4
+"""
+
+    # deferred simpy events are attached when enabled
+    root.enabled = False
+    timeout = evt1(env.timeout(1, 'value'))
+    root.enabled = True
+    evt1.topics[0]['before'] = [lambda context, event: print(event.value)]
+    env.run()
+    captured = capsys.readouterr()
+    assert captured.out == 'value\n'
+
+    # the values are kept once removed from the hierarchy
+    event_type = root.event_type('one::event')
+    event_type._remove_event_properties(evt1)
+    assert evt1.source is None
+    root.enabled = False
+    assert evt1.enabled is True
+    assert timeout.processed
+
+
+def test_lazy_properties_override():
+    dispatcher = EventDispatcher()
+    root = RootNameSpace(dispatcher=dispatcher, lazy=True)
+    other = RootNameSpace(lazy=True)
+    assert root.epoch is root.event_type('one::event').epoch
+    assert root.epoch is not other.epoch
+    assert RootNameSpace().epoch is None
+    evt = root.event('one::event')
+    evt.enabled = True
+    custom = EventDispatcher()
+    evt.dispatcher = custom
+    epoch = root.epoch.value
+    # the other hierarchies are not invalidated
+    other.enabled = True
+    root.ns('unrelated').dispatcher = None
+    assert root.epoch.value == epoch + 1
+    root.ns('unrelated').enabled = True
+    assert evt.enabled is True
+    assert evt.dispatcher is custom
+    # the values set on the event override the ones of the hierarchy
+    root.ns('one').enabled = False
+    root.dispatcher = EventDispatcher()
+    assert evt.enabled is True
+    assert evt.dispatcher is custom
+    evt.enabled = False
+    root.enabled = True
+    assert evt.enabled is False
+    # until the source is set again
+    evt.source = root.event_type('one::event')
+    assert evt.enabled is False
+    root.ns('one').enabled = None
+    assert evt.enabled is True
+    assert evt.dispatcher is root.dispatcher
+
+
+def test_lazy_properties_sample_every():
+    root = RootNameSpace(lazy=True)
+    evt = root.event('event')
+    root.sample_every = 3
+    assert evt.sample_every == 3
+
+
+def test_enable_batch(capsys):
+    root = RootNameSpace()
+
+    @root.handlers('::tracking', 'enable_batch')
+    @root.handlers('::tracking', 'disable_batch')
+    def batch(context, events):
+        print(context.hook, [evt.metadata['id'] for evt in events])
+
+    @root.handlers('::tracking', 'enable')
+    def enable(context, data):
+        print(context.hook, context.event.metadata['id'])
+
+    root.topic('::tracking').extend(['one::event', 'one::two::event'])
+    evts = [root.event('one::event', id=i) for i in range(3)]
+    evts += [root.event('one::two::event', id=i) for i in range(3, 5)]
+    root.event('other', id=5)
+    root.event_type('one::two::event').enabled = False
+    evts[0].enabled = True
+    root.ns('one').enabled = True
+    root.enabled = True
+    root.ns('one').enabled = None
+    root.enabled = False
+    root.event_type('one::two::event').enabled = None
+    # per instance only when created enabled
+    root.enabled = True
+    root.event('one::event', id=6)
+    captured = capsys.readouterr()
+    assert captured.out == """\
+enable 0
+enable 1
+enable 2
+enable_batch [1, 2]
+disable_batch [0, 1, 2]
+enable 0
+enable 1
+enable 2
+enable 3
+enable 4
+enable_batch [0, 1, 2, 3, 4]
+enable 6
+enable_batch [6]
+"""
+
+
+@pytest.mark.parametrize('lazy', [False, True])
+def test_event_type_remove(lazy, capsys):
+    root = RootNameSpace(lazy=lazy)
+
+    @root.handlers('topic', 'test')
+    def handler(context, data):
+        print(context.event.metadata['id'], context.hook, data)
+
+    root.topic('topic').append('event')
+    event_type = root.event_type('event')
+    evts = [root.event('event', id=i) for i in range(3)]
+    other = {'test': [handler]}
+    evts[1].topics.append(other)
+    assert evts[1].owner is event_type
+    root.enabled = True
+    event_type.remove(evts[1])
+    assert list(event_type.instances) == [evts[0], evts[2]]
+    assert evts[1].owner is None
+    assert list(evts[1].topics) == [other]
+    with pytest.raises(ValueError):
+        event_type.remove(evts[1])
+    root.enabled = False
+    assert evts[1].enabled is True
+    evts[1].dispatch('test', 1)
+    evts[2].dispose()
+    assert list(event_type.instances) == [evts[0]]
+    assert evts[2].enabled is False
+    assert evts[2].owner is None
+    captured = capsys.readouterr()
+    assert captured.out == '1 test 1\n'
+
+
+def test_event_dispose(env, capsys):
+    root = RootNameSpace(enabled=True)
+
+    @root.handlers('topic', 'disable')
+    @root.handlers('topic', 'after')
+    def handler(context, data):
+        print(context.event.metadata['id'], context.hook)
+
+    root.topic('topic').append('event')
+    evt = root.event('event', id=0)
+    root.event_type('event').enabled = False
+    evt(env.timeout(1))
+    root.event_type('event').enabled = None
+    evt.dispose()
+    evt.dispose()
+    other = root.event('event', id=1)
+    other(env.timeout(2))
+    other.dispose()
+    event = Event()
+    event.dispose()
+    env.run()
+    captured = capsys.readouterr()
+    assert captured.out == """\
+0 disable
+0 disable
+1 disable
+"""
+
+
+def test_weak_instances(env, capsys):
+    root = RootNameSpace(weak=True)
+    assert root.weak and root.ns('one').weak
+    assert not RootNameSpace().event_type('event').weak
+
+    @root.handlers('topic', 'after')
+    def handler(context, event):
+        print(context.event.metadata['id'], event.value)
+
+    event_type = root.event_type('one::event')
+
+    def process(env, i):
+        evt = root.event('one::event', id=i)
+        yield evt(env.timeout(1, i))
+
+    for i in range(3):
+        env.process(process(env, i))
+    live = root.event('one::event', id=3)
+    root.topic('topic').append('one::event')
+    root.enabled = True
+    env.run()
+    gc.collect()
+    assert list(event_type.instances) == [live]
+    assert list(event_type._enabled._events) == [live]
+    root.ns('one').enabled = False
+    assert live.enabled is False
+    root.topic('topic').clear()
+    assert list(live.topics) == []
+    captured = capsys.readouterr()
+    assert captured.out == """\
+0 0
+1 1
+2 2
+"""
+
+
+def test_event_type_shared_topics(capsys):
+    root = RootNameSpace(enabled=True)
+
+    @root.handlers('topic1', 'test')
+    def handler(context, data):
+        print(context.event.metadata['id'], 'topic1')
+
+    @root.handlers('topic2', 'test')
+    def handler2(context, data):
+        print(context.event.metadata['id'], 'topic2')
+
+    event_type = root.event_type('event')
+    evts = [root.event('event', id=i) for i in range(3)]
+    removed = root.event('event', id=3)
+    event_type.remove(removed)
+    assert all(evt.topics.shared is evts[0].topics.shared for evt in evts)
+    other = {'test': [lambda context, data: print(
+        context.event.metadata['id'], 'other')]}
+    evts[1].topics.append(other)
+    root.topic('topic1').append('event')
+    root.topic('topic2').append('event')
+    assert evts[0].topics.shared is not None
+    assert evts[1].topics.shared is None
+    for evt in evts + [removed]:
+        evt.dispatch('test')
+    root.topic('topic1').clear()
+    for evt in evts:
+        evt.dispatch('test')
+    captured = capsys.readouterr()
+    assert captured.out == """\
+0 topic1
+0 topic2
+1 other
+1 topic1
+1 topic2
+2 topic1
+2 topic2
+0 topic2
+1 other
+1 topic2
+2 topic2
+"""
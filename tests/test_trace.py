@@ -0,0 +1,313 @@
+#!/usr/bin/env python
+import pytest
+from simpy_events.trace import (TraceRecorder, HEADER, RECORD, FOOTER,
+                                MAGIC, END_MAGIC, VERSION, HAS_PAYLOAD,
+                                TraceReader, TraceRecord, event_type_name,
+                                replay)
+from simpy_events.event import Event
+from simpy_events.manager import RootNameSpace
+import io
+import math
+import simpy
+import struct
+
+
+@pytest.fixture
+def env():
+    yield simpy.Environment()
+
+
+def read_trace(data):
+    # return (header, records, strings) from the content of a trace
+    header = HEADER.unpack_from(data)
+    table, end = FOOTER.unpack_from(data, len(data) - FOOTER.size)
+    assert end == END_MAGIC
+    records = [RECORD.unpack_from(data, offset) for offset
+               in range(HEADER.size, table, RECORD.size)]
+    count, = struct.unpack_from('<I', data, table)
+    offset = table + 4
+    strings = []
+    for _ in range(count):
+        size, = struct.unpack_from('<H', data, offset)
+        strings.append(data[offset + 2:offset + 2 + size].decode())
+        offset += 2 + size
+    assert offset == len(data) - FOOTER.size
+    return header, records, strings
+
+
+def test_event_type_name():
+    root = RootNameSpace()
+    assert event_type_name(root.event('one::two')) == '::one::two'
+    assert event_type_name(root.event('two')) == '::two'
+    assert event_type_name(Event(name='my event')) == 'my event'
+    assert event_type_name(Event()) == ''
+
+
+def test_trace_recorder(env, tmp_path, capsys):
+    path = tmp_path / 'run.trace'
+    recorder = TraceRecorder(str(path), buffer_size=RECORD.size * 2,
+                             payload=lambda evt, hook, data: getattr(
+                                 data, 'value', None))
+    root = RootNameSpace(dispatcher=recorder, enabled=True)
+
+    @root.after('topic')
+    def handler(context, event):
+        print(context.hook, event.value)
+
+    root.topic('topic').extend(['network::packet', 'disk::write'])
+    evt1 = root.event('network::packet')
+    evt2 = root.event('disk::write')
+    evt3 = root.event('network::packet')
+
+    def process(env):
+        yield evt1(env.timeout(1, 10))
+        yield evt2(env.timeout(1, 20))
+        yield evt3(env.timeout(1, 30))
+
+    env.process(process(env))
+    env.run()
+    with recorder:
+        assert recorder.records == 3 * 3 + 3
+    captured = capsys.readouterr()
+    assert captured.out == """\
+after 10
+after 20
+after 30
+"""
+    header, records, strings = read_trace(path.read_bytes())
+    assert header[:3] == (MAGIC, VERSION, RECORD.size)
+    assert strings == list(recorder.strings) == [
+        '::network::packet', 'enable', '::disk::write', 'before',
+        'callbacks', 'after',
+    ]
+    assert len(records) == 12
+    summary = [(strings[type_id], instance, strings[hook], flags, payload)
+               for _, _, type_id, instance, hook, flags, payload in records]
+    assert summary[:3] == [
+        ('::network::packet', 0, 'enable', 0, 0),
+        ('::disk::write', 1, 'enable', 0, 0),
+        ('::network::packet', 2, 'enable', 0, 0),
+    ]
+    assert summary[3:6] == [
+        ('::network::packet', 0, hook, HAS_PAYLOAD, 10)
+        for hook in ('before', 'callbacks', 'after')
+    ]
+    assert summary[-1] == ('::network::packet', 2, 'after', HAS_PAYLOAD, 30)
+    sim_times = [record[0] for record in records]
+    assert all(math.isnan(t) for t in sim_times[:3])
+    assert sim_times[3:] == [1.] * 3 + [2.] * 3 + [3.] * 3
+    wall_times = [record[1] for record in records]
+    assert wall_times == sorted(wall_times)
+
+
+def test_trace_recorder_file_object(env):
+    file = io.BytesIO()
+    recorder = TraceRecorder(file, env=env)
+    evt = Event(name='my event')
+    evt.topics.append({'test': [lambda context, data: None]})
+    evt.dispatcher = recorder
+    evt.enabled = True
+    evt.dispatch('test', 'data')
+    recorder.close()
+    recorder.close()
+    assert not file.closed
+    _, records, strings = read_trace(file.getvalue())
+    assert strings == ['my event', 'enable', 'test']
+    assert records[1:] == [(0., records[1][1], 0, 0, 2, 0, 0)]
+
+
+def test_trace_recorder_not_closed(tmp_path):
+    # the file is a complete trace up to the last flush
+    path = tmp_path / 'crash.trace'
+    recorder = TraceRecorder(str(path), buffer_size=RECORD.size * 2)
+    with TraceReader(str(path)) as reader:
+        assert len(reader) == 0
+        assert reader.strings == ()
+    evt = Event(name='my event')
+    evt.topics.append({'test': [lambda context, data: None]})
+    evt.dispatcher = recorder
+    evt.enabled = True
+    for _ in range(3):
+        evt.dispatch('test', 'data')
+    assert recorder.records == 4
+    with TraceReader(str(path)) as reader:
+        assert [(r.event_type, r.hook) for r in reader] == [
+            ('my event', 'enable'), ('my event', 'test')]
+    recorder.flush()
+    with TraceReader(str(path)) as reader:
+        assert len(reader) == 4
+    recorder.close()
+    with TraceReader(str(path)) as reader:
+        assert len(reader) == 4
+        assert reader.strings == ('my event', 'enable', 'test')
+
+
+class Stream(io.BytesIO):
+    def seekable(self):
+        return False
+
+
+def test_trace_recorder_not_seekable():
+    file = Stream()
+    recorder = TraceRecorder(file, buffer_size=RECORD.size)
+    evt = Event(name='my event')
+    evt.dispatcher = recorder
+    evt.enabled = True
+    evt.dispatch('test', 'data')
+    assert len(file.getvalue()) == HEADER.size + RECORD.size
+    recorder.close()
+    _, records, strings = read_trace(file.getvalue())
+    assert len(records) == 2
+    assert strings == ['my event', 'enable', 'test']
+
+
+@pytest.mark.parametrize('value', [1 << 63, -(1 << 63) - 1, 1.5, 'data'])
+def test_trace_recorder_rejected_payload(value):
+    file = io.BytesIO()
+    recorder = TraceRecorder(file, payload=lambda evt, hook, data: data)
+    evt = Event(name='my event')
+    evt.dispatcher = recorder
+    evt.enabled = True
+    evt.dispatch('test', (1 << 63) - 1)
+    evt.dispatch('test', value)
+    evt.dispatch('test', -(1 << 63))
+    assert recorder.rejected == 1
+    recorder.close()
+    _, records, _ = read_trace(file.getvalue())
+    assert [record[-2:] for record in records[1:]] == [
+        (HAS_PAYLOAD, (1 << 63) - 1), (0, 0), (HAS_PAYLOAD, -(1 << 63))]
+
+
+def test_trace_recorder_handlers_only(env):
+    # the simpy events are recorded even without handlers
+    file = io.BytesIO()
+    recorder = TraceRecorder(file)
+    assert recorder.handlers_only is False
+    root = RootNameSpace(dispatcher=recorder, enabled=True)
+    evt = root.event('event')
+
+    def process(env):
+        for i in range(5):
+            yield evt(env.timeout(1))
+
+    env.process(process(env))
+    env.run()
+    recorder.close()
+    _, records, strings = read_trace(file.getvalue())
+    assert len(records) == 1 + 5 * 3
+    assert strings == ['::event', 'enable', 'before', 'callbacks', 'after']
+
+
+@pytest.fixture
+def trace(tmp_path):
+    # record a simulation: 'network::packet' every 1, 'disk::write'
+    # every 4, the payload is the value of the simpy event
+    path = tmp_path / 'run.trace'
+    env = simpy.Environment()
+    with TraceRecorder(str(path), payload=lambda evt, hook, data: getattr(
+            data, 'value', None)) as recorder:
+        root = RootNameSpace(dispatcher=recorder, enabled=True)
+        root.topic('topic').extend(['network::packet', 'disk::write'])
+
+        def process(env, name, delay, number):
+            evt = root.event(name)
+            for i in range(number):
+                yield evt(env.timeout(delay, i))
+
+        env.process(process(env, 'network::packet', 1, 100))
+        env.process(process(env, 'disk::write', 4, 25))
+        env.run()
+    yield str(path)
+
+
+def test_trace_reader(trace):
+    with TraceReader(trace, index_step=16) as reader:
+        assert len(reader) == 2 + 125 * 3
+        assert reader.strings == (
+            '::network::packet', 'enable', '::disk::write', 'before',
+            'callbacks', 'after',
+        )
+        assert reader[0][2:] == ('::network::packet', 0, 'enable', None)
+        assert math.isnan(reader[0].time)
+        record = reader[2]
+        assert isinstance(record, TraceRecord)
+        assert record[:1] + record[2:] == (
+            1., '::network::packet', 0, 'before', 0)
+        assert record.value == 0
+        assert reader[-1][2:] == ('::network::packet', 0, 'after', 99)
+        assert reader[-1] == reader[len(reader) - 1]
+        assert reader[2:5] == list(reader.records(2, 5))
+        walls = [r.wall_ns for r in reader]
+        assert [r.wall_ns for r in reader[::2]] == walls[::2]
+        assert [r.wall_ns for r in reader[::-1]] == walls[::-1]
+        assert [r.wall_ns for r in reader[10:2:-3]] == walls[10:2:-3]
+        assert reader[5:2] == []
+        assert [r.hook for r in reader[2:5]] == [
+            'before', 'callbacks', 'after']
+        with pytest.raises(IndexError):
+            reader[len(reader)]
+        assert len(list(reader)) == len(reader)
+
+        assert len(reader.index) == math.ceil(len(reader) / 16)
+        assert reader.index == sorted(reader.index)
+        assert reader.seek(0) == 2
+        assert reader.seek(1) == 2
+        index = reader.seek(50.5)
+        assert reader[index].time == 51.
+        assert reader[index - 1].time == 50.
+        assert reader.seek(1000) == len(reader)
+        records = list(reader.between(4, 8))
+        assert {r.time for r in records} == {4., 5., 6., 7.}
+        assert len(records) == (4 + 1) * 3
+        assert [r.hook for r in reader.between(end=1)] == ['enable'] * 2
+
+
+def test_trace_reader_invalid(tmp_path):
+    path = tmp_path / 'invalid.trace'
+    path.write_bytes(b'not a trace' * 10)
+    with pytest.raises(ValueError):
+        TraceReader(str(path))
+
+
+def test_replay(trace, capsys):
+    root = RootNameSpace(enabled=True)
+
+    @root.handlers('analyse', 'enable')
+    def enable(context, record):
+        print(context.hook, context.event.metadata['name'],
+              type(record).__name__)
+
+    @root.handlers('analyse', 'after')
+    def analyse(context, record):
+        metadata = context.event.metadata
+        if metadata['name'] == 'write':
+            print(metadata['ns'].path, metadata['trace_instance'],
+                  record.time, record.value)
+
+    root.topic('analyse').extend(['network::packet', 'disk::write'])
+    with TraceReader(trace) as reader:
+        report = replay(reader, root, start=90)
+        assert report['records'] == 11 * 3 + 3 * 3
+        assert report['skipped'] == 0
+        assert report['rate'] > 0
+        captured = capsys.readouterr()
+        assert captured.out == """\
+::disk 1 92.0 22
+::disk 1 96.0 23
+::disk 1 100.0 24
+"""
+        # the stand-ins are not added to the event types
+        event_type = root.event_type('disk::write')
+        assert list(event_type.instances) == []
+        assert event_type.stats()['after']['dispatches'] == 3
+
+        replay(reader, root, end=1)
+        captured = capsys.readouterr()
+        assert captured.out == """\
+enable packet TraceRecord
+enable write TraceRecord
+"""
+        root.ns('disk').enabled = False
+        report = replay(reader, root, start=90)
+        assert report['records'] == 11 * 3
+        assert report['skipped'] == 3 * 3